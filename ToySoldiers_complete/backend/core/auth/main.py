@@ -3,23 +3,33 @@ from fastapi.middleware.cors import CORSMiddleware
 from supabase import create_client, Client
 from pydantic_settings import BaseSettings
 from posthog import Posthog
+from shared.auth import TokenVerifier
+from shared.clients import Lifespan, LazyClient
+from shared.creators import CreatorResolver
+from shared.db import Database, client_options
 import os
 
 class Settings(BaseSettings):
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_service_role_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "")
+    redis_url: str = os.getenv("REDIS_URL", "")
+    database_max_concurrency: int = int(os.getenv("DATABASE_MAX_CONCURRENCY", "16"))
+    database_timeout: float = float(os.getenv("DATABASE_TIMEOUT", "10"))
+    database_prewarm_connections: int = int(os.getenv("DATABASE_PREWARM_CONNECTIONS", "4"))
     posthog_api_key: str = os.getenv("POSTHOG_API_KEY", "")
     
     class Config:
         env_file = ".env"
 
 settings = Settings()
+lifespan = Lifespan()
 
 app = FastAPI(
     title="Toy Soldiers Auth Service",
     description="Authentication and authorization service for Toy Soldiers platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -30,8 +40,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
-posthog_client = Posthog(settings.posthog_api_key, host='https://app.posthog.com')
+supabase: Client = create_client(
+    settings.supabase_url,
+    settings.supabase_service_role_key,
+    options=client_options(settings.database_timeout)
+)
+db = Database(supabase, max_concurrency=settings.database_max_concurrency, timeout=settings.database_timeout)
+lifespan.on_warm(lambda: db.warm(settings.database_prewarm_connections))
+lifespan.on_shutdown(db.close)
+# PostHog starts its upload thread on construction, so each worker builds its own
+posthog_client = LazyClient(
+    lambda: Posthog(settings.posthog_api_key, host='https://app.posthog.com'),
+    close=lambda client: client.shutdown()
+)
+lifespan.on_startup(posthog_client.get)
+lifespan.on_shutdown(posthog_client.close)
+
+token_verifier = TokenVerifier(
+    settings.jwt_secret_key,
+    remote_get_user=supabase.auth.get_user,
+    redis_url=settings.redis_url
+)
+lifespan.on_shutdown(token_verifier.close)
+get_current_user = token_verifier.current_user()
+get_optional_user = token_verifier.optional_user()
+creator_resolver = CreatorResolver(db, redis_url=settings.redis_url)
+lifespan.on_shutdown(creator_resolver.close)
 
 from routes import signup, login, profile
 
@@ -44,7 +78,9 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "auth_service",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "database": db.stats(),
+        "warmed": lifespan.warmed
     }
 
 @app.get("/")
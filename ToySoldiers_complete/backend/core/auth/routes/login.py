@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr
-from main import supabase, posthog_client
+from posthog import Posthog
+from main import supabase, db, posthog_client
 from typing import Optional
 
 router = APIRouter()
@@ -16,9 +17,12 @@ class LoginResponse(BaseModel):
     message: str
 
 @router.post("/login", response_model=LoginResponse)
-async def login(request: LoginRequest):
+async def login(
+    request: LoginRequest,
+    posthog: Posthog = Depends(posthog_client)
+):
     try:
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await db.run(supabase.auth.sign_in_with_password, {
             "email": request.email,
             "password": request.password
         })
@@ -29,7 +33,7 @@ async def login(request: LoginRequest):
                 detail="Invalid email or password"
             )
         
-        user_data = supabase.table("users").select("*").eq("id", auth_response.user.id).execute()
+        user_data = await db.execute(supabase.table("users").select("*").eq("id", auth_response.user.id))
         
         if not user_data.data:
             raise HTTPException(
@@ -37,7 +41,7 @@ async def login(request: LoginRequest):
                 detail="User profile not found"
             )
         
-        posthog_client.capture(
+        posthog.capture(
             str(auth_response.user.id),
             'user_login',
             {
@@ -63,8 +67,10 @@ async def login(request: LoginRequest):
 @router.post("/logout")
 async def logout():
     try:
-        supabase.auth.sign_out()
+        await db.run(supabase.auth.sign_out)
         return {"message": "Logout successful"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -74,12 +80,14 @@ async def logout():
 @router.post("/refresh")
 async def refresh_token(refresh_token: str):
     try:
-        auth_response = supabase.auth.refresh_session(refresh_token)
+        auth_response = await db.run(supabase.auth.refresh_session, refresh_token)
         
         return {
             "access_token": auth_response.session.access_token,
             "refresh_token": auth_response.session.refresh_token
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-from main import supabase
+from main import supabase, db, get_current_user, token_verifier, creator_resolver
+from shared.auth import AuthUser
 import uuid
 
 router = APIRouter()
@@ -16,36 +17,9 @@ class ProfileResponse(BaseModel):
 class ProfileUpdateRequest(BaseModel):
     email: Optional[EmailStr] = None
 
-async def get_current_user(authorization: str = Header(None)):
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authorization header"
-        )
-    
-    try:
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token"
-            )
-        
-        return user_response.user
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Authentication failed: {str(e)}"
-        )
-
 @router.get("/profile", response_model=ProfileResponse)
-async def get_profile(authorization: str = Header(None)):
-    user = await get_current_user(authorization)
-    
-    user_data = supabase.table("users").select("*").eq("id", user.id).execute()
+async def get_profile(user: AuthUser = Depends(get_current_user)):
+    user_data = await db.execute(supabase.table("users").select("*").eq("id", user.id))
     
     if not user_data.data:
         raise HTTPException(
@@ -56,7 +30,7 @@ async def get_profile(authorization: str = Header(None)):
     profile = user_data.data[0]
     
     if profile["role"] == "creator":
-        creator_data = supabase.table("creators").select("*").eq("user_id", user.id).execute()
+        creator_data = await db.execute(supabase.table("creators").select("*").eq("user_id", user.id))
         if creator_data.data:
             profile["creator_profile"] = creator_data.data[0]
     
@@ -65,23 +39,21 @@ async def get_profile(authorization: str = Header(None)):
 @router.patch("/profile")
 async def update_profile(
     request: ProfileUpdateRequest,
-    authorization: str = Header(None)
+    user: AuthUser = Depends(get_current_user)
 ):
-    user = await get_current_user(authorization)
-    
     update_data = {}
     if request.email:
         update_data["email"] = request.email
     
     if update_data:
-        supabase.table("users").update(update_data).eq("id", user.id).execute()
+        await db.execute(supabase.table("users").update(update_data).eq("id", user.id))
     
     return {"message": "Profile updated successfully"}
 
 @router.delete("/profile")
-async def delete_profile(authorization: str = Header(None)):
-    user = await get_current_user(authorization)
-    
-    supabase.table("users").delete().eq("id", user.id).execute()
+async def delete_profile(user: AuthUser = Depends(get_current_user)):
+    await db.execute(supabase.table("users").delete().eq("id", user.id))
+    await token_verifier.revoke_user(user.id)
+    await creator_resolver.invalidate(user.id)
     
     return {"message": "Profile deleted successfully"}
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr
 from passlib.context import CryptContext
-from main import supabase, posthog_client
+from posthog import Posthog
+from main import supabase, db, posthog_client, creator_resolver
 from models.user import UserCreate, UserResponse
 import uuid
 
@@ -18,9 +19,12 @@ class SignupResponse(BaseModel):
     message: str
 
 @router.post("/signup", response_model=SignupResponse, status_code=status.HTTP_201_CREATED)
-async def signup(request: SignupRequest):
+async def signup(
+    request: SignupRequest,
+    posthog: Posthog = Depends(posthog_client)
+):
     try:
-        auth_response = supabase.auth.sign_up({
+        auth_response = await db.run(supabase.auth.sign_up, {
             "email": request.email,
             "password": request.password,
             "options": {
@@ -43,21 +47,22 @@ async def signup(request: SignupRequest):
             "created_at": auth_response.user.created_at
         }
         
-        supabase.table("users").insert({
+        await db.execute(supabase.table("users").insert({
             "id": auth_response.user.id,
             "email": request.email,
             "role": request.role
-        }).execute()
+        }))
         
         if request.role == "creator":
-            supabase.table("creators").insert({
+            await db.execute(supabase.table("creators").insert({
                 "user_id": auth_response.user.id,
                 "bio": "",
                 "tiers": {},
                 "verified": False
-            }).execute()
+            }))
+            await creator_resolver.invalidate(auth_response.user.id)
         
-        posthog_client.capture(
+        posthog.capture(
             str(auth_response.user.id),
             'user_signup',
             {
@@ -71,6 +76,8 @@ async def signup(request: SignupRequest):
             message="Account created successfully. Please check your email to verify your account."
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
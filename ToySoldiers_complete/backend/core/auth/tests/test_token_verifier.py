@@ -0,0 +1,116 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from shared.auth import TokenVerifier
+
+SECRET = "test-secret"
+
+def make_token(secret: str = SECRET, expires_in: int = 3600, **claims) -> str:
+    payload = {
+        "sub": "user-1",
+        "aud": "authenticated",
+        "email": "fan@example.com",
+        "exp": int(time.time()) + expires_in,
+        "user_metadata": {"role": "fan"},
+    }
+    payload.update(claims)
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+class RemoteAuth:
+    """Stands in for supabase.auth.get_user."""
+
+    def __init__(self, user_id: str = "user-1", fail: bool = False):
+        self.user_id = user_id
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, token: str):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("invalid JWT")
+        return SimpleNamespace(user=SimpleNamespace(
+            id=self.user_id, email="fan@example.com", user_metadata={"role": "fan"}
+        ))
+
+def verify(verifier: TokenVerifier, token: str):
+    return asyncio.run(verifier.verify(token))
+
+def rejection(verifier: TokenVerifier, token: str) -> str:
+    with pytest.raises(HTTPException) as error:
+        verify(verifier, token)
+    assert error.value.status_code == 401
+    return error.value.detail
+
+def test_valid_token_is_verified_locally():
+    remote = RemoteAuth()
+    verifier = TokenVerifier(SECRET, remote_get_user=remote)
+    user = verify(verifier, make_token())
+    assert (user.id, user.email, user.role) == ("user-1", "fan@example.com", "fan")
+    assert remote.calls == 0
+    assert verifier.remote_calls == 0
+
+def test_verified_token_is_cached():
+    verifier = TokenVerifier(SECRET)
+    token = make_token()
+    verify(verifier, token)
+    verify(verifier, token)
+    assert verifier.cache.hits == 1
+
+def test_cache_entry_does_not_outlive_token():
+    verifier = TokenVerifier(SECRET, cache_ttl=300)
+    verify(verifier, make_token(expires_in=30))
+    assert verifier.cache.stats()["size"] == 1
+    entry = next(iter(verifier.cache._data.values()))
+    assert entry[0] - time.monotonic() <= 30
+
+def test_bad_signature_is_rejected_without_remote_call():
+    remote = RemoteAuth()
+    verifier = TokenVerifier(SECRET, remote_get_user=remote)
+    assert rejection(verifier, make_token(secret="other-secret")) == "Invalid token"
+    assert remote.calls == 0
+
+def test_expired_token_is_rejected_without_remote_call():
+    remote = RemoteAuth()
+    verifier = TokenVerifier(SECRET, remote_get_user=remote)
+    assert rejection(verifier, make_token(expires_in=-60)) == "Token expired"
+    assert remote.calls == 0
+
+def test_wrong_audience_is_rejected():
+    verifier = TokenVerifier(SECRET, remote_get_user=RemoteAuth())
+    assert rejection(verifier, make_token(aud="anon")) == "Invalid token"
+
+def test_without_secret_tokens_are_verified_remotely():
+    remote = RemoteAuth(user_id="user-2")
+    verifier = TokenVerifier("", remote_get_user=remote)
+    token = make_token(secret="unknown")
+    assert verify(verifier, token).id == "user-2"
+    verify(verifier, token)
+    assert remote.calls == 1
+    assert verifier.remote_calls == 1
+
+def test_remote_rejection_is_unauthorized():
+    verifier = TokenVerifier("", remote_get_user=RemoteAuth(fail=True))
+    assert rejection(verifier, make_token()) == "Invalid token"
+
+def test_without_secret_or_remote_everything_is_rejected():
+    verifier = TokenVerifier("")
+    assert rejection(verifier, make_token()) == "Invalid token"
+
+def test_revoked_user_is_rejected_even_when_cached():
+    verifier = TokenVerifier(SECRET)
+    token = make_token()
+    verify(verifier, token)
+    asyncio.run(verifier.revoke_user("user-1"))
+    assert rejection(verifier, token) == "Token revoked"
+
+def test_revocation_from_another_process_is_applied():
+    verifier = TokenVerifier(SECRET)
+    token = make_token()
+    verify(verifier, token)
+    verifier._on_revocation({"data": "user-1"})
+    assert rejection(verifier, token) == "Token revoked"
@@ -0,0 +1,332 @@
+"""Fixtures shared by every service's tests (auth, payments, content_api)."""
+import asyncio
+import os
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+CORE = os.path.dirname(os.path.abspath(__file__))
+
+# shared.* is imported from backend/core
+if CORE not in sys.path:
+    sys.path.insert(0, CORE)
+
+def pytest_collectstart(collector):
+    # Service modules import each other as top-level modules (`from main
+    # import ...`), so a test module needs its own service directory on the path
+    if not isinstance(collector, pytest.Module):
+        return
+    service_dir = os.path.join(CORE, collector.path.relative_to(CORE).parts[0])
+    if service_dir not in sys.path:
+        sys.path.insert(0, service_dir)
+
+class Clock:
+    """Manually advanced clock: call it, or use it as the `time` module via monotonic()/time()."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+class FakeRedis:
+    """In-memory stand-in for the synchronous redis client the caches use.
+
+    Records every command issued from a thread running an event loop in
+    `on_loop`, so tests can assert that redis is only called off the loop.
+    register_script() only implements the timeline push script.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.sets = {}
+        self.published = []
+        self.commands = []
+        self.on_loop = []
+        self._lock = threading.Lock()
+
+    def _record(self, name: str) -> None:
+        self.commands.append(name)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.on_loop.append(name)
+
+    def get(self, key):
+        self._record("get")
+        return self.values.get(key)
+
+    def mget(self, *keys):
+        self._record("mget")
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self._record("set")
+        with self._lock:
+            self.values[key] = str(value)
+
+    def delete(self, *keys):
+        self._record("delete")
+        with self._lock:
+            for key in keys:
+                self.values.pop(key, None)
+                self.zsets.pop(key, None)
+                self.sets.pop(key, None)
+
+    def exists(self, key):
+        self._record("exists")
+        return int(key in self.values or key in self.zsets or key in self.sets)
+
+    def expire(self, key, ttl):
+        self._record("expire")
+        return True
+
+    def publish(self, channel, message):
+        self._record("publish")
+        self.published.append((channel, message))
+
+    def sadd(self, key, *members):
+        self._record("sadd")
+        with self._lock:
+            self.sets.setdefault(key, set()).update(members)
+
+    def srem(self, key, *members):
+        self._record("srem")
+        with self._lock:
+            self.sets.get(key, set()).difference_update(members)
+
+    def sismember(self, key, member):
+        self._record("sismember")
+        return member in self.sets.get(key, set())
+
+    def zadd(self, key, mapping):
+        self._record("zadd")
+        with self._lock:
+            self.zsets.setdefault(key, {}).update({member: float(score) for member, score in mapping.items()})
+
+    def zcount(self, key, low, high):
+        self._record("zcount")
+        return sum(1 for score in self.zsets.get(key, {}).values() if low <= score <= high)
+
+    def zrevrangebyscore(self, key, high, low, start=0, num=None, withscores=False):
+        self._record("zrevrangebyscore")
+        high = float("inf") if high == "+inf" else float(high)
+        low = float("-inf") if low == "-inf" else float(low)
+        entries = sorted(
+            ((score, member) for member, score in self.zsets.get(key, {}).items() if low <= score <= high),
+            reverse=True
+        )[start:None if num is None else start + num]
+        return [(member, score) if withscores else member for score, member in entries]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        def push(keys, args, client=None):
+            if client is not None:
+                client._queue(lambda: push(keys, args))
+                return None
+            self._record("evalsha")
+            key, (score, member, max_length) = keys[0], args
+            with self._lock:
+                if key in self.zsets:
+                    zset = self.zsets[key]
+                    zset[member] = float(score)
+                    for _, stale in sorted((s, m) for m, s in zset.items())[:max(0, len(zset) - int(max_length))]:
+                        del zset[stale]
+            return 0
+        return push
+
+    def close(self):
+        pass
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def _queue(self, op):
+        self.ops.append(op)
+        return self
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        return lambda *args, **kwargs: self._queue(lambda: command(*args, **kwargs))
+
+    def execute(self):
+        ops, self.ops = self.ops, []
+        return [op() for op in ops]
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+def _sort_key(row: dict, columns):
+    return tuple("" if row.get(column) is None else row.get(column) for column in columns)
+
+class FakeQuery:
+    """The subset of the postgrest-py builder the services use, over FakeDatabase tables."""
+
+    def __init__(self, database, table: str):
+        self.database = database
+        self.table = table
+        self.action = "select"
+        self.payload = None
+        self.filters = []
+        self.ordering = None
+        self.row_limit = None
+        self.row_offset = 0
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.count = None
+
+    def select(self, columns="*", count=None):
+        self.count = count
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict="id", ignore_duplicates=False):
+        self.action, self.payload = "upsert", rows
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values):
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) == str(value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) != str(value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def in_(self, column, values):
+        values = {str(value) for value in values}
+        self.filters.append(lambda row: str(row.get(column)) in values)
+        return self
+
+    def contains(self, column, values):
+        self.filters.append(lambda row: set(values) <= set(row.get(column) or []))
+        return self
+
+    def order(self, column, desc=False):
+        # "created_at.desc,id" orders on both keys in one direction
+        self.ordering = ([part.split(".")[0] for part in column.split(",")], desc)
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def offset(self, n):
+        self.row_offset = n
+        return self
+
+    def _matches(self, row: dict) -> bool:
+        return all(check(row) for check in self.filters)
+
+    def execute(self):
+        rows = self.database.tables.setdefault(self.table, [])
+        if self.action in ("insert", "upsert"):
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            written = []
+            for new in payload:
+                key = self.on_conflict or "id"
+                existing = next((row for row in rows if key in new and row.get(key) == new[key]), None)
+                if existing is not None:
+                    if self.action == "insert":
+                        raise RuntimeError(f"duplicate key value violates unique constraint on {self.table}.{key}")
+                    if self.ignore_duplicates:
+                        continue
+                    existing.update(new)
+                    written.append(dict(existing))
+                    continue
+                row = dict(new)
+                row.setdefault("id", str(uuid.uuid4()))
+                row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+                rows.append(row)
+                written.append(dict(row))
+            return SimpleNamespace(data=written, count=None)
+        matched = [row for row in rows if self._matches(row)]
+        if self.action == "update":
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=[dict(row) for row in matched], count=None)
+        if self.action == "delete":
+            self.database.tables[self.table] = [row for row in rows if not self._matches(row)]
+            return SimpleNamespace(data=[dict(row) for row in matched], count=None)
+        if self.ordering:
+            columns, desc = self.ordering
+            matched.sort(key=lambda row: _sort_key(row, columns), reverse=desc)
+        total = len(matched)
+        matched = matched[self.row_offset:]
+        if self.row_limit is not None:
+            matched = matched[:self.row_limit]
+        return SimpleNamespace(data=[dict(row) for row in matched], count=total if self.count else None)
+
+class FakeRpc:
+    def __init__(self, fn, params):
+        self.fn = fn
+        self.params = params
+
+    def execute(self):
+        return SimpleNamespace(data=self.fn(**self.params), count=None)
+
+class FakeDatabase:
+    """In-memory shared.db.Database: table() builds queries, execute() runs them.
+
+    Exceptions queued in `failures` are raised by the next execute() calls
+    instead of running the query; register RPCs in `functions`.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.functions = {}
+        self.failures = []
+        self.executed = []
+        self.client = self
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> FakeRpc:
+        return FakeRpc(self.functions[name], params)
+
+    async def execute(self, query, timeout=None):
+        self.executed.append(query)
+        if self.failures:
+            raise self.failures.pop(0)
+        return query.execute()
+
+@pytest.fixture
+def fake_db():
+    return FakeDatabase()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import date
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.date32()),
+    ("user_id", pa.string()),
+    ("content_id", pa.string()),
+    ("view_count", pa.int32()),
+    ("duration", pa.float64()),
+    ("device_type", pa.string()),
+    ("referrer", pa.string()),
+])
+
+class AnalyticsArchiver:
+    """Retires old analytics_views partitions to R2 as Parquet.
+
+    Each run creates upcoming monthly partitions, detaches months older than
+    `keep_months` into the analytics_archive schema (migration 008), then
+    exports every archived month: rows are paged out by id, written as zstd
+    Parquet to a temp file and uploaded to
+    `{prefix}/year=YYYY/month=MM/<partition>.parquet`. A month is dropped
+    only after the uploaded object's size matches; a failed export leaves it
+    in analytics_archive and it is retried on the next run.
+    """
+
+    def __init__(
+        self,
+        db,
+        s3,
+        bucket: str,
+        keep_months: int = 13,
+        prefix: str = "analytics_views",
+        page_size: int = 1000,
+    ):
+        self.db = db
+        self.s3 = s3
+        self.bucket = bucket
+        self.keep_months = keep_months
+        self.prefix = prefix
+        # PostgREST caps rows per response (1000 on Supabase by default)
+        self.page_size = page_size
+
+    def object_key(self, partition: str) -> str:
+        year, month = partition.rsplit("_", 2)[-2:]
+        return f"{self.prefix}/year={year}/month={month}/{partition}.parquet"
+
+    async def _rpc(self, fn: str, params: dict) -> Any:
+        result = await self.db.execute(self.db.client.rpc(fn, params))
+        return result.data
+
+    async def _write_parquet(self, partition: str, path: str) -> int:
+        rows = 0
+        after_id = 0
+        writer = pq.ParquetWriter(path, SCHEMA, compression="zstd")
+        try:
+            while True:
+                page = await self._rpc("archived_analytics_rows", {
+                    "p_partition": partition,
+                    "p_after_id": after_id,
+                    "p_limit": self.page_size
+                })
+                if not page:
+                    break
+                for row in page:
+                    row["date"] = date.fromisoformat(row["date"])
+                await asyncio.to_thread(writer.write_table, pa.Table.from_pylist(page, schema=SCHEMA))
+                rows += len(page)
+                after_id = page[-1]["id"]
+        finally:
+            writer.close()
+        return rows
+
+    async def export(self, partition: str) -> dict:
+        key = self.object_key(partition)
+        with tempfile.TemporaryDirectory(prefix="analytics-archive-") as workdir:
+            path = os.path.join(workdir, f"{partition}.parquet")
+            rows = await self._write_parquet(partition, path)
+            size = os.path.getsize(path)
+            # upload_file switches to multipart on its own for large months
+            await asyncio.to_thread(self.s3.upload_file, path, self.bucket, key)
+
+        head = await asyncio.to_thread(self.s3.head_object, Bucket=self.bucket, Key=key)
+        if head["ContentLength"] != size:
+            raise RuntimeError(f"{key}: uploaded {head['ContentLength']} bytes, wrote {size}")
+
+        await self._rpc("drop_archived_analytics_partition", {
+            "p_partition": partition,
+            "p_object_key": key,
+            "p_row_count": rows
+        })
+        return {"partition": partition, "key": key, "rows": rows, "bytes": size}
+
+    async def run(self) -> dict:
+        created = await self._rpc("ensure_analytics_partitions", {})
+        detached = await self._rpc("detach_analytics_partitions", {"p_keep_months": self.keep_months})
+        exported = []
+        failed = []
+
+        for partition in await self._rpc("archived_analytics_partitions", {}) or []:
+            try:
+                exported.append(await self.export(partition))
+                logger.info("archived %s", exported[-1])
+            except Exception as e:
+                failed.append(partition)
+                logger.error("could not archive %s, will retry next run: %s", partition, e)
+
+        return {"created": created, "detached": detached, "exported": exported, "failed": failed}
+
+if __name__ == "__main__":
+    # Daily from the analytics_archiver service in docker-compose.yml:
+    #   python analytics_archive.py
+    import json
+    from main import settings, db, r2_client
+
+    logging.basicConfig(level=logging.INFO)
+    archiver = AnalyticsArchiver(
+        db,
+        r2_client,
+        bucket=settings.r2_bucket_analytics,
+        keep_months=settings.analytics_retention_months
+    )
+    try:
+        summary = asyncio.run(archiver.run())
+    finally:
+        db.close()
+    print(json.dumps(summary, default=str))
+    raise SystemExit(1 if summary["failed"] else 0)
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from shared.cache import TTLCache
+from shared.pagination import keyset, encode_cursor, decode_cursor
+
+try:
+    import redis
+except ImportError:  # redis is optional; the in-process cache still works
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "feed:invalidate"
+
+class FeedCache:
+    """Caches the newest `window` rows of each feed (visibility, tag set).
+
+    Any page that falls inside the window - first page or a cursor/offset
+    into it - is sliced from memory; deeper pages go to the database. Entries
+    are fresh for `fresh_ttl` seconds and are then served stale for up to
+    `stale_ttl` while one background task per key refetches them, so readers
+    only wait on a cold key. invalidate() (called on upload/delete) marks a
+    visibility's entries stale instead of dropping them. With redis the
+    windows are shared between processes and invalidations are broadcast;
+    redis calls run in a thread so they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        db,
+        redis_url: Optional[str] = None,
+        window: int = 100,
+        fresh_ttl: float = 15.0,
+        stale_ttl: float = 300.0,
+        maxsize: int = 1000,
+    ):
+        self.db = db
+        self.window = window
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=stale_ttl)
+        self.invalidated_at: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.refreshes = 0
+        self.redis = None
+        self._listener = None
+
+        if redis_url and redis is not None:
+            try:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25, decode_responses=True)
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_listener_error,
+                )
+            except Exception as e:
+                logger.warning("feed cache running without redis: %s", e)
+                self.redis = None
+
+    @staticmethod
+    def _key(visibility: str, tags: List[str]) -> str:
+        return f"feed:{visibility}:{','.join(tags)}"
+
+    def _on_invalidation(self, message) -> None:
+        self.invalidated_at[str(message["data"])] = time.time()
+
+    def _on_listener_error(self, error, pubsub, thread) -> None:
+        # Missed invalidations are bounded by fresh_ttl; keep listening
+        logger.warning("feed cache invalidation listener error: %s", error)
+
+    def _is_fresh(self, entry: dict, visibility: str) -> bool:
+        return (
+            time.time() - entry["fetched_at"] < self.fresh_ttl
+            and entry["fetched_at"] >= self.invalidated_at.get(visibility, 0.0)
+        )
+
+    async def _from_redis(self, key: str, visibility: str) -> Optional[dict]:
+        try:
+            raw, invalidated = await asyncio.to_thread(self.redis.mget, key, f"feed:invalidated:{visibility}")
+        except Exception:
+            return None
+        if invalidated:
+            self.invalidated_at[visibility] = max(self.invalidated_at.get(visibility, 0.0), float(invalidated))
+        return json.loads(raw) if raw else None
+
+    async def _fetch(self, key: str, visibility: str, tags: List[str]) -> dict:
+        self.refreshes += 1
+        fetched_at = time.time()
+        query = self.db.table("content").select("*").eq("visibility", visibility)
+        if tags:
+            query = query.contains("tags", tags)
+        result = await self.db.execute(keyset(query, None, self.window))
+
+        entry = {
+            "rows": result.data[:self.window],
+            "complete": len(result.data) <= self.window,
+            "fetched_at": fetched_at,
+        }
+        self.local.set(key, entry)
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(self.redis.set, key, json.dumps(entry), ex=int(self.stale_ttl))
+            except Exception as e:
+                logger.warning("feed cache redis write failed: %s", e)
+        return entry
+
+    def _refresh(self, key: str, visibility: str, tags: List[str]) -> asyncio.Task:
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, visibility, tags))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda done: self._refreshed(key, done))
+        return task
+
+    def _refreshed(self, key: str, task: asyncio.Task) -> None:
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("feed cache refresh of %s failed: %s", key, task.exception())
+
+    async def _entry(self, visibility: str, tags: List[str]) -> dict:
+        key = self._key(visibility, tags)
+        entry = self.local.get(key)
+        if entry is None and self.redis is not None:
+            entry = await self._from_redis(key, visibility)
+            if entry is not None:
+                self.local.set(key, entry, ttl=self.stale_ttl - (time.time() - entry["fetched_at"]))
+
+        if entry is None:
+            self.misses += 1
+            # Concurrent misses on the same key share one query
+            return await asyncio.shield(self._refresh(key, visibility, tags))
+
+        if self._is_fresh(entry, visibility):
+            self.fresh_hits += 1
+        else:
+            self.stale_hits += 1
+            self._refresh(key, visibility, tags)
+        return entry
+
+    async def page(
+        self,
+        visibility: str,
+        tags: List[str],
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+    ) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """(rows, next_cursor) for a feed page, or None if it lies outside the window."""
+        if not cursor and offset + limit > self.window:
+            self.bypassed += 1
+            return None
+
+        entry = await self._entry(visibility, sorted(set(tags)))
+        rows = entry["rows"]
+        start = offset
+
+        if cursor:
+            _, row_id = decode_cursor(cursor)
+            start = next((i + 1 for i, row in enumerate(rows) if str(row["id"]) == row_id), None)
+            if start is None:
+                self.bypassed += 1
+                return None
+
+        if start + limit > len(rows) and not entry["complete"]:
+            self.bypassed += 1
+            return None
+
+        items = rows[start:start + limit]
+        has_more = start + limit < len(rows) or not entry["complete"]
+        return items, encode_cursor(items[-1]) if items and has_more else None
+
+    async def invalidate(self, visibility: str) -> None:
+        now = time.time()
+        self.invalidated_at[visibility] = now
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(self._broadcast, visibility, now)
+            except Exception as e:
+                logger.warning("feed cache invalidation not broadcast: %s", e)
+
+    def _broadcast(self, visibility: str, invalidated_at: float) -> None:
+        self.redis.set(f"feed:invalidated:{visibility}", invalidated_at, ex=int(self.stale_ttl))
+        self.redis.publish(INVALIDATION_CHANNEL, visibility)
+
+    def close(self) -> None:
+        for task in self._refreshing.values():
+            task.cancel()
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self.redis is not None:
+            self.redis.close()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.local),
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "refreshes": self.refreshes,
+        }
@@ -2,28 +2,63 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic_settings import BaseSettings
 from supabase import create_client, Client
+from shared.auth import TokenVerifier
+from shared.clients import Lifespan, boto_config
+from shared.creators import CreatorResolver
+from shared.db import Database, client_options
+from storage import R2Uploader, MiB
+from feed_cache import FeedCache
+from view_ingest import ViewIngestor
+from playback import PlaybackCache
+from timelines import Timelines
+import asyncio
 import boto3
 import os
 
 class Settings(BaseSettings):
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_service_role_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+    jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "")
+    redis_url: str = os.getenv("REDIS_URL", "")
+    database_max_concurrency: int = int(os.getenv("DATABASE_MAX_CONCURRENCY", "16"))
+    database_timeout: float = float(os.getenv("DATABASE_TIMEOUT", "10"))
+    database_prewarm_connections: int = int(os.getenv("DATABASE_PREWARM_CONNECTIONS", "4"))
     cloudflare_account_id: str = os.getenv("CLOUDFLARE_ACCOUNT_ID", "")
     cloudflare_r2_access_key: str = os.getenv("CLOUDFLARE_R2_ACCESS_KEY", "")
     cloudflare_r2_secret_key: str = os.getenv("CLOUDFLARE_R2_SECRET_KEY", "")
     r2_bucket_audio: str = os.getenv("R2_BUCKET_AUDIO", "toysoldiers-audio")
     r2_bucket_video: str = os.getenv("R2_BUCKET_VIDEO", "toysoldiers-video")
     r2_bucket_thumbnails: str = os.getenv("R2_BUCKET_THUMBNAILS", "toysoldiers-thumbnails")
+    r2_bucket_analytics: str = os.getenv("R2_BUCKET_ANALYTICS", "toysoldiers-analytics")
+    r2_upload_part_size_mb: int = int(os.getenv("R2_UPLOAD_PART_SIZE_MB", "8"))
+    r2_upload_concurrency: int = int(os.getenv("R2_UPLOAD_CONCURRENCY", "4"))
+    r2_presign_expiry: int = int(os.getenv("R2_PRESIGN_EXPIRY", "3600"))
+    upload_token_secret: str = os.getenv("UPLOAD_TOKEN_SECRET", "")
+    r2_endpoint_url: str = os.getenv("R2_ENDPOINT_URL", "")
+    r2_max_pool_connections: int = int(os.getenv("R2_MAX_POOL_CONNECTIONS", "32"))
+    feed_cache_rows: int = int(os.getenv("FEED_CACHE_ROWS", "100"))
+    feed_cache_fresh_ttl: float = float(os.getenv("FEED_CACHE_FRESH_TTL", "15"))
+    feed_cache_stale_ttl: float = float(os.getenv("FEED_CACHE_STALE_TTL", "300"))
+    playback_cache_ttl: float = float(os.getenv("PLAYBACK_CACHE_TTL", "300"))
+    stream_url_expiry: int = int(os.getenv("STREAM_URL_EXPIRY", "900"))
+    timeline_fanout_threshold: int = int(os.getenv("TIMELINE_FANOUT_THRESHOLD", "10000"))
+    timeline_max_length: int = int(os.getenv("TIMELINE_MAX_LENGTH", "800"))
+    view_queue_size: int = int(os.getenv("VIEW_QUEUE_SIZE", "10000"))
+    view_batch_size: int = int(os.getenv("VIEW_BATCH_SIZE", "500"))
+    view_flush_interval: float = float(os.getenv("VIEW_FLUSH_INTERVAL", "1"))
+    analytics_retention_months: int = int(os.getenv("ANALYTICS_RETENTION_MONTHS", "13"))
     
     class Config:
         env_file = ".env"
 
 settings = Settings()
+lifespan = Lifespan()
 
 app = FastAPI(
     title="Toy Soldiers Content API",
     description="Content management, upload, and streaming service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -34,14 +69,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
+supabase: Client = create_client(
+    settings.supabase_url,
+    settings.supabase_service_role_key,
+    options=client_options(settings.database_timeout)
+)
+db = Database(supabase, max_concurrency=settings.database_max_concurrency, timeout=settings.database_timeout)
+lifespan.on_warm(lambda: db.warm(settings.database_prewarm_connections))
+lifespan.on_shutdown(db.close)
+
+token_verifier = TokenVerifier(
+    settings.jwt_secret_key,
+    remote_get_user=supabase.auth.get_user,
+    redis_url=settings.redis_url
+)
+lifespan.on_shutdown(token_verifier.close)
+get_current_user = token_verifier.current_user()
+get_optional_user = token_verifier.optional_user()
+creator_resolver = CreatorResolver(db, redis_url=settings.redis_url)
+lifespan.on_shutdown(creator_resolver.close)
+feed_cache = FeedCache(
+    db,
+    redis_url=settings.redis_url,
+    window=settings.feed_cache_rows,
+    fresh_ttl=settings.feed_cache_fresh_ttl,
+    stale_ttl=settings.feed_cache_stale_ttl
+)
+lifespan.on_shutdown(feed_cache.close)
+playback_cache = PlaybackCache(
+    db,
+    redis_url=settings.redis_url,
+    ttl=settings.playback_cache_ttl
+)
+lifespan.on_shutdown(playback_cache.close)
+timelines = Timelines(
+    db,
+    redis_url=settings.redis_url,
+    fanout_threshold=settings.timeline_fanout_threshold,
+    max_length=settings.timeline_max_length
+)
+lifespan.on_shutdown(timelines.close)
+lifespan.on_shutdown(timelines.drain)
+view_ingestor = ViewIngestor(
+    db,
+    max_queue=settings.view_queue_size,
+    batch_size=settings.view_batch_size,
+    flush_interval=settings.view_flush_interval
+)
+lifespan.on_startup(view_ingestor.start)
+lifespan.on_shutdown(view_ingestor.drain)
+
+# R2_ENDPOINT_URL points at a local S3 stand-in (e.g. MinIO) for development
+r2_endpoint = settings.r2_endpoint_url or f'https://{settings.cloudflare_account_id}.r2.cloudflarestorage.com'
 
 r2_client = boto3.client(
     's3',
-    endpoint_url=f'https://{settings.cloudflare_account_id}.r2.cloudflarestorage.com',
+    endpoint_url=r2_endpoint,
     aws_access_key_id=settings.cloudflare_r2_access_key,
-    aws_secret_access_key=settings.cloudflare_r2_secret_key
+    aws_secret_access_key=settings.cloudflare_r2_secret_key,
+    config=boto_config(settings.r2_max_pool_connections)
+)
+lifespan.on_shutdown(r2_client.close)
+r2_uploader = R2Uploader(
+    r2_client,
+    part_size=settings.r2_upload_part_size_mb * MiB,
+    max_pending_parts=settings.r2_upload_concurrency
 )
+lifespan.on_shutdown(r2_uploader.close)
+
+async def warm_r2() -> None:
+    # Opens a pooled connection per bucket; boto3 connects lazily otherwise
+    buckets = (settings.r2_bucket_video, settings.r2_bucket_audio, settings.r2_bucket_thumbnails)
+    await asyncio.gather(*(asyncio.to_thread(r2_client.head_bucket, Bucket=bucket) for bucket in buckets))
+
+lifespan.on_warm(warm_r2)
 
 from routes import upload, feed, player, analytics
 
@@ -55,7 +156,17 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "content_api",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "caches": {
+            "tokens": token_verifier.stats(),
+            "creators": creator_resolver.stats(),
+            "feed": feed_cache.stats(),
+            "playback": playback_cache.stats()
+        },
+        "timelines": timelines.stats(),
+        "views": view_ingestor.stats(),
+        "database": db.stats(),
+        "warmed": lifespan.warmed
     }
 
 @app.get("/")
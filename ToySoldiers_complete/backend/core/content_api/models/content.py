@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 from datetime import datetime
 import uuid
@@ -15,6 +15,7 @@ class Content(BaseModel):
     visibility: Literal["public", "unlisted", "private"] = "public"
     duration: Optional[int] = None
     file_size: Optional[int] = None
+    checksum: Optional[str] = None
     created_at: datetime = datetime.utcnow()
     updated_at: datetime = datetime.utcnow()
     
@@ -48,3 +49,27 @@ class ContentUpdate(BaseModel):
     description: Optional[str] = None
     tags: Optional[List[str]] = None
     visibility: Optional[Literal["public", "unlisted", "private"]] = None
+
+class UploadInitiate(BaseModel):
+    filename: str
+    content_type: str
+    file_size: int = Field(..., gt=0)
+
+class UploadTicket(BaseModel):
+    content_id: uuid.UUID
+    upload_token: str
+    part_size: int
+    urls: List[str]
+    expires_in: int
+
+class UploadedPart(BaseModel):
+    part_number: int = Field(..., ge=1)
+    etag: str
+
+class UploadComplete(BaseModel):
+    upload_token: str
+    parts: List[UploadedPart] = []
+    title: str
+    description: Optional[str] = None
+    tags: List[str] = []
+    visibility: Literal["public", "unlisted", "private"] = "public"
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional
+
+from shared.cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # redis is optional; the in-process cache still works
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "playback:invalidate"
+PLAYBACK_COLUMNS = "id,visibility,title,duration,stream_url,media_url"
+_NOT_FOUND = {}
+
+class PlaybackCache:
+    """Cached content id -> the few columns a play start needs.
+
+    Lookups go local LRU -> redis (when configured) -> Supabase, reading only
+    PLAYBACK_COLUMNS; concurrent misses for one id share a single query and
+    unknown ids are cached for `negative_ttl`. Call invalidate() when content
+    is updated or deleted; with redis it is broadcast to every process.
+    Changes made outside content_api are picked up within `ttl`. Redis calls
+    run in a thread so they never block the event loop.
+    """
+
+    def __init__(
+        self,
+        db,
+        redis_url: Optional[str] = None,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        maxsize: int = 10000,
+    ):
+        self.db = db
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._invalidations = 0
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.db_lookups = 0
+        self.redis = None
+        self._listener = None
+
+        if redis_url and redis is not None:
+            try:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25, decode_responses=True)
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_listener_error,
+                )
+            except Exception as e:
+                logger.warning("playback cache running without redis: %s", e)
+                self.redis = None
+
+    @staticmethod
+    def _key(content_id: str) -> str:
+        return f"playback:{content_id}"
+
+    def _on_invalidation(self, message) -> None:
+        self._invalidations += 1
+        self.local.pop(str(message["data"]))
+
+    def _on_listener_error(self, error, pubsub, thread) -> None:
+        # Missed invalidations are bounded by the local TTL; keep listening
+        logger.warning("playback cache invalidation listener error: %s", error)
+
+    async def _load(self, content_id: str) -> Optional[dict]:
+        self.db_lookups += 1
+        invalidations = self._invalidations
+        content_data = await self.db.execute(
+            self.db.table("content").select(PLAYBACK_COLUMNS).eq("id", content_id)
+        )
+        content = content_data.data[0] if content_data.data else None
+        if invalidations != self._invalidations:
+            # Something was invalidated mid-query; this row may predate it
+            return content
+
+        ttl = self.ttl if content else self.negative_ttl
+        self.local.set(content_id, content or _NOT_FOUND, ttl=ttl)
+        if self.redis is not None:
+            try:
+                key = self._key(content_id)
+                await asyncio.to_thread(self.redis.set, key, json.dumps(content or _NOT_FOUND), ex=int(ttl))
+                if invalidations != self._invalidations:
+                    # An invalidation's delete may have landed before this write
+                    await asyncio.to_thread(self.redis.delete, key)
+            except Exception as e:
+                logger.warning("playback cache redis write failed: %s", e)
+        return content
+
+    def _loaded(self, content_id: str, task: asyncio.Task) -> None:
+        if self._loading.get(content_id) is task:
+            del self._loading[content_id]
+
+    async def get(self, content_id: str) -> Optional[dict]:
+        content_id = str(content_id)
+        cached = self.local.get(content_id)
+        if cached is not None:
+            return cached or None
+
+        if self.redis is not None:
+            invalidations = self._invalidations
+            try:
+                raw = await asyncio.to_thread(self.redis.get, self._key(content_id))
+            except Exception:
+                raw = None
+            if raw is not None:
+                self.redis_hits += 1
+                content = json.loads(raw)
+                if invalidations == self._invalidations:
+                    self.local.set(content_id, content, ttl=self.ttl if content else self.negative_ttl)
+                return content or None
+            self.redis_misses += 1
+
+        task = self._loading.get(content_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(content_id))
+            self._loading[content_id] = task
+            task.add_done_callback(lambda done: self._loaded(content_id, done))
+        return await asyncio.shield(task)
+
+    async def invalidate(self, content_id: str) -> None:
+        content_id = str(content_id)
+        self._invalidations += 1
+        self._loading.pop(content_id, None)
+        self.local.pop(content_id)
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(self._broadcast, content_id)
+            except Exception as e:
+                logger.warning("playback cache invalidation not broadcast: %s", e)
+
+    def _broadcast(self, content_id: str) -> None:
+        self.redis.delete(self._key(content_id))
+        self.redis.publish(INVALIDATION_CHANNEL, content_id)
+
+    def close(self) -> None:
+        for task in self._loading.values():
+            task.cancel()
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self.redis is not None:
+            self.redis.close()
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "db_lookups": self.db_lookups,
+        }
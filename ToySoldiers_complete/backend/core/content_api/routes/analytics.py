@@ -1,81 +1,157 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from pydantic import BaseModel
-from typing import Optional
-from main import supabase
-from datetime import datetime
+from typing import List, Literal, Optional
+from main import supabase, db, get_current_user, get_optional_user, view_ingestor, creator_resolver
+from shared.auth import AuthUser
+from datetime import date, datetime
+import uuid
 
 router = APIRouter()
 
 class ViewEvent(BaseModel):
-    content_id: str
+    content_id: uuid.UUID
     duration: Optional[float] = None
     device_type: Optional[str] = None
     referrer: Optional[str] = None
 
-@router.post("/analytics/view")
+MAX_EVENTS_PER_REQUEST = 500
+
+def view_row(event: ViewEvent, user: Optional[AuthUser]) -> dict:
+    return {
+        "date": datetime.utcnow().date().isoformat(),
+        "user_id": user.id if user else None,
+        "content_id": str(event.content_id),
+        "view_count": 1,
+        "duration": event.duration,
+        "device_type": event.device_type,
+        "referrer": event.referrer
+    }
+
+def enqueue_views(rows: List[dict]) -> None:
+    # Rows are written in batches by view_ingestor; a full buffer means back off
+    if not view_ingestor.offer(rows):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="View ingestion is busy, retry later",
+            headers={"Retry-After": "1"}
+        )
+
+@router.post("/analytics/view", status_code=status.HTTP_202_ACCEPTED)
 async def track_view(
     event: ViewEvent,
-    authorization: str = Header(None)
+    user: Optional[AuthUser] = Depends(get_optional_user)
+):
+    enqueue_views([view_row(event, user)])
+    
+    return {"status": "accepted", "message": "View queued"}
+
+@router.post("/analytics/views", status_code=status.HTTP_202_ACCEPTED)
+async def track_views(
+    events: List[ViewEvent],
+    user: Optional[AuthUser] = Depends(get_optional_user)
+):
+    if len(events) > MAX_EVENTS_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_EVENTS_PER_REQUEST} events per request"
+        )
+    
+    enqueue_views([view_row(event, user) for event in events])
+    
+    return {"status": "accepted", "accepted": len(events)}
+
+@router.get("/analytics/content/{content_id}")
+async def get_content_analytics(
+    content_id: uuid.UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    breakdown: Optional[Literal["device"]] = Query(None),
+    user: AuthUser = Depends(get_current_user)
 ):
     try:
-        user_id = None
-        if authorization:
-            token = authorization.replace("Bearer ", "")
-            user_response = supabase.auth.get_user(token)
-            if user_response.user:
-                user_id = str(user_response.user.id)
+        # Reads the daily rollups kept by the analytics_views trigger (migration 007)
+        rollups = await db.execute(
+            supabase.rpc("content_analytics", {
+                "p_content_id": str(content_id),
+                "p_start": start_date.isoformat() if start_date else None,
+                "p_end": end_date.isoformat() if end_date else None
+            })
+        )
         
-        view_data = {
-            "date": datetime.utcnow().date().isoformat(),
-            "user_id": user_id,
-            "content_id": event.content_id,
-            "view_count": 1,
-            "duration": event.duration,
-            "device_type": event.device_type,
-            "referrer": event.referrer
+        devices = {
+            row["device_type"] or "unknown": {
+                "views": int(row["views"]),
+                "watch_time": float(row["watch_time"])
+            }
+            for row in rollups.data
         }
+        total_views = sum(d["views"] for d in devices.values())
+        total_duration = sum(d["watch_time"] for d in devices.values())
         
-        supabase.table("analytics_views").insert(view_data).execute()
+        analytics = {
+            "content_id": str(content_id),
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_views": total_views,
+            "total_watch_time": total_duration,
+            "average_watch_time": total_duration / total_views if total_views > 0 else 0
+        }
+        if breakdown == "device":
+            for d in devices.values():
+                d["average_watch_time"] = d["watch_time"] / d["views"] if d["views"] > 0 else 0
+            analytics["devices"] = devices
         
-        return {"status": "success", "message": "View tracked"}
+        return analytics
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to track view: {str(e)}"
+            detail=f"Failed to get analytics: {str(e)}"
         )
 
-@router.get("/analytics/content/{content_id}")
-async def get_content_analytics(
-    content_id: str,
-    authorization: str = Header(None)
+@router.get("/analytics/dashboard")
+async def get_creator_dashboard(
+    user: AuthUser = Depends(get_current_user)
 ):
     try:
-        if not authorization:
+        creator_id = await creator_resolver.resolve_id(user.id)
+        
+        if not creator_id:
             raise HTTPException(
-                status_code=401,
-                detail="Authentication required"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a creator account"
             )
         
-        views_data = supabase.table("analytics_views") \
-            .select("*") \
-            .eq("content_id", content_id) \
-            .execute()
-        
-        total_views = len(views_data.data)
-        total_duration = sum(v.get("duration", 0) or 0 for v in views_data.data)
+        # One primary-key read; creator_stats is kept current by triggers (migration 009)
+        stats = await db.execute(
+            supabase.table("creator_stats")
+            .select("*")
+            .eq("creator_id", creator_id)
+            .limit(1)
+        )
         
-        return {
-            "content_id": content_id,
-            "total_views": total_views,
-            "total_watch_time": total_duration,
-            "average_watch_time": total_duration / total_views if total_views > 0 else 0
+        # Every creator gets a row on insert; default to zeros all the same
+        dashboard = stats.data[0] if stats.data else {
+            "creator_id": creator_id,
+            "total_content": 0,
+            "total_views": 0,
+            "total_watch_time": 0,
+            "total_tips": 0,
+            "tip_count": 0,
+            "total_comments": 0,
+            "updated_at": None
         }
+        total_views = dashboard["total_views"]
+        dashboard["average_watch_time"] = float(dashboard["total_watch_time"]) / total_views if total_views > 0 else 0
+        
+        return dashboard
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to get analytics: {str(e)}"
+            detail=f"Failed to get dashboard: {str(e)}"
         )
@@ -1,52 +1,100 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+import asyncio
 from typing import List, Optional
-from main import supabase
+from main import supabase, db, feed_cache, timelines, get_current_user
+from shared.auth import AuthUser
 from models.content import ContentResponse
+from shared.pagination import (
+    keyset, next_page, encode_rank_cursor, decode_rank_cursor, NEXT_CURSOR_HEADER
+)
 
 router = APIRouter()
 
 @router.get("/feed", response_model=List[ContentResponse])
 async def get_feed(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0, deprecated=True),
     visibility: Optional[str] = "public",
     tags: Optional[str] = None
 ):
     try:
-        query = supabase.table("content").select("*").eq("visibility", visibility)
+        tags_list = tags.split(',') if tags else []
+        page = await feed_cache.page(visibility, tags_list, limit, cursor=cursor, offset=offset)
         
-        if tags:
-            tags_list = tags.split(',')
-            query = query.contains("tags", tags_list)
+        if page is None:
+            query = supabase.table("content").select("*").eq("visibility", visibility)
+            
+            if tags_list:
+                query = query.contains("tags", tags_list)
+            
+            content_data = await db.execute(keyset(query, cursor, limit, offset))
+            page = next_page(content_data.data, limit)
         
-        content_data = query.order("created_at", desc=True).limit(limit).offset(offset).execute()
+        items, next_cursor = page
         
-        return [ContentResponse(**item) for item in content_data.data]
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
+        return [ContentResponse(**item) for item in items]
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get feed: {str(e)}"
         )
 
+@router.get("/feed/following", response_model=List[ContentResponse])
+async def get_following_feed(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user: AuthUser = Depends(get_current_user)
+):
+    try:
+        # Home timeline from redis (fan-out on write, fan-in for large creators)
+        items, next_cursor = await timelines.page(user.id, limit, cursor)
+        
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        
+        return [ContentResponse(**item) for item in items]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get following feed: {str(e)}"
+        )
+
 @router.get("/creator/{creator_id}", response_model=List[ContentResponse])
 async def get_creator_content(
     creator_id: str,
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0, deprecated=True)
 ):
     try:
-        content_data = supabase.table("content") \
+        query = supabase.table("content") \
             .select("*") \
             .eq("creator_id", creator_id) \
-            .eq("visibility", "public") \
-            .order("created_at", desc=True) \
-            .limit(limit) \
-            .offset(offset) \
-            .execute()
+            .eq("visibility", "public")
+        
+        content_data = await db.execute(keyset(query, cursor, limit, offset))
+        items, next_cursor = next_page(content_data.data, limit)
+        
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
-        return [ContentResponse(**item) for item in content_data.data]
+        return [ContentResponse(**item) for item in items]
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -57,24 +105,35 @@ async def get_creator_content(
 async def search_content(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0, deprecated=True)
 ):
     try:
-        content_data = supabase.table("content") \
-            .select("*") \
-            .or_(f"title.ilike.%{q}%,description.ilike.%{q}%") \
-            .eq("visibility", "public") \
-            .order("created_at", desc=True) \
-            .limit(limit) \
-            .offset(offset) \
-            .execute()
+        params = {"q": q, "result_limit": limit + 1}
+        
+        if cursor:
+            params["after_rank"], params["after_id"] = decode_rank_cursor(cursor)
+        elif offset:
+            params["result_offset"] = offset
+        
+        # Ranked full-text + trigram search (database/migrations/006_content_search.sql)
+        content_data, count_data = await asyncio.gather(
+            db.execute(supabase.rpc("search_content", params)),
+            db.execute(supabase.rpc("search_content_count", {"q": q}))
+        )
+        items, next_cursor = next_page(content_data.data, limit, encode=encode_rank_cursor)
+        count = count_data.data[0] if count_data.data else {"total": 0, "exact": True}
         
         return {
-            "results": [ContentResponse(**item) for item in content_data.data],
-            "total": len(content_data.data),
-            "query": q
+            "results": [ContentResponse(**item) for item in items],
+            "total": count["total"],
+            "total_is_estimate": not count["exact"],
+            "query": q,
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,21 +1,39 @@
 from fastapi import APIRouter, HTTPException
-from main import supabase
+from typing import Optional
+import uuid
+from main import settings, playback_cache, r2_uploader, r2_endpoint
+from shared.cache import TTLCache
 
 router = APIRouter()
 
+# Signed URLs are reused for half their lifetime, so repeat plays of the same
+# item get an identical URL (CDN-cacheable) without re-signing
+signed_urls = TTLCache(maxsize=10000, ttl=settings.stream_url_expiry / 2)
+
+def signed_media_url(media_url: Optional[str]) -> Optional[str]:
+    # Only our own R2 objects can be signed; anything else is returned as stored
+    prefix = f"{r2_endpoint}/"
+    if not media_url or not media_url.startswith(prefix):
+        return media_url
+
+    url = signed_urls.get(media_url)
+    if url is None:
+        bucket, _, object_key = media_url[len(prefix):].partition("/")
+        url = r2_uploader.download_url(bucket, object_key, expires_in=settings.stream_url_expiry)
+        signed_urls.set(media_url, url)
+    return url
+
 @router.get("/stream/{content_id}")
-async def get_stream_url(content_id: str):
+async def get_stream_url(content_id: uuid.UUID):
     try:
-        content_data = supabase.table("content").select("*").eq("id", content_id).execute()
+        content = await playback_cache.get(str(content_id))
         
-        if not content_data.data:
+        if not content:
             raise HTTPException(
                 status_code=404,
                 detail="Content not found"
             )
         
-        content = content_data.data[0]
-        
         if content["visibility"] == "private":
             raise HTTPException(
                 status_code=403,
@@ -23,8 +41,8 @@ async def get_stream_url(content_id: str):
             )
         
         return {
-            "content_id": content_id,
-            "stream_url": content.get("stream_url") or content.get("media_url"),
+            "content_id": str(content_id),
+            "stream_url": content.get("stream_url") or signed_media_url(content.get("media_url")),
             "title": content["title"],
             "duration": content.get("duration")
         }
@@ -1,11 +1,33 @@
-from fastapi import APIRouter, HTTPException, status, Header, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form
 from typing import Optional
+from jose import jwt, JWTError
+import time
 import uuid
-from main import supabase, r2_client, settings
-from models.content import ContentCreate, ContentResponse
+from main import supabase, db, r2_uploader, r2_endpoint, settings, get_current_user, creator_resolver, feed_cache, playback_cache, timelines
+from shared.auth import AuthUser
+from models.content import (
+    ContentCreate, ContentResponse, UploadInitiate, UploadTicket, UploadComplete
+)
 
 router = APIRouter()
 
+UPLOAD_TOKEN_AUDIENCE = "content-upload"
+
+def bucket_for(content_type: str) -> str:
+    return settings.r2_bucket_video if content_type.startswith('video') else settings.r2_bucket_audio
+
+def media_url_for(bucket: str, object_key: str) -> str:
+    return f"{r2_endpoint}/{bucket}/{object_key}"
+
+def upload_token_secret() -> str:
+    # An empty HS256 key would let anyone mint tickets for any object
+    if not settings.upload_token_secret:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Direct uploads are not configured"
+        )
+    return settings.upload_token_secret
+
 @router.post("/upload", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_content(
     file: UploadFile = File(...),
@@ -13,50 +35,27 @@ async def upload_content(
     description: Optional[str] = Form(None),
     tags: Optional[str] = Form(None),
     visibility: str = Form("public"),
-    authorization: str = Header(None)
+    user: AuthUser = Depends(get_current_user)
 ):
     try:
-        if not authorization:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
-            )
-        
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        creator_data = supabase.table("creators").select("*").eq("user_id", str(user_response.user.id)).execute()
+        creator_id = await creator_resolver.resolve_id(user.id)
         
-        if not creator_data.data:
+        if not creator_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a creator account"
             )
         
-        creator_id = creator_data.data[0]["id"]
         content_id = str(uuid.uuid4())
         file_extension = file.filename.split('.')[-1]
         
-        file_content = await file.read()
-        
-        bucket = settings.r2_bucket_video if file.content_type.startswith('video') else settings.r2_bucket_audio
+        bucket = bucket_for(file.content_type)
         
         object_key = f"{creator_id}/{content_id}.{file_extension}"
         
-        r2_client.put_object(
-            Bucket=bucket,
-            Key=object_key,
-            Body=file_content,
-            ContentType=file.content_type
-        )
+        stored = await r2_uploader.upload(file, bucket, object_key, content_type=file.content_type)
         
-        media_url = f"https://{settings.cloudflare_account_id}.r2.cloudflarestorage.com/{bucket}/{object_key}"
+        media_url = media_url_for(bucket, object_key)
         
         tags_list = tags.split(',') if tags else []
         
@@ -68,10 +67,13 @@ async def upload_content(
             "media_url": media_url,
             "tags": tags_list,
             "visibility": visibility,
-            "file_size": len(file_content)
+            "file_size": stored.size,
+            "checksum": stored.checksum
         }
         
-        result = supabase.table("content").insert(content_data).execute()
+        result = await db.execute(supabase.table("content").insert(content_data))
+        await feed_cache.invalidate(content_data["visibility"])
+        timelines.publish(result.data[0])
         
         return ContentResponse(**result.data[0])
         
@@ -83,10 +85,177 @@ async def upload_content(
             detail=f"Upload failed: {str(e)}"
         )
 
+@router.post("/upload/initiate", response_model=UploadTicket)
+async def initiate_upload(
+    request: UploadInitiate,
+    user: AuthUser = Depends(get_current_user)
+):
+    try:
+        secret = upload_token_secret()
+        creator_id = await creator_resolver.resolve_id(user.id)
+        
+        if not creator_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a creator account"
+            )
+        
+        content_id = str(uuid.uuid4())
+        file_extension = request.filename.split('.')[-1]
+        bucket = bucket_for(request.content_type)
+        object_key = f"{creator_id}/{content_id}.{file_extension}"
+        expires_in = settings.r2_presign_expiry
+        
+        presigned = await r2_uploader.presign(
+            bucket,
+            object_key,
+            request.file_size,
+            content_type=request.content_type,
+            expires_in=expires_in
+        )
+        
+        # Everything /upload/complete needs travels in a signed token, so no
+        # server-side state is kept between the two phases
+        upload_token = jwt.encode({
+            "sub": creator_id,
+            "aud": UPLOAD_TOKEN_AUDIENCE,
+            "exp": int(time.time()) + 2 * expires_in,
+            "content_id": content_id,
+            "bucket": bucket,
+            "key": object_key,
+            "upload_id": presigned["upload_id"],
+            "size": request.file_size
+        }, secret, algorithm="HS256")
+        
+        return UploadTicket(
+            content_id=content_id,
+            upload_token=upload_token,
+            part_size=presigned["part_size"],
+            urls=presigned["urls"],
+            expires_in=expires_in
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to initiate upload: {str(e)}"
+        )
+
+@router.post("/upload/complete", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    request: UploadComplete,
+    user: AuthUser = Depends(get_current_user)
+):
+    try:
+        secret = upload_token_secret()
+        try:
+            ticket = jwt.decode(
+                request.upload_token,
+                secret,
+                algorithms=["HS256"],
+                audience=UPLOAD_TOKEN_AUDIENCE
+            )
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid or expired upload token"
+            )
+        
+        creator_id = await creator_resolver.resolve_id(user.id)
+        
+        if not creator_id or ticket["sub"] != creator_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to complete this upload"
+            )
+        
+        bucket = ticket["bucket"]
+        object_key = ticket["key"]
+        
+        if bucket not in (settings.r2_bucket_video, settings.r2_bucket_audio) or not object_key.startswith(f"{creator_id}/"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to complete this upload"
+            )
+        
+        # The ticket can be presented again (e.g. a client retry after a
+        # lost response); the upload it names is already content
+        existing = await db.execute(supabase.table("content").select("*").eq("id", ticket["content_id"]))
+        if existing.data:
+            return ContentResponse(**existing.data[0])
+        
+        if ticket["upload_id"]:
+            if not request.parts:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Multipart upload requires the uploaded parts"
+                )
+            try:
+                await r2_uploader.complete(
+                    bucket,
+                    object_key,
+                    ticket["upload_id"],
+                    [{"PartNumber": part.part_number, "ETag": part.etag} for part in request.parts]
+                )
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Could not complete multipart upload: {str(e)}"
+                )
+        
+        stored = await r2_uploader.head(bucket, object_key)
+        
+        if stored is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file not found"
+            )
+        
+        if stored["ContentLength"] != ticket["size"]:
+            await r2_uploader.delete(bucket, object_key)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file size does not match the initiated upload"
+            )
+        
+        content_data = {
+            "id": ticket["content_id"],
+            "creator_id": creator_id,
+            "title": request.title,
+            "description": request.description,
+            "media_url": media_url_for(bucket, object_key),
+            "tags": request.tags,
+            "visibility": request.visibility,
+            "file_size": stored["ContentLength"]
+        }
+        
+        # A concurrent retry of the same ticket may have inserted it meanwhile
+        result = await db.execute(
+            supabase.table("content").upsert(content_data, on_conflict="id", ignore_duplicates=True)
+        )
+        if not result.data:
+            existing = await db.execute(supabase.table("content").select("*").eq("id", ticket["content_id"]))
+            return ContentResponse(**existing.data[0])
+        
+        await feed_cache.invalidate(content_data["visibility"])
+        timelines.publish(result.data[0])
+        
+        return ContentResponse(**result.data[0])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to complete upload: {str(e)}"
+        )
+
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(content_id: str):
     try:
-        content_data = supabase.table("content").select("*").eq("id", content_id).execute()
+        content_data = await db.execute(supabase.table("content").select("*").eq("id", content_id))
         
         if not content_data.data:
             raise HTTPException(
@@ -107,25 +276,10 @@ async def get_content(content_id: str):
 @router.delete("/{content_id}")
 async def delete_content(
     content_id: str,
-    authorization: str = Header(None)
+    user: AuthUser = Depends(get_current_user)
 ):
     try:
-        if not authorization:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
-            )
-        
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        content_data = supabase.table("content").select("*").eq("id", content_id).execute()
+        content_data = await db.execute(supabase.table("content").select("*").eq("id", content_id))
         
         if not content_data.data:
             raise HTTPException(
@@ -133,15 +287,17 @@ async def delete_content(
                 detail="Content not found"
             )
         
-        creator_data = supabase.table("creators").select("*").eq("user_id", str(user_response.user.id)).execute()
+        creator_id = await creator_resolver.resolve_id(user.id)
         
-        if not creator_data.data or content_data.data[0]["creator_id"] != creator_data.data[0]["id"]:
+        if not creator_id or content_data.data[0]["creator_id"] != creator_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to delete this content"
             )
         
-        supabase.table("content").delete().eq("id", content_id).execute()
+        await db.execute(supabase.table("content").delete().eq("id", content_id))
+        await feed_cache.invalidate(content_data.data[0]["visibility"])
+        await playback_cache.invalidate(content_id)
         
         return {"message": "Content deleted successfully"}
         
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+MiB = 1024 * 1024
+# S3/R2 reject multipart parts under 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * MiB
+MAX_PARTS = 10000
+
+class StoredObject(BaseModel):
+    bucket: str
+    key: str
+    size: int
+    checksum: str
+    parts: int
+
+class R2Uploader:
+    """Streams uploads to R2 without buffering whole files.
+
+    The source is read in `part_size` chunks. Anything that fits in one chunk
+    is sent with a single put_object; larger files go through S3 multipart
+    upload with at most `max_pending_parts` parts in flight per upload, so
+    memory stays around (max_pending_parts + 1) * part_size regardless of
+    file size. Size and SHA-256 are computed while streaming. boto3 calls run
+    on a pool of `max_workers` threads shared by all uploads in the process.
+
+    presign()/complete() support the direct flow instead, where clients PUT
+    to presigned R2 URLs and the API only handles metadata; abort_stale()
+    cleans up the ones that are never completed.
+    """
+
+    def __init__(
+        self,
+        client,
+        part_size: int = 8 * MiB,
+        max_pending_parts: int = 4,
+        max_workers: int = 16,
+    ):
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        self.client = client
+        self.part_size = part_size
+        self.max_pending_parts = max_pending_parts
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="r2-upload")
+
+    async def _call(self, fn, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, **kwargs))
+
+    async def _upload_part(self, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        response = await self._call(
+            self.client.upload_part,
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    async def upload(self, source, bucket: str, key: str, content_type: Optional[str] = None) -> StoredObject:
+        """Upload an async-readable source (e.g. UploadFile) to bucket/key."""
+        extra = {"ContentType": content_type} if content_type else {}
+        digest = hashlib.sha256()
+
+        chunk = await source.read(self.part_size)
+        await asyncio.to_thread(digest.update, chunk)
+
+        if len(chunk) < self.part_size:
+            await self._call(self.client.put_object, Bucket=bucket, Key=key, Body=chunk, **extra)
+            return StoredObject(bucket=bucket, key=key, size=len(chunk), checksum=digest.hexdigest(), parts=1)
+
+        upload = await self._call(self.client.create_multipart_upload, Bucket=bucket, Key=key, **extra)
+        upload_id = upload["UploadId"]
+        pending = set()
+        parts = []
+        size = 0
+        part_number = 0
+
+        try:
+            while chunk:
+                if len(pending) >= self.max_pending_parts:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    parts.extend(task.result() for task in done)
+
+                part_number += 1
+                size += len(chunk)
+                pending.add(asyncio.ensure_future(
+                    self._upload_part(bucket, key, upload_id, part_number, chunk)
+                ))
+
+                chunk = await source.read(self.part_size)
+                await asyncio.to_thread(digest.update, chunk)
+
+            if pending:
+                parts.extend(await asyncio.gather(*pending))
+                pending = set()
+
+            await self.complete(bucket, key, upload_id, parts)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await self.abort(bucket, key, upload_id)
+            raise
+
+        return StoredObject(bucket=bucket, key=key, size=size, checksum=digest.hexdigest(), parts=part_number)
+
+    def part_size_for(self, size: int) -> int:
+        """Smallest whole-MiB part size >= part_size that keeps size within MAX_PARTS."""
+        return max(self.part_size, math.ceil(size / MAX_PARTS / MiB) * MiB)
+
+    async def presign(
+        self,
+        bucket: str,
+        key: str,
+        size: int,
+        content_type: Optional[str] = None,
+        expires_in: int = 3600,
+    ) -> dict:
+        """Presigned PUT URLs for a client-side upload of `size` bytes.
+
+        Returns a single put_object URL when the file fits in one part,
+        otherwise starts a multipart upload and returns one upload_part URL
+        per part; the client PUTs part N to urls[N - 1].
+        """
+        if size <= self.part_size:
+            params = {"Bucket": bucket, "Key": key}
+            if content_type:
+                params["ContentType"] = content_type
+            url = await self._call(
+                self.client.generate_presigned_url,
+                ClientMethod="put_object",
+                Params=params,
+                ExpiresIn=expires_in
+            )
+            return {"upload_id": None, "part_size": size, "urls": [url]}
+
+        extra = {"ContentType": content_type} if content_type else {}
+        upload = await self._call(self.client.create_multipart_upload, Bucket=bucket, Key=key, **extra)
+        upload_id = upload["UploadId"]
+        part_size = self.part_size_for(size)
+
+        def sign_parts():
+            return [
+                self.client.generate_presigned_url(
+                    ClientMethod="upload_part",
+                    Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+                    ExpiresIn=expires_in
+                )
+                for part_number in range(1, math.ceil(size / part_size) + 1)
+            ]
+
+        loop = asyncio.get_running_loop()
+        urls = await loop.run_in_executor(self._executor, sign_parts)
+        return {"upload_id": upload_id, "part_size": part_size, "urls": urls}
+
+    async def complete(self, bucket: str, key: str, upload_id: str, parts: list) -> None:
+        """Finish a presigned multipart upload from the client's (PartNumber, ETag) list."""
+        await self._call(
+            self.client.complete_multipart_upload,
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])}
+        )
+
+    async def abort(self, bucket: str, key: str, upload_id: str) -> None:
+        try:
+            await self._call(self.client.abort_multipart_upload, Bucket=bucket, Key=key, UploadId=upload_id)
+        except Exception as e:
+            logger.warning("could not abort multipart upload %s for %s/%s: %s", upload_id, bucket, key, e)
+
+    async def abort_stale(self, bucket: str, max_age: float) -> List[dict]:
+        """Abort multipart uploads in `bucket` started more than `max_age` seconds ago.
+
+        Presigned uploads whose client never calls /upload/complete (and
+        server-side uploads whose process died) otherwise keep their parts
+        stored, and billed, indefinitely.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        aborted = []
+        markers = {}
+        while True:
+            page = await self._call(self.client.list_multipart_uploads, Bucket=bucket, **markers)
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"] < cutoff:
+                    await self.abort(bucket, upload["Key"], upload["UploadId"])
+                    aborted.append({"key": upload["Key"], "upload_id": upload["UploadId"]})
+            if not page.get("IsTruncated"):
+                return aborted
+            markers = {"KeyMarker": page["NextKeyMarker"], "UploadIdMarker": page["NextUploadIdMarker"]}
+
+    async def head(self, bucket: str, key: str) -> Optional[dict]:
+        """Object metadata, or None when the object does not exist."""
+        try:
+            return await self._call(self.client.head_object, Bucket=bucket, Key=key)
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def download_url(self, bucket: str, key: str, expires_in: int = 900) -> str:
+        """Presigned GET URL; signed locally with the client's credentials, no request to R2."""
+        return self.client.generate_presigned_url(
+            ClientMethod="get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=expires_in
+        )
+
+    async def delete(self, bucket: str, key: str) -> None:
+        await self._call(self.client.delete_object, Bucket=bucket, Key=key)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == "__main__":
+    # Hourly from the upload_sweeper service in docker-compose.yml:
+    #   python storage.py
+    # Upload tickets are valid for twice the presign expiry, so anything older
+    # can no longer be completed
+    import json
+    from main import settings, r2_uploader
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def sweep() -> dict:
+        buckets = (settings.r2_bucket_video, settings.r2_bucket_audio)
+        aborted = await asyncio.gather(*(
+            r2_uploader.abort_stale(bucket, 2 * settings.r2_presign_expiry) for bucket in buckets
+        ))
+        return dict(zip(buckets, aborted))
+
+    try:
+        print(json.dumps(asyncio.run(sweep())))
+    finally:
+        r2_uploader.close()
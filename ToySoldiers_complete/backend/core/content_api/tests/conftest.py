@@ -0,0 +1,11 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+@pytest.fixture
+def s3():
+    """boto3 S3 client backed by moto; presigned URLs fetched with requests are intercepted too."""
+    with mock_aws():
+        yield boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
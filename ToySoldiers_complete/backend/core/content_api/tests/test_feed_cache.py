@@ -0,0 +1,125 @@
+import asyncio
+import uuid
+
+import pytest
+
+import feed_cache as feed_cache_module
+from feed_cache import INVALIDATION_CHANNEL, FeedCache
+from shared import cache as cache_module
+
+@pytest.fixture(autouse=True)
+def frozen_time(clock, monkeypatch):
+    monkeypatch.setattr(feed_cache_module, "time", clock)
+    monkeypatch.setattr(cache_module, "time", clock)
+
+def add_content(db, n: int, visibility: str = "public") -> list:
+    rows = db.tables.setdefault("content", [])
+    added = [
+        {"id": str(uuid.uuid4()), "visibility": visibility, "tags": [], "created_at": f"2026-01-01T00:{len(rows) + i:02d}:00+00:00"}
+        for i in range(n)
+    ]
+    rows.extend(added)
+    return added
+
+def ids(page) -> list:
+    rows, _ = page
+    return [row["id"] for row in rows]
+
+async def settle(cache: FeedCache) -> None:
+    """Wait for background refreshes started by stale hits."""
+    await asyncio.gather(*list(cache._refreshing.values()))
+
+def test_stale_entry_is_served_while_it_refreshes(fake_db, clock):
+    cache = FeedCache(fake_db, window=10, fresh_ttl=15, stale_ttl=300)
+    old = add_content(fake_db, 3)
+
+    async def scenario():
+        assert len(ids(await cache.page("public", [], limit=10))) == 3
+        new = add_content(fake_db, 1)
+
+        # Fresh: served from memory, the new row is not visible yet
+        assert len(ids(await cache.page("public", [], limit=10))) == 3
+
+        # Stale: still served from memory, without waiting on the refetch
+        clock.now += 16
+        assert len(ids(await cache.page("public", [], limit=10))) == 3
+        assert cache.stale_hits == 1
+        await settle(cache)
+
+        latest = ids(await cache.page("public", [], limit=10))
+        assert latest[0] == new[0]["id"] and set(latest[1:]) == {row["id"] for row in old}
+
+    asyncio.run(scenario())
+    assert cache.stats() == {
+        "entries": 1, "fresh_hits": 2, "stale_hits": 1, "misses": 1, "bypassed": 0, "refreshes": 2
+    }
+
+def test_expired_entry_is_refetched_before_serving(fake_db, clock):
+    cache = FeedCache(fake_db, window=10, fresh_ttl=15, stale_ttl=300)
+    add_content(fake_db, 3)
+
+    async def scenario():
+        await cache.page("public", [], limit=10)
+        add_content(fake_db, 1)
+        clock.now += 301
+        return await cache.page("public", [], limit=10)
+
+    assert len(ids(asyncio.run(scenario()))) == 4
+    assert cache.misses == 2
+
+def test_invalidate_marks_entries_stale_and_broadcasts(fake_db, fake_redis, clock):
+    cache = FeedCache(fake_db, window=10)
+    cache.redis = fake_redis
+    # Another process sharing the redis windows
+    peer = FeedCache(fake_db, window=10)
+    peer.redis = fake_redis
+    add_content(fake_db, 2)
+
+    async def scenario():
+        await cache.page("public", [], limit=10)
+        added = add_content(fake_db, 1)
+        clock.now += 1
+        await cache.invalidate("public")
+
+        # The old window is still served, once, while it is refetched
+        assert len(ids(await cache.page("public", [], limit=10))) == 2
+        assert cache.stale_hits == 1
+        # The peer reads the window from redis along with the invalidation time
+        assert len(ids(await peer.page("public", [], limit=10))) == 2
+        assert peer.stale_hits == 1
+        await settle(cache)
+        await settle(peer)
+        assert ids(await cache.page("public", [], limit=10))[0] == added[0]["id"]
+
+    asyncio.run(scenario())
+    assert fake_redis.published == [(INVALIDATION_CHANNEL, "public")]
+    assert float(fake_redis.values["feed:invalidated:public"]) == clock.now
+    assert fake_redis.on_loop == []
+
+def test_invalidation_from_another_process_is_applied(fake_db, clock):
+    cache = FeedCache(fake_db, window=10)
+    add_content(fake_db, 2)
+
+    async def scenario():
+        await cache.page("public", [], limit=10)
+        clock.now += 1
+        cache._on_invalidation({"data": "public"})
+        await cache.page("public", [], limit=10)
+        await settle(cache)
+
+    asyncio.run(scenario())
+    assert (cache.fresh_hits, cache.stale_hits, cache.refreshes) == (0, 1, 2)
+
+def test_pages_beyond_the_window_go_to_the_database(fake_db):
+    cache = FeedCache(fake_db, window=10)
+    add_content(fake_db, 20)
+
+    async def scenario():
+        assert await cache.page("public", [], limit=5, offset=10) is None
+        first, cursor = await cache.page("public", [], limit=10)
+        # The window holds the newest 10 of 20 rows, so the next page is not cached
+        assert await cache.page("public", [], limit=10, cursor=cursor) is None
+        return first
+
+    assert len(asyncio.run(scenario())) == 10
+    assert cache.bypassed == 2
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from playback import INVALIDATION_CHANNEL, PlaybackCache
+
+@pytest.fixture
+def content(fake_db):
+    row = {"id": str(uuid.uuid4()), "visibility": "public", "title": "Clip", "duration": 30, "stream_url": None, "media_url": "https://r2/clip.mp4"}
+    fake_db.tables["content"] = [row]
+    return row
+
+def with_redis(db, redis) -> PlaybackCache:
+    cache = PlaybackCache(db)
+    cache.redis = redis
+    return cache
+
+def test_lookups_are_cached_locally_and_in_redis(fake_db, fake_redis, content):
+    cache = with_redis(fake_db, fake_redis)
+
+    async def scenario():
+        first = await cache.get(content["id"])
+        second = await cache.get(content["id"])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == content
+    assert cache.db_lookups == 1
+    assert json.loads(fake_redis.values[f"playback:{content['id']}"]) == content
+    assert fake_redis.on_loop == []
+
+def test_other_processes_read_through_redis(fake_db, fake_redis, content):
+    asyncio.run(with_redis(fake_db, fake_redis).get(content["id"]))
+    peer = with_redis(fake_db, fake_redis)
+
+    assert asyncio.run(peer.get(content["id"])) == content
+    assert (peer.redis_hits, peer.db_lookups) == (1, 0)
+    assert fake_redis.on_loop == []
+
+def test_unknown_content_is_cached_as_missing(fake_db, fake_redis, content):
+    cache = with_redis(fake_db, fake_redis)
+    missing = str(uuid.uuid4())
+
+    async def scenario():
+        return [await cache.get(missing) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [None, None, None]
+    assert cache.db_lookups == 1
+
+def test_concurrent_misses_share_one_query(fake_db, content):
+    cache = PlaybackCache(fake_db)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get(content["id"]) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [content] * 5
+    assert cache.db_lookups == 1
+
+def test_invalidate_drops_cached_copies_and_broadcasts(fake_db, fake_redis, content):
+    cache = with_redis(fake_db, fake_redis)
+
+    async def scenario():
+        await cache.get(content["id"])
+        fake_db.tables["content"][0]["title"] = "Renamed"
+        await cache.invalidate(content["id"])
+        return await cache.get(content["id"])
+
+    assert asyncio.run(scenario())["title"] == "Renamed"
+    assert cache.db_lookups == 2
+    assert fake_redis.published == [(INVALIDATION_CHANNEL, content["id"])]
+    assert fake_redis.on_loop == []
+
+def test_broadcast_invalidation_drops_the_local_copy(fake_db, content):
+    cache = PlaybackCache(fake_db)
+    asyncio.run(cache.get(content["id"]))
+    fake_db.tables["content"][0]["title"] = "Renamed"
+
+    cache._on_invalidation({"data": content["id"]})
+    assert asyncio.run(cache.get(content["id"]))["title"] == "Renamed"
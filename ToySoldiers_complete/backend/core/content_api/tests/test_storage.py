@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import io
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from storage import MAX_PARTS, MiB, MIN_PART_SIZE, R2Uploader
+
+BUCKET = "toysoldiers-video"
+
+class Source:
+    """Async-readable bytes, like UploadFile; raises `fail_with` once `fail_after` bytes are read."""
+
+    def __init__(self, body: bytes, fail_after=None, fail_with=None):
+        self.buffer = io.BytesIO(body)
+        self.fail_after = fail_after
+        self.fail_with = fail_with
+
+    async def read(self, n: int) -> bytes:
+        if self.fail_after is not None and self.buffer.tell() >= self.fail_after:
+            raise self.fail_with
+        return self.buffer.read(n)
+
+@pytest.fixture
+def uploader(s3):
+    s3.create_bucket(Bucket=BUCKET)
+    uploader = R2Uploader(s3, part_size=MIN_PART_SIZE, max_pending_parts=2)
+    yield uploader
+    uploader.close()
+
+def test_part_size_must_meet_the_s3_minimum(s3):
+    with pytest.raises(ValueError):
+        R2Uploader(s3, part_size=MIN_PART_SIZE - 1)
+
+def test_part_size_grows_in_whole_mib_to_stay_within_max_parts(s3):
+    uploader = R2Uploader(s3, part_size=8 * MiB)
+    try:
+        assert uploader.part_size_for(100 * MiB) == 8 * MiB
+        assert uploader.part_size_for(MAX_PARTS * 8 * MiB) == 8 * MiB
+        assert uploader.part_size_for(MAX_PARTS * 8 * MiB + 1) == 9 * MiB
+        assert uploader.part_size_for(200 * 1024 * MiB) == 21 * MiB
+    finally:
+        uploader.close()
+
+def test_small_upload_is_a_single_put(uploader, s3):
+    body = os.urandom(1000)
+    stored = asyncio.run(uploader.upload(Source(body), BUCKET, "small.mp4", content_type="video/mp4"))
+
+    assert (stored.size, stored.parts) == (1000, 1)
+    assert stored.checksum == hashlib.sha256(body).hexdigest()
+    obj = s3.get_object(Bucket=BUCKET, Key="small.mp4")
+    assert obj["Body"].read() == body
+    assert obj["ContentType"] == "video/mp4"
+
+def test_large_upload_goes_multipart(uploader, s3):
+    body = os.urandom(12 * MiB)
+    stored = asyncio.run(uploader.upload(Source(body), BUCKET, "large.mp4"))
+
+    assert (stored.size, stored.parts) == (12 * MiB, 3)
+    assert stored.checksum == hashlib.sha256(body).hexdigest()
+    assert s3.get_object(Bucket=BUCKET, Key="large.mp4")["Body"].read() == body
+    assert "Uploads" not in s3.list_multipart_uploads(Bucket=BUCKET)
+
+@pytest.mark.parametrize("error", [OSError("client went away"), asyncio.CancelledError()])
+def test_failed_multipart_upload_is_aborted(uploader, s3, error):
+    source = Source(os.urandom(12 * MiB), fail_after=2 * MIN_PART_SIZE, fail_with=error)
+    with pytest.raises(type(error)):
+        asyncio.run(uploader.upload(source, BUCKET, "broken.mp4"))
+
+    assert "Uploads" not in s3.list_multipart_uploads(Bucket=BUCKET)
+    assert asyncio.run(uploader.head(BUCKET, "broken.mp4")) is None
+
+def test_head_and_delete(uploader, s3):
+    s3.put_object(Bucket=BUCKET, Key="clip.mp4", Body=b"a" * 10)
+
+    assert asyncio.run(uploader.head(BUCKET, "clip.mp4"))["ContentLength"] == 10
+    asyncio.run(uploader.delete(BUCKET, "clip.mp4"))
+    assert asyncio.run(uploader.head(BUCKET, "clip.mp4")) is None
+
+def test_head_raises_errors_other_than_missing(uploader):
+    with pytest.raises(uploader.client.exceptions.ClientError):
+        asyncio.run(uploader.head("no-such-bucket", "clip.mp4"))
+
+def test_abort_stale_only_aborts_old_uploads(uploader, s3):
+    upload_id = s3.create_multipart_upload(Bucket=BUCKET, Key="abandoned.mp4")["UploadId"]
+    # moto reports a fixed Initiated time, so ages are taken relative to it
+    initiated = s3.list_multipart_uploads(Bucket=BUCKET)["Uploads"][0]["Initiated"]
+    age = (datetime.now(timezone.utc) - initiated).total_seconds()
+
+    assert asyncio.run(uploader.abort_stale(BUCKET, max_age=age + 3600)) == []
+    aborted = asyncio.run(uploader.abort_stale(BUCKET, max_age=age - 3600))
+    assert aborted == [{"key": "abandoned.mp4", "upload_id": upload_id}]
+    assert "Uploads" not in s3.list_multipart_uploads(Bucket=BUCKET)
@@ -0,0 +1,119 @@
+import asyncio
+import uuid
+
+import pytest
+
+from timelines import LARGE_CREATORS_KEY, Timelines
+
+FAN = str(uuid.uuid4())
+
+class Network:
+    """Creators, follows and content rows in a FakeDatabase."""
+
+    def __init__(self, db):
+        self.db = db
+        self.minute = 0
+        db.tables.update(followers=[], content=[])
+
+    def creator(self, fans=()) -> str:
+        creator_id = str(uuid.uuid4())
+        self.db.tables["followers"].extend({"creator_id": creator_id, "fan_id": fan_id} for fan_id in fans)
+        return creator_id
+
+    def post(self, creator_id: str, visibility: str = "public") -> dict:
+        self.minute += 1
+        row = {
+            "id": str(uuid.uuid4()),
+            "creator_id": creator_id,
+            "visibility": visibility,
+            "created_at": f"2026-01-01T00:{self.minute:02d}:00+00:00",
+        }
+        self.db.tables["content"].append(row)
+        return row
+
+@pytest.fixture
+def network(fake_db):
+    return Network(fake_db)
+
+def with_redis(db, redis, **kwargs) -> Timelines:
+    timelines = Timelines(db, **kwargs)
+    timelines.redis = redis
+    timelines._push = redis.register_script(None)
+    return timelines
+
+def ids(rows) -> list:
+    return [row["id"] for row in rows]
+
+def test_missing_timeline_is_rebuilt_then_fed_by_fan_out(fake_db, fake_redis, network):
+    timelines = with_redis(fake_db, fake_redis)
+    creator = network.creator(fans=[FAN, str(uuid.uuid4())])
+    older = network.post(creator)
+
+    async def scenario():
+        first, _ = await timelines.page(FAN, limit=10)
+        new = network.post(creator)
+        timelines.publish(new)
+        await timelines.drain()
+        second, _ = await timelines.page(FAN, limit=10)
+        return first, second, new
+
+    first, second, new = asyncio.run(scenario())
+    assert ids(first) == [older["id"]]
+    assert ids(second) == [new["id"], older["id"]]
+    assert timelines.rebuilds == 1
+    assert timelines.fanout_writes == 2
+    assert fake_redis.on_loop == []
+
+def test_large_creators_are_merged_in_on_read(fake_db, fake_redis, network):
+    timelines = with_redis(fake_db, fake_redis, fanout_threshold=1)
+    large = network.creator(fans=[FAN, str(uuid.uuid4())])
+    small = network.creator(fans=[FAN])
+
+    async def scenario():
+        posts = [network.post(large), network.post(small), network.post(large)]
+        for post in posts:
+            timelines.publish(post)
+        await timelines.drain()
+        rows, _ = await timelines.page(FAN, limit=10)
+        return posts, rows
+
+    posts, rows = asyncio.run(scenario())
+    assert fake_redis.sets[LARGE_CREATORS_KEY] == {large}
+    # Only the small creator's post was pushed to the fan's timeline
+    assert timelines.fanout_writes == 1
+    assert ids(rows) == ids(reversed(posts))
+    assert timelines.fanins == 1
+    assert fake_redis.on_loop == []
+
+def test_pages_follow_the_cursor_and_skip_hidden_content(fake_db, fake_redis, network):
+    timelines = with_redis(fake_db, fake_redis)
+    creator = network.creator(fans=[FAN])
+    posts = [network.post(creator) for _ in range(5)]
+    posts[2]["visibility"] = "private"
+
+    async def scenario():
+        pages, cursor = [], None
+        while True:
+            rows, cursor = await timelines.page(FAN, limit=2, cursor=cursor)
+            pages.append(ids(rows))
+            if cursor is None:
+                return pages
+
+    expected = [post["id"] for post in reversed(posts) if post["visibility"] == "public"]
+    assert asyncio.run(scenario()) == [expected[:2], expected[2:]]
+    assert fake_redis.on_loop == []
+
+def test_without_redis_pages_come_from_the_database(fake_db, network):
+    timelines = Timelines(fake_db)
+    creator = network.creator(fans=[FAN])
+    posts = [network.post(creator) for _ in range(2)]
+    network.post(network.creator())
+
+    rows, cursor = asyncio.run(timelines.page(FAN, limit=10))
+    assert ids(rows) == ids(reversed(posts))
+    assert cursor is None
+
+def test_fans_following_nobody_get_an_empty_page(fake_db, fake_redis, network):
+    timelines = with_redis(fake_db, fake_redis)
+    assert asyncio.run(timelines.page(FAN, limit=10)) == ([], None)
+    assert fake_redis.commands == []
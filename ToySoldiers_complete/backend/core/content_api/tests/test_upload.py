@@ -0,0 +1,140 @@
+import os
+import uuid
+from types import SimpleNamespace
+
+# main reads its settings at import time
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "header.payload.signature")
+os.environ.setdefault("R2_ENDPOINT_URL", "http://localhost:9000")
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+
+import main
+from routes import upload as upload_routes
+from shared.auth import AuthUser
+from storage import MiB, R2Uploader
+
+CREATOR_ID = str(uuid.uuid4())
+
+class Creators:
+    async def resolve_id(self, user_id):
+        return CREATOR_ID
+
+class Feed:
+    def __init__(self):
+        self.invalidated = []
+
+    async def invalidate(self, visibility):
+        self.invalidated.append(visibility)
+
+class Timelines:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, content):
+        self.published.append(content["id"])
+
+@pytest.fixture
+def api(s3, fake_db, monkeypatch):
+    for bucket in (main.settings.r2_bucket_video, main.settings.r2_bucket_audio):
+        s3.create_bucket(Bucket=bucket)
+    uploader = R2Uploader(s3, part_size=5 * MiB)
+    feed, timelines = Feed(), Timelines()
+    monkeypatch.setattr(main.settings, "upload_token_secret", "test-upload-secret")
+    monkeypatch.setattr(upload_routes, "r2_uploader", uploader)
+    monkeypatch.setattr(upload_routes, "db", fake_db)
+    monkeypatch.setattr(upload_routes, "supabase", fake_db)
+    monkeypatch.setattr(upload_routes, "creator_resolver", Creators())
+    monkeypatch.setattr(upload_routes, "feed_cache", feed)
+    monkeypatch.setattr(upload_routes, "timelines", timelines)
+    main.app.dependency_overrides[main.get_current_user] = lambda: AuthUser(id="user-1")
+    try:
+        yield SimpleNamespace(client=TestClient(main.app), db=fake_db, s3=s3, feed=feed, timelines=timelines)
+    finally:
+        main.app.dependency_overrides.clear()
+        uploader.close()
+
+def initiate(api, size: int, content_type: str = "video/mp4") -> dict:
+    response = api.client.post("/content/upload/initiate", json={
+        "filename": "clip.mp4", "content_type": content_type, "file_size": size
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def complete(api, ticket: dict, parts=()):
+    return api.client.post("/content/upload/complete", json={
+        "upload_token": ticket["upload_token"],
+        "parts": list(parts),
+        "title": "Clip",
+        "tags": ["demo"],
+    })
+
+def test_multipart_upload_through_presigned_urls(api):
+    size = 11 * MiB
+    ticket = initiate(api, size)
+    assert ticket["part_size"] == 5 * MiB
+    assert len(ticket["urls"]) == 3
+
+    body = os.urandom(size)
+    parts = []
+    for number, url in enumerate(ticket["urls"], start=1):
+        chunk = body[(number - 1) * ticket["part_size"]:number * ticket["part_size"]]
+        response = requests.put(url, data=chunk)
+        assert response.status_code == 200
+        parts.append({"part_number": number, "etag": response.headers["ETag"]})
+
+    # Parts may be reported in any order
+    response = complete(api, ticket, reversed(parts))
+    assert response.status_code == 201, response.text
+    content = response.json()
+    assert content["id"] == ticket["content_id"]
+    assert content["creator_id"] == CREATOR_ID
+
+    stored = api.s3.get_object(Bucket=main.settings.r2_bucket_video, Key=f"{CREATOR_ID}/{ticket['content_id']}.mp4")
+    assert stored["Body"].read() == body
+    assert api.db.tables["content"][0]["file_size"] == size
+    assert api.feed.invalidated == ["public"]
+    assert api.timelines.published == [ticket["content_id"]]
+
+def test_single_put_upload(api):
+    ticket = initiate(api, 1000, content_type="audio/mpeg")
+    assert len(ticket["urls"]) == 1
+
+    response = requests.put(ticket["urls"][0], data=b"a" * 1000, headers={"Content-Type": "audio/mpeg"})
+    assert response.status_code == 200
+
+    response = complete(api, ticket)
+    assert response.status_code == 201, response.text
+    assert api.db.tables["content"][0]["media_url"].endswith(f"{main.settings.r2_bucket_audio}/{CREATOR_ID}/{ticket['content_id']}.mp4")
+
+def test_size_mismatch_is_rejected_and_object_deleted(api):
+    ticket = initiate(api, 1000)
+    requests.put(ticket["urls"][0], data=b"a" * 999, headers={"Content-Type": "video/mp4"})
+
+    response = complete(api, ticket)
+    assert response.status_code == 400
+    assert "size" in response.json()["detail"]
+    assert not api.db.tables.get("content")
+    objects = api.s3.list_objects_v2(Bucket=main.settings.r2_bucket_video)
+    assert objects["KeyCount"] == 0
+
+def test_completing_twice_returns_the_same_content(api):
+    ticket = initiate(api, 1000)
+    requests.put(ticket["urls"][0], data=b"a" * 1000, headers={"Content-Type": "video/mp4"})
+
+    first = complete(api, ticket)
+    second = complete(api, ticket)
+    assert (first.status_code, second.status_code) == (201, 201)
+    assert first.json() == second.json()
+    assert len(api.db.tables["content"]) == 1
+    assert api.timelines.published == [ticket["content_id"]]
+
+def test_uploads_refused_without_ticket_secret(api, monkeypatch):
+    monkeypatch.setattr(main.settings, "upload_token_secret", "")
+    response = api.client.post("/content/upload/initiate", json={
+        "filename": "clip.mp4", "content_type": "video/mp4", "file_size": 1000
+    })
+    assert response.status_code == 503
+    assert api.s3.list_multipart_uploads(Bucket=main.settings.r2_bucket_video).get("Uploads") is None
@@ -0,0 +1,82 @@
+import asyncio
+
+from shared.db import DatabaseTimeout
+from view_ingest import ViewIngestor
+
+class DataError(Exception):
+    """Like postgrest's APIError for a foreign key violation."""
+    code = "23503"
+
+def views(n: int) -> list:
+    return [{"content_id": f"content-{i}", "viewer_id": None} for i in range(n)]
+
+def inserted_batches(db) -> list:
+    return [len(query.payload) for query in db.executed]
+
+def ingest(db, rows: list, **kwargs) -> ViewIngestor:
+    async def scenario():
+        ingestor = ViewIngestor(db, **kwargs)
+        ingestor.start()
+        assert ingestor.offer(rows)
+        await ingestor.drain()
+        return ingestor
+
+    return asyncio.run(scenario())
+
+def test_rows_are_flushed_in_batches(fake_db):
+    ingestor = ingest(fake_db, views(7), batch_size=3, flush_interval=0.05)
+
+    assert inserted_batches(fake_db) == [3, 3, 1]
+    assert len(fake_db.tables["analytics_views"]) == 7
+    assert ingestor.stats()["flushed"] == 7
+    assert ingestor.stats()["batches"] == 3
+
+def test_partial_batch_is_flushed_after_the_interval(fake_db):
+    async def scenario():
+        ingestor = ViewIngestor(fake_db, batch_size=100, flush_interval=0.05)
+        ingestor.start()
+        ingestor.offer(views(2))
+        await asyncio.sleep(0.2)
+        flushed = inserted_batches(fake_db)
+        await ingestor.drain()
+        return flushed
+
+    assert asyncio.run(scenario()) == [2]
+
+def test_timed_out_batch_is_not_retried(fake_db):
+    fake_db.failures = [DatabaseTimeout(10)]
+    ingestor = ingest(fake_db, views(4), batch_size=4, flush_interval=0.05)
+
+    assert inserted_batches(fake_db) == [4]
+    stats = ingestor.stats()
+    assert (stats["unconfirmed"], stats["flushed"], stats["dropped"]) == (4, 0, 0)
+
+def test_failed_batch_is_retried(fake_db):
+    fake_db.failures = [ConnectionError("reset by peer")]
+    ingestor = ingest(fake_db, views(2), batch_size=2, flush_interval=0.05)
+
+    assert inserted_batches(fake_db) == [2, 2]
+    assert ingestor.stats()["flushed"] == 2
+
+def test_rejected_batch_is_split_to_drop_only_bad_rows(fake_db):
+    # The whole batch, its first half and that half's first row are rejected
+    fake_db.failures = [DataError(), DataError(), DataError()]
+    ingestor = ingest(fake_db, views(4), batch_size=4, flush_interval=0.05)
+
+    assert inserted_batches(fake_db) == [4, 2, 1, 1, 2]
+    assert [row["content_id"] for row in fake_db.tables["analytics_views"]] == ["content-1", "content-2", "content-3"]
+    stats = ingestor.stats()
+    assert (stats["flushed"], stats["dropped"]) == (3, 1)
+
+def test_full_queue_rejects_the_whole_offer(fake_db):
+    async def scenario():
+        ingestor = ViewIngestor(fake_db, max_queue=3)
+        assert not ingestor.offer(views(1))
+        ingestor.start()
+        assert ingestor.offer(views(2))
+        assert not ingestor.offer(views(2))
+        await ingestor.drain()
+        return ingestor.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["accepted"], stats["rejected"], stats["flushed"]) == (2, 3, 2)
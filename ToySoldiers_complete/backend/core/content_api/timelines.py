@@ -0,0 +1,314 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from shared.cache import TTLCache
+from shared.pagination import encode_rank_cursor, decode_rank_cursor
+
+try:
+    import redis
+except ImportError:  # redis is optional; following pages then come from the database
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+LARGE_CREATORS_KEY = "timeline:large_creators"
+FOLLOWER_PAGE_SIZE = 1000
+# Marks a timeline that was built but had nothing in it, so it is not rebuilt on every read
+_PLACEHOLDER = ""
+
+# Push to a timeline only if it already exists: a missing one is rebuilt in
+# full on its next read, and a lone pushed entry would hide that it is missing
+_PUSH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[3]) + 1))
+end
+return 0
+"""
+
+def score_of(created_at: str) -> int:
+    """created_at as integer microseconds; exact in a redis (double) score."""
+    moment = datetime.fromisoformat(created_at)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp()) * 1_000_000 + moment.microsecond
+
+def timestamp_of(score: float) -> str:
+    seconds, micros = divmod(int(score), 1_000_000)
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=micros).isoformat()
+
+class Timelines:
+    """Home timelines behind /content/feed/following.
+
+    New public content is fanned out on write: for a creator with at most
+    `fanout_threshold` followers its id is pushed into every follower's
+    `timeline:{fan_id}` sorted set (score = created_at, capped at
+    `max_length`). Larger creators are only recorded in their own
+    `posts:{creator_id}` set and merged in when a fan reads (fan-in), so one
+    upload never turns into millions of writes. A page is read from the
+    fan's timeline plus each large creator they follow, then only those rows
+    are loaded by id; entries for deleted, hidden or unfollowed content are
+    skipped. Missing timelines (new or idle fans) are rebuilt from the
+    database, and follow lists are cached for `follows_ttl` seconds since
+    clients write `followers` directly. Redis calls run in a thread so they
+    never block the event loop. Without redis, pages are queried from the
+    database.
+    """
+
+    def __init__(
+        self,
+        db,
+        redis_url: Optional[str] = None,
+        fanout_threshold: int = 10000,
+        max_length: int = 800,
+        ttl: int = 7 * 24 * 3600,
+        follows_ttl: float = 60.0,
+        maxsize: int = 10000,
+    ):
+        self.db = db
+        self.fanout_threshold = fanout_threshold
+        self.max_length = max_length
+        self.ttl = ttl
+        self.follows = TTLCache(maxsize=maxsize, ttl=follows_ttl)
+        self._tasks: Set[asyncio.Task] = set()
+        self.fanouts = 0
+        self.fanout_writes = 0
+        self.fanins = 0
+        self.rebuilds = 0
+        self.redis = None
+        self._push = None
+
+        if redis_url and redis is not None:
+            try:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25, decode_responses=True)
+                self._push = self.redis.register_script(_PUSH_SCRIPT)
+            except Exception as e:
+                logger.warning("timelines running without redis: %s", e)
+                self.redis = None
+
+    @staticmethod
+    def _timeline_key(fan_id: str) -> str:
+        return f"timeline:{fan_id}"
+
+    @staticmethod
+    def _posts_key(creator_id: str) -> str:
+        return f"posts:{creator_id}"
+
+    def publish(self, content: dict) -> None:
+        """Fan a newly created content row out in the background."""
+        if self.redis is None or content.get("visibility") != "public":
+            return
+        task = asyncio.ensure_future(self._fan_out(content))
+        self._tasks.add(task)
+        task.add_done_callback(self._published)
+
+    def _published(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("timeline fan-out failed: %s", task.exception())
+
+    async def _fan_out(self, content: dict) -> None:
+        creator_id = str(content["creator_id"])
+        content_id = str(content["id"])
+        score = score_of(content["created_at"])
+        self.fanouts += 1
+
+        await asyncio.to_thread(self._push, keys=[self._posts_key(creator_id)], args=[score, content_id, self.max_length])
+
+        last_fan_id = None
+        while True:
+            query = (
+                self.db.table("followers")
+                .select("fan_id", count="exact" if last_fan_id is None else None)
+                .eq("creator_id", creator_id)
+                .order("fan_id")
+                .limit(FOLLOWER_PAGE_SIZE)
+            )
+            if last_fan_id is not None:
+                query = query.gt("fan_id", last_fan_id)
+            followers = await self.db.execute(query)
+
+            if last_fan_id is None:
+                large = (followers.count or 0) > self.fanout_threshold
+                await asyncio.to_thread(
+                    self.redis.sadd if large else self.redis.srem, LARGE_CREATORS_KEY, creator_id
+                )
+                if large:
+                    return
+
+            if not followers.data:
+                return
+            await asyncio.to_thread(self._push_many, [row["fan_id"] for row in followers.data], score, content_id)
+            if len(followers.data) < FOLLOWER_PAGE_SIZE:
+                return
+            last_fan_id = followers.data[-1]["fan_id"]
+
+    def _push_many(self, fan_ids: List[str], score: int, content_id: str) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for fan_id in fan_ids:
+            self._push(keys=[self._timeline_key(fan_id)], args=[score, content_id, self.max_length], client=pipe)
+        pipe.execute()
+        self.fanout_writes += len(fan_ids)
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+        for task in self._tasks:
+            task.cancel()
+
+    async def following(self, fan_id: str) -> Tuple[Set[str], Set[str]]:
+        """(creator ids the fan follows, the subset read by fan-in)."""
+        cached = self.follows.get(fan_id)
+        if cached is not None:
+            return cached
+
+        follows_data = await self.db.execute(
+            self.db.table("followers").select("creator_id").eq("fan_id", fan_id)
+        )
+        follows = {str(row["creator_id"]) for row in follows_data.data}
+        large = set()
+        if follows and self.redis is not None:
+            try:
+                large = await asyncio.to_thread(self._large_creators, sorted(follows))
+            except redis.RedisError as e:
+                logger.warning("could not read large creators: %s", e)
+
+        self.follows.set(fan_id, (follows, large))
+        return follows, large
+
+    def _large_creators(self, creator_ids: List[str]) -> Set[str]:
+        pipe = self.redis.pipeline(transaction=False)
+        for creator_id in creator_ids:
+            pipe.sismember(LARGE_CREATORS_KEY, creator_id)
+        return {creator_id for creator_id, member in zip(creator_ids, pipe.execute()) if member}
+
+    async def _newest(self, creator_ids: List[str], limit: int, before: Optional[Tuple[float, str]] = None) -> List[dict]:
+        query = (
+            self.db.table("content")
+            .select("id,created_at")
+            .in_("creator_id", creator_ids)
+            .eq("visibility", "public")
+            .order("created_at.desc,id", desc=True)
+            .limit(limit)
+        )
+        if before:
+            created_at = timestamp_of(before[0])
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{before[1]})'
+            )
+        content_data = await self.db.execute(query)
+        return content_data.data
+
+    async def _ensure(self, key: str, creator_ids: List[str]) -> None:
+        """Rebuild a timeline or posts set from the database if redis lost it."""
+        if await asyncio.to_thread(self.redis.exists, key):
+            return
+        self.rebuilds += 1
+        rows = await self._newest(creator_ids, self.max_length) if creator_ids else []
+        mapping = {row["id"]: score_of(row["created_at"]) for row in rows} or {_PLACEHOLDER: 0}
+        await asyncio.to_thread(self._store, key, mapping)
+
+    def _store(self, key: str, mapping: Dict[str, int]) -> None:
+        pipe = self.redis.pipeline()
+        pipe.zadd(key, mapping)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def _read(self, key: str, count: int, before: Optional[Tuple[float, str]]) -> List[Tuple[float, str]]:
+        # The range is inclusive of the cursor's score, so widen it by the
+        # entries sharing that score (the cursor entry itself and any ties)
+        ties = self.redis.zcount(key, before[0], before[0]) if before else 0
+        entries = self.redis.zrevrangebyscore(
+            key, before[0] if before else "+inf", "-inf", start=0, num=count + ties, withscores=True
+        )
+        return [
+            (score, member) for member, score in entries
+            if member != _PLACEHOLDER and (before is None or (score, member) < before)
+        ]
+
+    async def _from_redis(
+        self, fan_id: str, follows: Set[str], large: Set[str], count: int, before: Optional[Tuple[float, str]]
+    ) -> List[Tuple[float, str]]:
+        timeline_key = self._timeline_key(fan_id)
+        await self._ensure(timeline_key, sorted(follows - large))
+        await asyncio.to_thread(self.redis.expire, timeline_key, self.ttl)
+        entries = await asyncio.to_thread(self._read, timeline_key, count, before)
+
+        for creator_id in large:
+            self.fanins += 1
+            posts_key = self._posts_key(creator_id)
+            await self._ensure(posts_key, [creator_id])
+            entries.extend(await asyncio.to_thread(self._read, posts_key, count, before))
+
+        # A creator that just crossed the threshold can be in both places
+        return sorted(set(entries), reverse=True)[:count]
+
+    async def _candidates(
+        self, fan_id: str, follows: Set[str], large: Set[str], count: int, before: Optional[Tuple[float, str]]
+    ) -> List[Tuple[float, str]]:
+        """Up to `count` (score, content_id) entries older than `before`, newest first."""
+        if self.redis is not None:
+            try:
+                return await self._from_redis(fan_id, follows, large, count, before)
+            except redis.RedisError as e:
+                logger.warning("timeline read falling back to the database: %s", e)
+
+        rows = await self._newest(sorted(follows), count, before)
+        return [(score_of(row["created_at"]), row["id"]) for row in rows]
+
+    async def page(self, fan_id: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """(rows, next_cursor) of the fan's following feed, newest first."""
+        fan_id = str(fan_id)
+        follows, large = await self.following(fan_id)
+        if not follows:
+            return [], None
+
+        before = decode_rank_cursor(cursor) if cursor else None
+        rows: List[dict] = []
+        scores: Dict[str, float] = {}
+        more = False
+
+        # Skipped entries (deleted, hidden, unfollowed) can leave a batch
+        # short; read on past them a few times before returning a short page
+        for _ in range(3):
+            entries = await self._candidates(fan_id, follows, large, limit + 1, before)
+            if not entries:
+                more = False
+                break
+            scores.update((content_id, score) for score, content_id in entries)
+
+            content_data = await self.db.execute(
+                self.db.table("content")
+                .select("*")
+                .in_("id", [content_id for _, content_id in entries])
+                .eq("visibility", "public")
+            )
+            rows.extend(row for row in content_data.data if str(row["creator_id"]) in follows)
+            more = len(entries) > limit
+            before = entries[-1]
+            if len(rows) > limit or not more:
+                break
+
+        rows.sort(key=lambda row: (scores[row["id"]], row["id"]), reverse=True)
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            return rows[:limit], encode_rank_cursor({"rank": scores[last["id"]], "id": last["id"]})
+        return rows, encode_rank_cursor({"rank": before[0], "id": before[1]}) if more else None
+
+    def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self.redis is not None:
+            self.redis.close()
+
+    def stats(self) -> dict:
+        return {
+            "follows": self.follows.stats(),
+            "fanouts": self.fanouts,
+            "fanout_writes": self.fanout_writes,
+            "fanins": self.fanins,
+            "rebuilds": self.rebuilds,
+            "pending_fanouts": len(self._tasks),
+        }
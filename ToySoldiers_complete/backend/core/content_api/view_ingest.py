@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from shared.db import DatabaseTimeout
+
+logger = logging.getLogger(__name__)
+
+def is_data_error(error: Exception) -> bool:
+    """Postgres data/integrity errors (SQLSTATE class 22/23) fail the same way on retry."""
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and code[:2] in ("22", "23")
+
+class ViewIngestor:
+    """Buffers analytics view rows and writes them as multi-row inserts.
+
+    Events are queued in memory (at most `max_queue` rows) and a background
+    task flushes them to `analytics_views` once `batch_size` rows are waiting
+    or `flush_interval` seconds after the first row of a batch arrived. A full
+    queue rejects new events instead of growing, so callers can answer 503.
+    Batches that fail are retried with backoff (a multi-row insert is atomic,
+    so a failed one wrote nothing) and dropped after `max_retries`; a batch
+    rejected for its data (e.g. a view of deleted content) is split in halves
+    so only the offending rows are dropped. A batch that times out is not
+    retried: its insert keeps running in the database thread and may still
+    commit, so it is counted as `unconfirmed` instead of risking duplicates.
+    drain() stops intake and flushes what is left; call it on shutdown.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_retries: int = 3,
+    ):
+        self.db = db
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.accepting = False
+        self._worker: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+        self.unconfirmed = 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self.accepting = True
+            self._worker = asyncio.ensure_future(self._run())
+
+    def offer(self, rows: List[dict]) -> bool:
+        """Queue all rows or none of them; False means the caller should back off."""
+        if not self.accepting or self.queue.qsize() + len(rows) > self.max_queue:
+            self.rejected += len(rows)
+            return False
+        for row in rows:
+            self.queue.put_nowait(row)
+        self.accepted += len(rows)
+        return True
+
+    async def _next_batch(self) -> List[dict]:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: List[dict]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.db.execute(self.db.table("analytics_views").insert(batch))
+                self.flushed += len(batch)
+                self.batches += 1
+                return
+            except DatabaseTimeout as e:
+                self.unconfirmed += len(batch)
+                logger.error("view batch of %d timed out and may or may not be written: %s", len(batch), e.detail)
+                return
+            except Exception as e:
+                if is_data_error(e):
+                    await self._split(batch, e)
+                    return
+                if attempt == self.max_retries:
+                    self.dropped += len(batch)
+                    logger.error("dropping %d view events after %d attempts: %s", len(batch), attempt + 1, e)
+                    return
+                logger.warning("view batch insert failed (attempt %d): %s", attempt + 1, e)
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _split(self, batch: List[dict], error: Exception) -> None:
+        if len(batch) == 1:
+            self.dropped += 1
+            logger.warning("dropping invalid view event %s: %s", batch[0], error)
+            return
+        middle = len(batch) // 2
+        await self._flush(batch[:middle])
+        await self._flush(batch[middle:])
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        self.accepting = False
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("shutting down with %d view events unflushed", self.queue.qsize())
+        self._worker.cancel()
+        self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "max_queue": self.max_queue,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "unconfirmed": self.unconfirmed,
+        }
@@ -0,0 +1,114 @@
+"""Minimal stand-in for the Stripe API, for local runs and benchmarks.
+
+Implements only the calls the payments service makes: creating checkout
+sessions, payment intents and payouts. Responses are shaped like Stripe's,
+repeated Idempotency-Keys return the original object, and latency and
+failures can be injected to exercise StripeGateway's timeouts and breaker:
+
+    FAKE_STRIPE_LATENCY_MS=300 FAKE_STRIPE_ERROR_RATE=0.1 uvicorn fake_stripe:app --port 12111
+    STRIPE_API_BASE=http://localhost:12111 STRIPE_SECRET_KEY=sk_test_fake uvicorn main:app
+"""
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+from typing import Dict
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+LATENCY = float(os.getenv("FAKE_STRIPE_LATENCY_MS", "0")) / 1000
+ERROR_RATE = float(os.getenv("FAKE_STRIPE_ERROR_RATE", "0"))
+
+app = FastAPI(title="Fake Stripe")
+responses: Dict[str, dict] = {}
+
+def parse_form(body: bytes) -> dict:
+    """Stripe's form encoding (`metadata[key]=v`, `line_items[0][quantity]=1`) as nested dicts."""
+    params: dict = {}
+    for key, value in parse_qsl(body.decode(), keep_blank_values=True):
+        parts = re.findall(r"[^\[\]]+", key)
+        node = params
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return params
+
+def new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+def checkout_session(params: dict) -> dict:
+    session_id = new_id("cs_test")
+    return {
+        "id": session_id,
+        "object": "checkout.session",
+        "mode": params.get("mode", "payment"),
+        "status": "open",
+        "payment_status": "unpaid",
+        "url": f"https://checkout.stripe.com/c/pay/{session_id}",
+        "success_url": params.get("success_url"),
+        "cancel_url": params.get("cancel_url"),
+        "metadata": params.get("metadata", {}),
+    }
+
+def payment_intent(params: dict) -> dict:
+    intent_id = new_id("pi")
+    return {
+        "id": intent_id,
+        "object": "payment_intent",
+        "amount": int(params.get("amount", 0)),
+        "currency": params.get("currency", "usd"),
+        "status": "requires_payment_method",
+        "client_secret": f"{intent_id}_secret_{uuid.uuid4().hex[:24]}",
+        "metadata": params.get("metadata", {}),
+    }
+
+def payout(params: dict) -> dict:
+    return {
+        "id": new_id("po"),
+        "object": "payout",
+        "amount": int(params.get("amount", 0)),
+        "currency": params.get("currency", "usd"),
+        "status": "pending",
+        "arrival_date": int(time.time()) + 2 * 86400,
+    }
+
+RESOURCES = {
+    "checkout/sessions": checkout_session,
+    "payment_intents": payment_intent,
+    "payouts": payout,
+}
+
+@app.post("/v1/{resource:path}")
+async def create(resource: str, request: Request):
+    if resource not in RESOURCES:
+        return JSONResponse(status_code=404, content={"error": {
+            "type": "invalid_request_error",
+            "message": f"Unrecognized request URL (POST: /v1/{resource})",
+        }})
+
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        return JSONResponse(status_code=500, content={"error": {
+            "type": "api_error",
+            "message": "Injected failure",
+        }})
+
+    key = request.headers.get("idempotency-key")
+    cache_key = f"{request.headers.get('stripe-account', '')}:{resource}:{key}"
+    if key and cache_key in responses:
+        return JSONResponse(content=responses[cache_key], headers={"Idempotent-Replayed": "true"})
+
+    obj = RESOURCES[resource](parse_form(await request.body()))
+    if key:
+        responses[cache_key] = obj
+    return obj
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=int(os.getenv("FAKE_STRIPE_PORT", "12111")))
@@ -2,27 +2,51 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic_settings import BaseSettings
 from supabase import create_client, Client
-import stripe
+from shared.auth import TokenVerifier
+from shared.clients import Lifespan
+from shared.creators import CreatorResolver
+from shared.db import Database, client_options
+from webhook_queue import StripeEventQueue
+from stripe_gateway import StripeGateway
 import os
 
 class Settings(BaseSettings):
     stripe_secret_key: str = os.getenv("STRIPE_SECRET_KEY", "")
     stripe_webhook_secret: str = os.getenv("STRIPE_WEBHOOK_SECRET", "")
     stripe_connect_client_id: str = os.getenv("STRIPE_CONNECT_CLIENT_ID", "")
+    stripe_api_base: str = os.getenv("STRIPE_API_BASE", "")
+    stripe_max_concurrency: int = int(os.getenv("STRIPE_MAX_CONCURRENCY", "8"))
+    stripe_timeout: float = float(os.getenv("STRIPE_TIMEOUT", "10"))
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_service_role_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+    jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "")
+    redis_url: str = os.getenv("REDIS_URL", "")
+    database_max_concurrency: int = int(os.getenv("DATABASE_MAX_CONCURRENCY", "16"))
+    database_timeout: float = float(os.getenv("DATABASE_TIMEOUT", "10"))
+    database_prewarm_connections: int = int(os.getenv("DATABASE_PREWARM_CONNECTIONS", "4"))
+    webhook_workers: int = int(os.getenv("WEBHOOK_WORKERS", "4"))
+    webhook_batch_size: int = int(os.getenv("WEBHOOK_BATCH_SIZE", "50"))
+    webhook_max_attempts: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
     
     class Config:
         env_file = ".env"
 
 settings = Settings()
+lifespan = Lifespan()
 
-stripe.api_key = settings.stripe_secret_key
+stripe_gateway = StripeGateway(
+    settings.stripe_secret_key,
+    api_base=settings.stripe_api_base or None,
+    max_concurrency=settings.stripe_max_concurrency,
+    timeout=settings.stripe_timeout
+)
+lifespan.on_shutdown(stripe_gateway.close)
 
 app = FastAPI(
     title="Toy Soldiers Payments Service",
     description="Payment processing, tipping, and subscription management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -33,7 +57,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
+supabase: Client = create_client(
+    settings.supabase_url,
+    settings.supabase_service_role_key,
+    options=client_options(settings.database_timeout)
+)
+db = Database(supabase, max_concurrency=settings.database_max_concurrency, timeout=settings.database_timeout)
+lifespan.on_warm(lambda: db.warm(settings.database_prewarm_connections))
+lifespan.on_shutdown(db.close)
+
+token_verifier = TokenVerifier(
+    settings.jwt_secret_key,
+    remote_get_user=supabase.auth.get_user,
+    redis_url=settings.redis_url
+)
+lifespan.on_shutdown(token_verifier.close)
+get_current_user = token_verifier.current_user()
+get_optional_user = token_verifier.optional_user()
+creator_resolver = CreatorResolver(db, redis_url=settings.redis_url)
+lifespan.on_shutdown(creator_resolver.close)
+stripe_events = StripeEventQueue(
+    db,
+    workers=settings.webhook_workers,
+    batch_size=settings.webhook_batch_size,
+    max_attempts=settings.webhook_max_attempts
+)
+lifespan.on_startup(stripe_events.start)
+lifespan.on_shutdown(stripe_events.stop)
 
 from routes import checkout, webhook, payouts
 
@@ -46,7 +96,15 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "payments_service",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "caches": {
+            "tokens": token_verifier.stats(),
+            "creators": creator_resolver.stats()
+        },
+        "database": db.stats(),
+        "stripe": stripe_gateway.stats(),
+        "webhooks": stripe_events.stats(),
+        "warmed": lifespan.warmed
     }
 
 @app.get("/")
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header
 from pydantic import BaseModel
 from typing import Optional
 from decimal import Decimal
 import stripe
-from main import supabase
+from main import supabase, db, get_current_user, stripe_gateway
+from shared.auth import AuthUser
+from stripe_gateway import idempotency_key
+from shared.pagination import keyset, next_page
 import uuid
 
 router = APIRouter()
@@ -22,25 +25,11 @@ class CheckoutResponse(BaseModel):
 @router.post("/checkout", response_model=CheckoutResponse)
 async def create_checkout_session(
     request: CheckoutRequest,
-    authorization: str = Header(None)
+    user: AuthUser = Depends(get_current_user),
+    request_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     try:
-        if not authorization:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
-            )
-        
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        creator_data = supabase.table("creators").select("*").eq("id", request.to_creator_id).execute()
+        creator_data = await db.execute(supabase.table("creators").select("*").eq("id", request.to_creator_id))
         
         if not creator_data.data:
             raise HTTPException(
@@ -48,7 +37,8 @@ async def create_checkout_session(
                 detail="Creator not found"
             )
         
-        session = stripe.checkout.Session.create(
+        session = await stripe_gateway.create_checkout_session(
+            idempotency_key("checkout", user.id, request_key),
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -64,20 +54,23 @@ async def create_checkout_session(
             success_url=request.success_url,
             cancel_url=request.cancel_url,
             metadata={
-                'from_user_id': str(user_response.user.id),
+                'from_user_id': user.id,
                 'to_creator_id': request.to_creator_id,
                 'type': 'tip'
             }
         )
         
+        # A retried request with the same Idempotency-Key gets the original
+        # session back from Stripe; its tip is already recorded, and the
+        # unique stripe_txn (migration 012) keeps concurrent retries to one row
         tip_data = {
-            "from_user": str(user_response.user.id),
+            "from_user": user.id,
             "to_creator": request.to_creator_id,
             "amount": request.amount,
             "stripe_txn": session.id,
             "status": "pending"
         }
-        supabase.table("tips").insert(tip_data).execute()
+        await db.execute(supabase.table("tips").upsert(tip_data, on_conflict="stripe_txn", ignore_duplicates=True))
         
         return CheckoutResponse(
             checkout_url=session.url,
@@ -89,6 +82,8 @@ async def create_checkout_session(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Stripe error: {str(e)}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -99,29 +94,16 @@ async def create_checkout_session(
 async def create_tip(
     to_creator_id: str,
     amount: float,
-    authorization: str = Header(None)
+    user: AuthUser = Depends(get_current_user),
+    request_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     try:
-        if not authorization:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
-            )
-        
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        payment_intent = stripe.PaymentIntent.create(
+        payment_intent = await stripe_gateway.create_payment_intent(
+            idempotency_key("tip", user.id, request_key),
             amount=int(amount * 100),
             currency='usd',
             metadata={
-                'from_user_id': str(user_response.user.id),
+                'from_user_id': user.id,
                 'to_creator_id': to_creator_id
             }
         )
@@ -131,6 +113,13 @@ async def create_tip(
             "payment_intent_id": payment_intent.id
         }
         
+    except stripe.error.StripeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Stripe error: {str(e)}"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,39 +128,27 @@ async def create_tip(
 
 @router.get("/history")
 async def get_payment_history(
-    authorization: str = Header(None),
-    limit: int = 50,
-    offset: int = 0
+    user: AuthUser = Depends(get_current_user),
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0, deprecated=True)
 ):
     try:
-        if not authorization:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
-            )
-        
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        tips_data = supabase.table("tips") \
+        query = supabase.table("tips") \
             .select("*") \
-            .eq("from_user", str(user_response.user.id)) \
-            .order("created_at", desc=True) \
-            .limit(limit) \
-            .offset(offset) \
-            .execute()
+            .eq("from_user", user.id)
+        
+        tips_data = await db.execute(keyset(query, cursor, limit, offset))
+        tips, next_cursor = next_page(tips_data.data, limit)
         
         return {
-            "tips": tips_data.data,
-            "total": len(tips_data.data)
+            "tips": tips,
+            "total": len(tips),
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
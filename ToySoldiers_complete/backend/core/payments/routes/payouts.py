@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import stripe
-from main import supabase
+from main import supabase, db, get_current_user, creator_resolver, stripe_gateway
+from shared.auth import AuthUser
+from shared.pagination import keyset, next_page, NEXT_CURSOR_HEADER
+from stripe_gateway import idempotency_key
 from datetime import datetime, timedelta
 
 router = APIRouter()
@@ -19,47 +22,73 @@ class PayoutResponse(BaseModel):
 
 @router.get("/payouts")
 async def get_payouts(
-    authorization: str = Header(None),
-    limit: int = 50
+    user: AuthUser = Depends(get_current_user)
 ):
     try:
-        if not authorization:
+        creator_id = await creator_resolver.resolve_id(user.id)
+        
+        if not creator_id:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a creator account"
             )
         
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
+        # creator_stats is updated by a trigger as the webhook workers complete
+        # tips (migrations 009, 010), so earnings are one primary-key read
+        stats = await db.execute(
+            supabase.table("creator_stats")
+            .select("total_tips,tip_count,updated_at")
+            .eq("creator_id", creator_id)
+            .limit(1)
+        )
         
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
+        earnings = stats.data[0] if stats.data else {"total_tips": 0, "tip_count": 0, "updated_at": None}
+        
+        return {
+            "total_earnings": float(earnings["total_tips"]),
+            "total_tips": earnings["tip_count"],
+            "updated_at": earnings["updated_at"]
+        }
         
-        creator_data = supabase.table("creators").select("*").eq("user_id", str(user_response.user.id)).execute()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get payouts: {str(e)}"
+        )
+
+@router.get("/payouts/tips")
+async def get_payout_tips(
+    response: Response,
+    user: AuthUser = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    try:
+        creator_id = await creator_resolver.resolve_id(user.id)
         
-        if not creator_data.data:
+        if not creator_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a creator account"
             )
         
-        tips_data = supabase.table("tips") \
+        query = supabase.table("tips") \
             .select("*") \
-            .eq("to_creator", creator_data.data[0]["id"]) \
-            .eq("status", "completed") \
-            .order("created_at", desc=True) \
-            .limit(limit) \
-            .execute()
+            .eq("to_creator", creator_id) \
+            .eq("status", "completed")
+        
+        tips_data = await db.execute(keyset(query, cursor, limit))
+        tips, next_cursor = next_page(tips_data.data, limit)
         
-        total_earnings = sum(tip["amount"] for tip in tips_data.data)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         return {
-            "total_earnings": total_earnings,
-            "tips": tips_data.data,
-            "total_tips": len(tips_data.data)
+            "tips": tips,
+            "total": len(tips),
+            "next_cursor": next_cursor
         }
         
     except HTTPException:
@@ -67,39 +96,25 @@ async def get_payouts(
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get payouts: {str(e)}"
+            detail=f"Failed to get tips: {str(e)}"
         )
 
 @router.post("/payouts/request", response_model=PayoutResponse)
 async def request_payout(
     request: PayoutRequest,
-    authorization: str = Header(None)
+    user: AuthUser = Depends(get_current_user),
+    request_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     try:
-        if not authorization:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required"
-            )
-        
-        token = authorization.replace("Bearer ", "")
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        creator_data = supabase.table("creators").select("*").eq("user_id", str(user_response.user.id)).execute()
+        creator = await creator_resolver.resolve(user.id)
         
-        if not creator_data.data:
+        if not creator:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a creator account"
             )
         
-        payout_account = creator_data.data[0].get("payout_account")
+        payout_account = creator.get("payout_account")
         
         if not payout_account:
             raise HTTPException(
@@ -107,7 +122,8 @@ async def request_payout(
                 detail="No payout account configured"
             )
         
-        payout = stripe.Payout.create(
+        payout = await stripe_gateway.create_payout(
+            idempotency_key("payout", user.id, request_key),
             amount=int(request.amount * 100),
             currency=request.currency,
             stripe_account=payout_account
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request, HTTPException, status
+import json
 import stripe
-from main import settings, supabase
+from main import settings, stripe_events
 
 router = APIRouter()
 
@@ -10,7 +11,7 @@ async def stripe_webhook(request: Request):
     sig_header = request.headers.get('stripe-signature')
     
     try:
-        event = stripe.Webhook.construct_event(
+        stripe.Webhook.construct_event(
             payload, sig_header, settings.stripe_webhook_secret
         )
     except ValueError:
@@ -18,36 +19,14 @@ async def stripe_webhook(request: Request):
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
     
-    if event['type'] == 'checkout.session.completed':
-        session = event['data']['object']
-        
-        from_user_id = session['metadata'].get('from_user_id')
-        to_creator_id = session['metadata'].get('to_creator_id')
-        
-        supabase.table("tips").update({
-            "status": "completed"
-        }).eq("stripe_txn", session['id']).execute()
-        
-    elif event['type'] == 'payment_intent.succeeded':
-        payment_intent = event['data']['object']
-        
-        from_user_id = payment_intent['metadata'].get('from_user_id')
-        to_creator_id = payment_intent['metadata'].get('to_creator_id')
-        
-        tip_data = {
-            "from_user": from_user_id,
-            "to_creator": to_creator_id,
-            "amount": payment_intent['amount'] / 100,
-            "stripe_txn": payment_intent['id'],
-            "status": "completed"
-        }
-        supabase.table("tips").insert(tip_data).execute()
-        
-    elif event['type'] == 'payment_intent.payment_failed':
-        payment_intent = event['data']['object']
-        
-        supabase.table("tips").update({
-            "status": "failed"
-        }).eq("stripe_txn", payment_intent['id']).execute()
+    # Only record the event here; StripeEventQueue workers apply it to tips.
+    # Stripe retries anything that is not a 2xx, so a failed write is a 500.
+    try:
+        queued = await stripe_events.accept(json.loads(payload))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to record webhook event: {str(e)}"
+        )
     
-    return {"status": "success"}
+    return {"status": "success", "queued": queued}
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+import stripe
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+# Failures that say Stripe (or the network to it) is unhealthy, as opposed
+# to a rejected card or bad parameters
+TRANSIENT_ERRORS = (stripe.error.APIConnectionError, stripe.error.APIError, stripe.error.RateLimitError)
+
+class StripeTimeout(HTTPException):
+    def __init__(self, timeout: float):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Stripe request timed out after {timeout:g}s"
+        )
+
+class StripeUnavailable(HTTPException):
+    def __init__(self, detail: str = "Payment provider unavailable, try again shortly"):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+def idempotency_key(operation: str, user_id: str, client_key: Optional[str] = None) -> str:
+    """Stripe idempotency key for one API call.
+
+    A client-supplied Idempotency-Key makes the client's own retries return
+    the original object; it is scoped to the user and operation so keys
+    cannot collide across either. Without one, a fresh key still makes the
+    SDK's network retries safe.
+    """
+    return f"{operation}:{user_id}:{client_key or uuid.uuid4()}"
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive transient failures.
+
+    Once open, calls are refused for `reset_timeout` seconds; then a single
+    trial call is let through, which closes the breaker on success or opens
+    it again on failure.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self.opens = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._trial or self.clock() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self._trial or self.clock() - self.opened_at < self.reset_timeout:
+            return False
+        self._trial = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def release(self) -> None:
+        """End a call that says nothing about Stripe's health (e.g. cancelled).
+
+        Frees the half-open trial slot so the next call becomes the probe.
+        """
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial:
+                self.opens += 1
+            self.opened_at = self.clock()
+            self._trial = False
+
+class StripeGateway:
+    """Runs blocking stripe-python calls off the event loop.
+
+    stripe 7.x is synchronous. Calls go to a thread pool of
+    `max_concurrency` workers; each worker thread keeps its own keep-alive
+    HTTP session to Stripe, so connections are reused instead of opened per
+    request. A call that does not finish within `timeout` seconds raises
+    StripeTimeout (504). Connection errors, 5xx and rate limits are retried
+    by the SDK (`max_network_retries`, same idempotency key) and then count
+    towards the circuit breaker; while it is open calls raise
+    StripeUnavailable (503) without contacting Stripe. Other StripeErrors
+    (declines, invalid requests) are raised unchanged. Point `api_base` at
+    fake_stripe.py for local runs and benchmarks.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_base: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout: float = 10.0,
+        max_network_retries: int = 2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="stripe")
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.total_time = 0.0
+
+        stripe.api_key = api_key
+        if api_base:
+            stripe.api_base = api_base
+        stripe.max_network_retries = max_network_retries
+        stripe.default_http_client = stripe.http_client.RequestsClient(timeout=timeout)
+
+    async def call(self, fn: Callable, *args, **params) -> Any:
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise StripeUnavailable()
+
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, partial(fn, *args, **params)),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise StripeTimeout(self.timeout)
+        except TRANSIENT_ERRORS as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            logger.warning("stripe call %s failed: %s", getattr(fn, "__qualname__", fn), e)
+            raise StripeUnavailable()
+        except stripe.error.StripeError:
+            # The request reached Stripe and was answered; Stripe is healthy
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled (client went away) or a bug on our side: not a sign
+            # that Stripe is unhealthy, but a half-open probe must not stay
+            # in flight forever
+            self.breaker.release()
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_time += time.monotonic() - started
+
+        self.breaker.record_success()
+        return result
+
+    async def create_checkout_session(self, idempotency_key: str, **params) -> Any:
+        return await self.call(stripe.checkout.Session.create, idempotency_key=idempotency_key, **params)
+
+    async def create_payment_intent(self, idempotency_key: str, **params) -> Any:
+        return await self.call(stripe.PaymentIntent.create, idempotency_key=idempotency_key, **params)
+
+    async def create_payout(self, idempotency_key: str, **params) -> Any:
+        return await self.call(stripe.Payout.create, idempotency_key=idempotency_key, **params)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "avg_ms": round(self.total_time / self.calls * 1000, 2) if self.calls else 0.0,
+        }
+
+if __name__ == "__main__":
+    # Benchmark against fake_stripe.py (never a live key):
+    #   uvicorn fake_stripe:app --port 12111 &
+    #   python stripe_gateway.py [calls] [concurrency]
+    import json
+    import os
+    import sys
+
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    gateway = StripeGateway(
+        api_key="sk_test_fake",
+        api_base=os.getenv("STRIPE_API_BASE", "http://localhost:12111"),
+        max_concurrency=int(os.getenv("STRIPE_MAX_CONCURRENCY", "8")),
+    )
+
+    async def bench() -> dict:
+        latencies = []
+        max_lag = 0.0
+        running = True
+        limiter = asyncio.Semaphore(concurrency)
+
+        async def watch_loop() -> None:
+            # How late a 10ms timer fires shows whether Stripe calls block the loop
+            nonlocal max_lag
+            while running:
+                started = time.monotonic()
+                await asyncio.sleep(0.01)
+                max_lag = max(max_lag, time.monotonic() - started - 0.01)
+
+        async def one(i: int) -> None:
+            async with limiter:
+                started = time.monotonic()
+                await gateway.create_payment_intent(
+                    idempotency_key(f"bench-{i}", "bench"), amount=500, currency="usd"
+                )
+                latencies.append(time.monotonic() - started)
+
+        watcher = asyncio.ensure_future(watch_loop())
+        started = time.monotonic()
+        await asyncio.gather(*(one(i) for i in range(calls)))
+        elapsed = time.monotonic() - started
+        running = False
+        await watcher
+
+        latencies.sort()
+        return {
+            "calls": calls,
+            "seconds": round(elapsed, 3),
+            "calls_per_second": round(calls / elapsed, 1),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+            "max_loop_lag_ms": round(max_lag * 1000, 1),
+            "gateway": gateway.stats(),
+        }
+
+    try:
+        print(json.dumps(asyncio.run(bench())))
+    finally:
+        gateway.close()
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+
+import pytest
+import stripe
+
+from stripe_gateway import CircuitBreaker, StripeGateway, StripeTimeout, StripeUnavailable, idempotency_key
+
+def connection_error():
+    raise stripe.error.APIConnectionError("connection refused")
+
+def card_declined():
+    raise stripe.error.CardError("declined", param=None, code="card_declined")
+
+def make_gateway(clock=None, **kwargs) -> StripeGateway:
+    params = {"max_concurrency": 2, "timeout": 1.0, "failure_threshold": 2, "reset_timeout": 30.0}
+    params.update(kwargs)
+    gateway = StripeGateway("sk_test_fake", **params)
+    if clock is not None:
+        gateway.breaker.clock = clock
+    return gateway
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.opens == 1
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_breaker_lets_one_probe_through_after_reset_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only the one probe while it is in flight
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opens == 2
+    assert not breaker.allow()
+
+def test_transient_errors_open_breaker_and_fail_fast(clock):
+    gateway = make_gateway(clock)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        connection_error()
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(StripeUnavailable):
+                await gateway.call(failing)
+        with pytest.raises(StripeUnavailable):
+            await gateway.call(failing)
+
+    try:
+        asyncio.run(run())
+    finally:
+        gateway.close()
+    # The third call was refused without reaching Stripe
+    assert len(calls) == 2
+    assert gateway.stats()["rejected"] == 1
+    assert gateway.breaker.state == "open"
+
+def test_declines_pass_through_and_count_as_healthy(clock):
+    gateway = make_gateway(clock)
+
+    async def run():
+        with pytest.raises(StripeUnavailable):
+            await gateway.call(connection_error)
+        with pytest.raises(stripe.error.CardError):
+            await gateway.call(card_declined)
+        with pytest.raises(StripeUnavailable):
+            await gateway.call(connection_error)
+
+    try:
+        asyncio.run(run())
+    finally:
+        gateway.close()
+    assert gateway.breaker.state == "closed"
+
+def test_timeout_raises_504():
+    gateway = make_gateway(timeout=0.05)
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(StripeTimeout):
+            await gateway.call(release.wait, 5)
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        gateway.close()
+    assert gateway.stats()["timeouts"] == 1
+
+def test_cancelled_probe_releases_trial_slot(clock):
+    gateway = make_gateway(clock, failure_threshold=1)
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(StripeUnavailable):
+            await gateway.call(connection_error)
+        clock.now += 30
+
+        probe = asyncio.ensure_future(gateway.call(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert gateway.breaker.state == "half_open"
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        release.set()
+
+        # A client going away says nothing about Stripe: the breaker is not
+        # reopened, and the next call becomes the probe straight away
+        assert gateway.breaker.opens == 1
+        assert await gateway.call(lambda: "ok") == "ok"
+        assert gateway.breaker.state == "closed"
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        gateway.close()
+
+def test_cancellations_do_not_open_breaker(clock):
+    gateway = make_gateway(clock, failure_threshold=2)
+    release = threading.Event()
+
+    async def run():
+        for _ in range(5):
+            call = asyncio.ensure_future(gateway.call(release.wait, 5))
+            await asyncio.sleep(0.01)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+        release.set()
+        assert gateway.breaker.state == "closed"
+        assert await gateway.call(lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        gateway.close()
+    assert gateway.stats()["rejected"] == 0
+
+def test_unexpected_error_in_probe_releases_it(clock):
+    gateway = make_gateway(clock, failure_threshold=1)
+
+    def broken():
+        raise RuntimeError("bug")
+
+    async def run():
+        with pytest.raises(StripeUnavailable):
+            await gateway.call(connection_error)
+        clock.now += 30
+        with pytest.raises(RuntimeError):
+            await gateway.call(broken)
+        assert gateway.breaker.opens == 1
+        assert await gateway.call(lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(run())
+    finally:
+        gateway.close()
+
+def test_idempotency_key_scoping():
+    assert idempotency_key("tip", "user-1", "abc") == "tip:user-1:abc"
+    assert idempotency_key("tip", "user-1", "abc") != idempotency_key("payout", "user-1", "abc")
+    assert idempotency_key("tip", "user-1") != idempotency_key("tip", "user-1")
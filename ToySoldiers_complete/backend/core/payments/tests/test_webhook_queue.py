@@ -0,0 +1,177 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from webhook_queue import StripeEventQueue
+
+class StripeEvents:
+    """claim_stripe_events() and replay_stripe_events() from migration 010, over FakeDatabase rows.
+
+    Rows are in received order, which stands in for the BIGSERIAL id. With
+    `backoff=False` retried events are due again at once.
+    """
+
+    def __init__(self, db, backoff: bool = True):
+        self.rows = db.tables.setdefault("stripe_events", [])
+        self.backoff = backoff
+        db.functions.update(claim_stripe_events=self.claim, replay_stripe_events=self.replay)
+
+    def _defaults(self, row: dict) -> dict:
+        row.setdefault("status", "pending")
+        row.setdefault("attempts", 0)
+        return row
+
+    def _due(self, row: dict, now: datetime, lease: timedelta) -> bool:
+        if row["status"] == "processing":
+            return datetime.fromisoformat(row["locked_at"]) < now - lease
+        available_at = row.get("available_at")
+        return not self.backoff or available_at is None or datetime.fromisoformat(available_at) <= now
+
+    def claim(self, p_limit: int, p_lease: str) -> list:
+        now = datetime.now(timezone.utc)
+        lease = timedelta(seconds=int(p_lease.split()[0]))
+        unfinished, claimed = set(), []
+        for row in map(self._defaults, self.rows):
+            if row["status"] not in ("pending", "processing"):
+                continue
+            # Never past an earlier unfinished event of the same transaction
+            if row["stripe_txn"] not in unfinished and len(claimed) < p_limit and self._due(row, now, lease):
+                row.update(status="processing", locked_at=now.isoformat(), attempts=row["attempts"] + 1)
+                claimed.append(dict(row))
+            unfinished.add(row["stripe_txn"])
+        return claimed
+
+    def replay(self, p_event_ids=None) -> list:
+        replayed = []
+        for row in map(self._defaults, self.rows):
+            if row["status"] == "dead" and (p_event_ids is None or row["event_id"] in p_event_ids):
+                row.update(status="pending", attempts=0, last_error=None, available_at=None, locked_at=None)
+                replayed.append(row["event_id"])
+        return replayed
+
+    def status(self, event_id: str) -> dict:
+        return next(row for row in self.rows if row["event_id"] == event_id)
+
+def stripe_event(event_id: str, event_type: str, txn: str) -> dict:
+    obj = {"id": txn, "amount": 500, "metadata": {"to_creator_id": "creator-1", "from_user_id": "fan-1"}}
+    return {"id": event_id, "type": event_type, "data": {"object": obj}}
+
+class Applied:
+    """Records (stripe_txn, type) as the queue's tip writers succeed.
+
+    failures[(stripe_txn, type)] = n makes the writes fail on an event's first n attempts.
+    """
+
+    def __init__(self, queue: StripeEventQueue):
+        self.order = []
+        self.failures = {}
+        for name in ("_complete", "_record", "_fail"):
+            setattr(queue, name, self._wrap(getattr(queue, name)))
+
+    def _wrap(self, write):
+        async def recorded(events):
+            for event in events:
+                key = (event["stripe_txn"], event["type"])
+                if event["attempts"] <= self.failures.get(key, 0):
+                    raise RuntimeError(f"tip write failed for {event['event_id']}")
+            await write(events)
+            self.order.extend((event["stripe_txn"], event["type"]) for event in events)
+        return recorded
+
+    def of(self, txn: str) -> list:
+        return [event_type for applied_txn, event_type in self.order if applied_txn == txn]
+
+async def settle(events: StripeEvents, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while any(row.get("status", "pending") in ("pending", "processing") for row in events.rows):
+        assert asyncio.get_running_loop().time() < deadline, "stripe events were not applied"
+        await asyncio.sleep(0.01)
+
+LIFECYCLE = ["payment_intent.payment_failed", "payment_intent.succeeded", "checkout.session.completed"]
+
+def test_duplicate_deliveries_are_recorded_once(fake_db):
+    StripeEvents(fake_db)
+    queue = StripeEventQueue(fake_db)
+
+    async def scenario():
+        event = stripe_event("evt_1", "payment_intent.succeeded", "pi_1")
+        return [await queue.accept(event), await queue.accept(event), await queue.accept({"id": "evt_2", "type": "customer.created"})]
+
+    assert asyncio.run(scenario()) == [True, False, False]
+    assert len(fake_db.tables["stripe_events"]) == 1
+    assert (queue.accepted, queue.duplicates) == (1, 1)
+
+def test_events_of_a_transaction_apply_in_order_across_workers(fake_db):
+    events = StripeEvents(fake_db, backoff=False)
+    queue = StripeEventQueue(fake_db, workers=4, batch_size=2, poll_interval=0.01)
+    applied = Applied(queue)
+    # The first event of pi_a fails twice; pi_a's later events must wait for it
+    applied.failures[("pi_a", LIFECYCLE[0])] = 2
+
+    async def scenario():
+        queue.start()
+        for n, event_type in enumerate(LIFECYCLE):
+            for txn in ("pi_a", "pi_b", "pi_c"):
+                await queue.accept(stripe_event(f"evt_{txn}_{n}", event_type, txn))
+        await settle(events)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    for txn in ("pi_a", "pi_b", "pi_c"):
+        assert applied.of(txn) == LIFECYCLE
+    assert events.status("evt_pi_a_0")["attempts"] == 3
+    assert (queue.applied, queue.retried, queue.dead) == (9, 2, 0)
+
+def test_failed_event_is_scheduled_with_backoff(fake_db):
+    events = StripeEvents(fake_db)
+    queue = StripeEventQueue(fake_db, workers=1, poll_interval=0.01)
+    applied = Applied(queue)
+    applied.failures[("pi_a", LIFECYCLE[0])] = math.inf
+
+    async def scenario():
+        queue.start()
+        await queue.accept(stripe_event("evt_1", LIFECYCLE[0], "pi_a"))
+        await queue.accept(stripe_event("evt_2", LIFECYCLE[1], "pi_a"))
+        await asyncio.sleep(0.1)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    failed = events.status("evt_1")
+    assert (failed["status"], failed["attempts"]) == ("pending", 1)
+    assert datetime.fromisoformat(failed["available_at"]) > datetime.now(timezone.utc)
+    assert "tip write failed" in failed["last_error"]
+    # Held back behind the failed event
+    assert events.status("evt_2")["attempts"] == 0
+    assert applied.order == []
+
+def test_event_is_dead_lettered_after_max_attempts_and_can_be_replayed(fake_db):
+    events = StripeEvents(fake_db, backoff=False)
+    queue = StripeEventQueue(fake_db, workers=2, poll_interval=0.01, max_attempts=3)
+    applied = Applied(queue)
+    applied.failures[("pi_a", LIFECYCLE[0])] = math.inf
+
+    async def scenario():
+        queue.start()
+        await queue.accept(stripe_event("evt_1", LIFECYCLE[0], "pi_a"))
+        await queue.accept(stripe_event("evt_2", LIFECYCLE[0], "pi_b"))
+        await queue.accept(stripe_event("evt_3", LIFECYCLE[1], "pi_a"))
+        await settle(events)
+        dead = await queue.dead_events()
+
+        applied.failures.clear()
+        replayed = await queue.replay()
+        await settle(events)
+        await queue.stop()
+        return dead, replayed
+
+    dead, replayed = asyncio.run(scenario())
+    assert [event["event_id"] for event in dead] == ["evt_1"]
+    assert dead[0]["attempts"] == 3
+    assert replayed == ["evt_1"]
+    # A dead event no longer holds back its transaction's later events
+    assert set(applied.order[:2]) == {("pi_b", LIFECYCLE[0]), ("pi_a", LIFECYCLE[1])}
+    assert applied.order[-1] == ("pi_a", LIFECYCLE[0])
+    assert events.status("evt_1")["status"] == "done"
+    assert (queue.retried, queue.dead) == (2, 1)
@@ -0,0 +1,288 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Events applied to tips; the webhook acknowledges every other type without recording it
+HANDLED_EVENTS = {
+    "checkout.session.completed",
+    "payment_intent.succeeded",
+    "payment_intent.payment_failed",
+}
+
+def event_row(event: dict) -> Optional[dict]:
+    """The stripe_events row for a verified Stripe event, or None if it is not handled."""
+    if event.get("type") not in HANDLED_EVENTS:
+        return None
+    obj = event["data"]["object"]
+    return {
+        "event_id": event["id"],
+        "type": event["type"],
+        "stripe_txn": obj["id"],
+        "payload": obj,
+    }
+
+class StripeEventQueue:
+    """Applies Stripe webhook events to tips from the stripe_events table.
+
+    accept() records a verified event (duplicate event ids are ignored, so
+    Stripe's redeliveries are no-ops) and wakes the workers; the webhook
+    answers as soon as the row is written. `workers` tasks claim up to
+    `batch_size` events at a time with claim_stripe_events() (migration 010),
+    which never hands out an event while an earlier one for the same
+    stripe_txn is unfinished, so each transaction's events apply in order
+    across workers and processes. A claimed batch is written with one
+    statement per event type; if that fails, its events are retried one by
+    one so a single bad event cannot hold back the rest. Failed events are
+    retried with backoff and marked 'dead' after `max_attempts`; replay them
+    with `python webhook_queue.py replay`. Events left 'processing' by a
+    crashed worker are reclaimed after `lease` seconds, and idle workers
+    poll every `poll_interval` seconds for events accepted by other processes.
+    """
+
+    def __init__(
+        self,
+        db,
+        workers: int = 4,
+        batch_size: int = 50,
+        poll_interval: float = 5.0,
+        max_attempts: int = 8,
+        lease: int = 300,
+    ):
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._stopping = False
+        self.accepted = 0
+        self.duplicates = 0
+        self.applied = 0
+        self.batches = 0
+        self.retried = 0
+        self.dead = 0
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._stopping = False
+            self._tasks = [asyncio.ensure_future(self._run()) for _ in range(self.workers)]
+
+    async def accept(self, event: dict) -> bool:
+        """Record a verified event; False if it was already received."""
+        row = event_row(event)
+        if row is None:
+            return False
+        result = await self.db.execute(
+            self.db.table("stripe_events").upsert(row, on_conflict="event_id", ignore_duplicates=True)
+        )
+        if not result.data:
+            self.duplicates += 1
+            return False
+        self.accepted += 1
+        self._wake.set()
+        return True
+
+    async def _claim(self) -> List[dict]:
+        result = await self.db.execute(self.db.client.rpc("claim_stripe_events", {
+            "p_limit": self.batch_size,
+            "p_lease": f"{self.lease} seconds",
+        }))
+        return result.data or []
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                events = await self._claim()
+            except Exception as e:
+                logger.warning("could not claim stripe events: %s", e)
+                events = []
+
+            if not events:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Shielded so stop() can let an in-flight batch finish
+            task = asyncio.ensure_future(self._apply(events))
+            self._busy.add(task)
+            task.add_done_callback(self._busy.discard)
+            try:
+                await asyncio.shield(task)
+            except Exception as e:
+                # Every write is idempotent, so the batch is simply reapplied
+                # when its claim's lease runs out
+                logger.error("stripe event batch of %d failed: %s", len(events), e)
+
+    async def _apply(self, events: List[dict]) -> None:
+        self.batches += 1
+        by_type: Dict[str, List[dict]] = {}
+        for event in events:
+            by_type.setdefault(event["type"], []).append(event)
+
+        writers: Dict[str, Callable[[List[dict]], Awaitable[None]]] = {
+            "checkout.session.completed": self._complete,
+            "payment_intent.succeeded": self._record,
+            "payment_intent.payment_failed": self._fail,
+        }
+        done: List[dict] = []
+        for event_type, group in by_type.items():
+            write = writers[event_type]
+            try:
+                await write(group)
+                done.extend(group)
+                continue
+            except Exception as e:
+                if len(group) == 1:
+                    await self._retry(group[0], e)
+                    continue
+                logger.warning("%s batch of %d failed, applying one by one: %s", event_type, len(group), e)
+
+            for event in group:
+                try:
+                    await write([event])
+                    done.append(event)
+                except Exception as e:
+                    await self._retry(event, e)
+
+        if done:
+            await self.db.execute(
+                self.db.table("stripe_events").update({
+                    "status": "done",
+                    "processed_at": datetime.now(timezone.utc).isoformat(),
+                    "locked_at": None,
+                    "last_error": None,
+                }).in_("id", [event["id"] for event in done])
+            )
+            self.applied += len(done)
+
+    async def _retry(self, event: dict, error: Exception) -> None:
+        attempts = event["attempts"]
+        if attempts >= self.max_attempts:
+            self.dead += 1
+            logger.error("stripe event %s is dead after %d attempts: %s", event["event_id"], attempts, error)
+            update = {"status": "dead"}
+        else:
+            self.retried += 1
+            logger.warning("stripe event %s failed (attempt %d): %s", event["event_id"], attempts, error)
+            delay = min(2 ** attempts, 3600)
+            update = {
+                "status": "pending",
+                "available_at": (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat(),
+            }
+        update.update({"locked_at": None, "last_error": str(error)[:1000]})
+        try:
+            await self.db.execute(self.db.table("stripe_events").update(update).eq("id", event["id"]))
+        except Exception as e:
+            # Left 'processing'; it is reclaimed once the lease runs out
+            logger.error("could not reschedule stripe event %s: %s", event["event_id"], e)
+
+    @staticmethod
+    def _txns(events: List[dict]) -> List[str]:
+        return [event["stripe_txn"] for event in events]
+
+    async def _complete(self, events: List[dict]) -> None:
+        await self.db.execute(
+            self.db.table("tips").update({"status": "completed"}).in_("stripe_txn", self._txns(events))
+        )
+
+    async def _fail(self, events: List[dict]) -> None:
+        # Never downgrade a tip that already completed (e.g. a replayed old failure)
+        await self.db.execute(
+            self.db.table("tips")
+            .update({"status": "failed"})
+            .in_("stripe_txn", self._txns(events))
+            .neq("status", "completed")
+        )
+
+    async def _record(self, events: List[dict]) -> None:
+        # Payment intents created by Checkout carry no tip metadata; their
+        # tip is completed by checkout.session.completed instead
+        events = [event for event in events if event["payload"].get("metadata", {}).get("to_creator_id")]
+        if not events:
+            return
+
+        # One statement for the whole batch: completes tips that exist and
+        # inserts the rest, keyed on the unique stripe_txn (migration 012)
+        tips = [
+            {
+                "from_user": event["payload"]["metadata"].get("from_user_id"),
+                "to_creator": event["payload"]["metadata"]["to_creator_id"],
+                "amount": event["payload"]["amount"] / 100,
+                "stripe_txn": event["stripe_txn"],
+                "status": "completed",
+            }
+            for event in events
+        ]
+        await self.db.execute(self.db.table("tips").upsert(tips, on_conflict="stripe_txn"))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let in-flight batches finish, then stop the workers."""
+        self._stopping = True
+        if self._busy:
+            await asyncio.wait(self._busy, timeout=timeout)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def replay(self, event_ids: Optional[List[str]] = None) -> List[str]:
+        """Move dead events (all, or the given ids) back to pending."""
+        result = await self.db.execute(
+            self.db.client.rpc("replay_stripe_events", {"p_event_ids": event_ids})
+        )
+        replayed = result.data or []
+        if replayed:
+            self._wake.set()
+        return replayed
+
+    async def dead_events(self, limit: int = 100) -> List[dict]:
+        result = await self.db.execute(
+            self.db.table("stripe_events")
+            .select("event_id,type,stripe_txn,attempts,last_error,received_at")
+            .eq("status", "dead")
+            .order("id")
+            .limit(limit)
+        )
+        return result.data
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "applied": self.applied,
+            "batches": self.batches,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+if __name__ == "__main__":
+    # Dead-letter tooling inside the payments image:
+    #   python webhook_queue.py dead            list dead events
+    #   python webhook_queue.py replay [ids]    requeue all dead events, or the given ids
+    import json
+    import sys
+    from main import db, stripe_events
+
+    logging.basicConfig(level=logging.INFO)
+    command, event_ids = (sys.argv[1:2] or ["dead"])[0], sys.argv[2:] or None
+
+    async def run():
+        if command == "dead":
+            return await stripe_events.dead_events(limit=1000)
+        if command == "replay":
+            return {"replayed": await stripe_events.replay(event_ids)}
+        raise SystemExit(f"unknown command {command!r}; use 'dead' or 'replay [event_id ...]'")
+
+    try:
+        print(json.dumps(asyncio.run(run()), default=str))
+    finally:
+        db.close()
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Callable, Optional
+
+from fastapi import Header, HTTPException, status
+from jose import jwt, JWTError, ExpiredSignatureError
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from shared.cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # redis is optional; revocations then stay in-process
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "auth:revoke"
+
+class AuthUser(BaseModel):
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    expires_at: Optional[int] = None
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    return authorization.replace("Bearer ", "")
+
+class TokenVerifier:
+    """Verifies Supabase access tokens locally (HS256 with the project JWT secret).
+
+    Decoded users are cached until min(cache_ttl, token expiry). With a
+    secret configured, a token whose signature or expiry does not check out
+    is rejected locally; the remote supabase.auth.get_user call is only made
+    on a cache miss when no secret is configured. revoke_user() rejects a
+    user's still-valid tokens for `revoke_ttl` seconds (Supabase's default
+    access token lifetime); with redis the revocation is published so every
+    service process applies it.
+    """
+
+    def __init__(
+        self,
+        jwt_secret: str,
+        remote_get_user: Optional[Callable] = None,
+        audience: str = "authenticated",
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        revoke_ttl: float = 3600.0,
+        redis_url: Optional[str] = None,
+    ):
+        self.jwt_secret = jwt_secret
+        self.remote_get_user = remote_get_user
+        self.audience = audience
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        # Users whose tokens must be rejected even though they still verify
+        self.revoked = TTLCache(maxsize=cache_size, ttl=revoke_ttl)
+        self.remote_calls = 0
+        self.redis = None
+        self._listener = None
+
+        if redis_url and redis is not None:
+            try:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25, decode_responses=True)
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{REVOCATION_CHANNEL: self._on_revocation})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_listener_error,
+                )
+            except Exception as e:
+                logger.warning("token revocations running without redis: %s", e)
+                self.redis = None
+
+    def _on_revocation(self, message) -> None:
+        self.revoked.set(str(message["data"]), True)
+
+    def _on_listener_error(self, error, pubsub, thread) -> None:
+        logger.warning("token revocation listener error: %s", error)
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _ttl_for(self, user: AuthUser) -> float:
+        if not user.expires_at:
+            return self.cache.ttl
+        return min(self.cache.ttl, user.expires_at - time.time())
+
+    def _verify_locally(self, token: str) -> AuthUser:
+        claims = jwt.decode(
+            token,
+            self.jwt_secret,
+            algorithms=["HS256"],
+            audience=self.audience,
+        )
+        metadata = claims.get("user_metadata") or {}
+        return AuthUser(
+            id=claims["sub"],
+            email=claims.get("email"),
+            role=metadata.get("role"),
+            expires_at=claims.get("exp"),
+        )
+
+    async def _verify_remotely(self, token: str) -> AuthUser:
+        self.remote_calls += 1
+        try:
+            user_response = await run_in_threadpool(self.remote_get_user, token)
+        except Exception:
+            user_response = None
+
+        if not user_response or not user_response.user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+
+        try:
+            expires_at = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            expires_at = None
+
+        remote_user = user_response.user
+        metadata = getattr(remote_user, "user_metadata", None) or {}
+        return AuthUser(
+            id=str(remote_user.id),
+            email=getattr(remote_user, "email", None),
+            role=metadata.get("role"),
+            expires_at=expires_at,
+        )
+
+    async def verify(self, token: str) -> AuthUser:
+        key = self._cache_key(token)
+        user = self.cache.get(key)
+
+        if user is None:
+            if self.jwt_secret:
+                try:
+                    user = self._verify_locally(token)
+                except ExpiredSignatureError:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Token expired"
+                    )
+                except (JWTError, KeyError):
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Invalid token"
+                    )
+            elif self.remote_get_user:
+                user = await self._verify_remotely(token)
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid token"
+                )
+            self.cache.set(key, user, ttl=self._ttl_for(user))
+
+        if self.revoked.get(user.id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revoked"
+            )
+        return user
+
+    def invalidate(self, token: str) -> None:
+        self.cache.pop(self._cache_key(token))
+
+    async def revoke_user(self, user_id: str) -> None:
+        user_id = str(user_id)
+        self.revoked.set(user_id, True)
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(self.redis.publish, REVOCATION_CHANNEL, user_id)
+            except Exception as e:
+                logger.warning("token revocation not broadcast: %s", e)
+
+    def current_user(self) -> Callable:
+        async def get_current_user(authorization: str = Header(None)) -> AuthUser:
+            token = bearer_token(authorization)
+            if not token:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Authentication required"
+                )
+            return await self.verify(token)
+        return get_current_user
+
+    def optional_user(self) -> Callable:
+        async def get_optional_user(authorization: str = Header(None)) -> Optional[AuthUser]:
+            token = bearer_token(authorization)
+            if not token:
+                return None
+            try:
+                return await self.verify(token)
+            except HTTPException:
+                return None
+        return get_optional_user
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self.redis is not None:
+            self.redis.close()
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "remote_calls": self.remote_calls}
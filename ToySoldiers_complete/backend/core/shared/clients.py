@@ -0,0 +1,120 @@
+import asyncio
+import inspect
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Generic, List, Optional, TypeVar
+
+try:
+    from botocore.config import Config as BotoConfig
+except ImportError:  # only services that talk to R2 install boto3
+    BotoConfig = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+async def _call(fn: Callable) -> Any:
+    result = fn()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+class Lifespan:
+    """Startup and shutdown of one worker's clients and background tasks.
+
+    Pass it as `FastAPI(lifespan=...)` and register hooks while main.py
+    builds its module-level objects. Startup hooks run in order and may
+    fail startup; warm hooks (opening pooled connections ahead of the first
+    request) then run concurrently, bounded by `warm_timeout`, and only log
+    on failure so a slow dependency never keeps a worker from serving.
+    Shutdown hooks run in reverse order, so registering each object's hook
+    right after creating it closes dependents before what they use; one
+    failing does not stop the rest. Hooks may be sync or async.
+    """
+
+    def __init__(self, warm_timeout: float = 5.0):
+        self.warm_timeout = warm_timeout
+        self._startup: List[Callable] = []
+        self._warm: List[Callable] = []
+        self._shutdown: List[Callable] = []
+        self.warmed = False
+
+    def on_startup(self, fn: Callable) -> Callable:
+        self._startup.append(fn)
+        return fn
+
+    def on_warm(self, fn: Callable) -> Callable:
+        self._warm.append(fn)
+        return fn
+
+    def on_shutdown(self, fn: Callable) -> Callable:
+        self._shutdown.append(fn)
+        return fn
+
+    async def _warm_up(self) -> None:
+        results = await asyncio.gather(
+            *(asyncio.wait_for(_call(fn), self.warm_timeout) for fn in self._warm),
+            return_exceptions=True
+        )
+        failures = [(fn, result) for fn, result in zip(self._warm, results) if isinstance(result, BaseException)]
+        for fn, error in failures:
+            logger.warning("prewarming %s failed: %r", getattr(fn, "__qualname__", fn), error)
+        self.warmed = not failures
+
+    @asynccontextmanager
+    async def __call__(self, app):
+        for fn in self._startup:
+            await _call(fn)
+        await self._warm_up()
+        try:
+            yield
+        finally:
+            for fn in reversed(self._shutdown):
+                try:
+                    await _call(fn)
+                except Exception as e:
+                    logger.error("shutdown hook %s failed: %s", getattr(fn, "__qualname__", fn), e)
+
+class LazyClient(Generic[T]):
+    """A client built in the worker process that uses it, not at import.
+
+    For clients that start threads or open connections when constructed
+    (PostHog), which must not be created before uvicorn/gunicorn fork
+    workers. Register get() as a startup hook and close() as a shutdown
+    hook; routes receive the client with `Depends(lazy_client)`.
+    """
+
+    def __init__(self, factory: Callable[[], T], close: Optional[Callable[[T], Any]] = None):
+        self._factory = factory
+        self._close = close
+        self._client: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __call__(self) -> T:
+        return self.get()
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and self._close is not None:
+            self._close(client)
+
+def boto_config(max_pool_connections: int = 32, connect_timeout: float = 5.0, read_timeout: float = 60.0):
+    """botocore client config: a keep-alive pool sized for concurrent part uploads."""
+    if BotoConfig is None:
+        return None
+    return BotoConfig(
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        tcp_keepalive=True,
+        retries={"max_attempts": 3, "mode": "standard"}
+    )
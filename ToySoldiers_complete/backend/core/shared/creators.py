@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from shared.cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # redis is optional; the in-process cache still works
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "creators:invalidate"
+_NOT_A_CREATOR = {}
+
+class CreatorResolver:
+    """Cached user_id -> creators row lookup.
+
+    Lookups go local LRU -> redis (when configured) -> Supabase; redis
+    calls run in a thread and Supabase goes through shared.db.Database, so a
+    miss never blocks the event loop. Users
+    without a creator profile are cached too, for a shorter TTL. Call
+    invalidate() whenever a creators row is created or removed; with redis
+    the invalidation is published so every service process drops its copy.
+    """
+
+    def __init__(
+        self,
+        db,
+        redis_url: Optional[str] = None,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        maxsize: int = 10000,
+    ):
+        self.db = db
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.db_lookups = 0
+        self.redis = None
+        self._listener = None
+
+        if redis_url and redis is not None:
+            try:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.25, decode_responses=True)
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0,
+                    daemon=True,
+                    exception_handler=self._on_listener_error,
+                )
+            except Exception as e:
+                logger.warning("creator cache running without redis: %s", e)
+                self.redis = None
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"creators:user:{user_id}"
+
+    def _on_invalidation(self, message) -> None:
+        self.local.pop(str(message["data"]))
+
+    def _on_listener_error(self, error, pubsub, thread) -> None:
+        # Missed invalidations are bounded by the local TTL; keep listening
+        logger.warning("creator cache invalidation listener error: %s", error)
+
+    async def _store(self, user_id: str, creator: Optional[dict]) -> None:
+        ttl = self.ttl if creator else self.negative_ttl
+        self.local.set(user_id, creator or _NOT_A_CREATOR, ttl=ttl)
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(
+                    self.redis.set, self._key(user_id), json.dumps(creator or _NOT_A_CREATOR), ex=int(ttl)
+                )
+            except Exception as e:
+                logger.warning("creator cache redis write failed: %s", e)
+
+    async def resolve(self, user_id: str) -> Optional[dict]:
+        user_id = str(user_id)
+        cached = self.local.get(user_id)
+        if cached is not None:
+            return cached or None
+
+        if self.redis is not None:
+            try:
+                raw = await asyncio.to_thread(self.redis.get, self._key(user_id))
+            except Exception:
+                raw = None
+            if raw is not None:
+                self.redis_hits += 1
+                creator = json.loads(raw)
+                self.local.set(user_id, creator, ttl=self.ttl if creator else self.negative_ttl)
+                return creator or None
+            self.redis_misses += 1
+
+        self.db_lookups += 1
+        creator_data = await self.db.execute(
+            self.db.table("creators").select("*").eq("user_id", user_id)
+        )
+        creator = creator_data.data[0] if creator_data.data else None
+        await self._store(user_id, creator)
+        return creator
+
+    async def resolve_id(self, user_id: str) -> Optional[str]:
+        creator = await self.resolve(user_id)
+        return creator["id"] if creator else None
+
+    async def invalidate(self, user_id: str) -> None:
+        user_id = str(user_id)
+        self.local.pop(user_id)
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(self._broadcast, user_id)
+            except Exception as e:
+                logger.warning("creator cache invalidation not broadcast: %s", e)
+
+    def _broadcast(self, user_id: str) -> None:
+        self.redis.delete(self._key(user_id))
+        self.redis.publish(INVALIDATION_CHANNEL, user_id)
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self.redis is not None:
+            self.redis.close()
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "db_lookups": self.db_lookups,
+        }
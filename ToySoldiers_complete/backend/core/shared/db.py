@@ -0,0 +1,96 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+try:
+    from supabase.lib.client_options import ClientOptions
+except ImportError:  # only needed to build the client, not to use Database
+    ClientOptions = None
+
+class DatabaseTimeout(HTTPException):
+    def __init__(self, timeout: float):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Database request timed out after {timeout:g}s"
+        )
+
+def client_options(timeout: float):
+    """Supabase client options with the PostgREST HTTP timeout set to match ours."""
+    if ClientOptions is None:
+        return None
+    return ClientOptions(postgrest_client_timeout=timeout)
+
+class Database:
+    """Runs blocking supabase-py calls off the event loop.
+
+    supabase-py 2.0 only ships a synchronous client. Every `.execute()` (and
+    auth call) is handed to a per-process thread pool of `max_concurrency`
+    workers, so at most that many PostgREST requests are in flight, each on
+    its own connection from the PostgREST client's httpx pool. supabase-py
+    2.0 does not let that httpx client be configured, so it keeps httpx's
+    defaults (HTTP/1.1, 20 keep-alive connections); keep `max_concurrency`
+    at or below 20 so every worker reuses an open connection. Calls beyond
+    the limit queue without blocking other requests; a call that does not
+    finish within `timeout` seconds raises DatabaseTimeout (504).
+    """
+
+    def __init__(self, client, max_concurrency: int = 16, timeout: float = 10.0):
+        self.client = client
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="supabase")
+        self.calls = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.total_time = 0.0
+
+    def table(self, name: str):
+        return self.client.table(name)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, partial(fn, *args, **kwargs)),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise DatabaseTimeout(timeout)
+        finally:
+            self.in_flight -= 1
+            self.total_time += time.monotonic() - started
+
+    async def execute(self, query, timeout: Optional[float] = None) -> Any:
+        return await self.run(query.execute, timeout=timeout)
+
+    async def warm(self, connections: int = 4, table: str = "users") -> None:
+        """Open up to `connections` pooled PostgREST connections before traffic arrives."""
+        connections = min(connections, self.max_concurrency)
+        await asyncio.gather(*(
+            self.execute(self.client.table(table).select("id").limit(1))
+            for _ in range(connections)
+        ))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        session = getattr(getattr(self.client, "postgrest", None), "session", None)
+        if session is not None:
+            session.close()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "avg_ms": round(self.total_time / self.calls * 1000, 2) if self.calls else 0.0,
+        }
@@ -0,0 +1,75 @@
+import base64
+import binascii
+import json
+import math
+import uuid
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], str(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        # Parsing both values also keeps anything but a timestamp and a uuid
+        # out of the PostgREST filter they are interpolated into
+        return datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(row_id))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def encode_rank_cursor(row: dict) -> str:
+    raw = json.dumps([row["rank"], str(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, str]:
+    """(rank, id) cursor for result sets ordered by a computed relevance rank."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, row_id = json.loads(raw)
+        if not math.isfinite(rank):
+            raise ValueError("rank must be finite")
+        return float(rank), str(uuid.UUID(row_id))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset(query, cursor: Optional[str], limit: int, offset: int = 0):
+    """Order newest first on (created_at, id) and fetch the page after `cursor`.
+
+    One extra row is requested so next_page() can tell whether another page
+    exists. `offset` is only a compatibility shim for clients that have not
+    moved to cursors yet and is ignored when a cursor is given.
+    """
+    # A single order param: older postgrest-py releases repeat the key instead
+    # of joining multiple .order() calls
+    query = query.order("created_at.desc,id", desc=True)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+        )
+    elif offset:
+        query = query.offset(offset)
+    return query.limit(limit + 1)
+
+def next_page(
+    rows: List[dict],
+    limit: int,
+    encode: Callable[[dict], str] = encode_cursor,
+) -> Tuple[List[dict], Optional[str]]:
+    """Split a limit + 1 row result into the page and the cursor for the next one."""
+    if len(rows) > limit:
+        return rows[:limit], encode(rows[limit - 1])
+    return rows, None
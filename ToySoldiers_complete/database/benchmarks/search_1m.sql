@@ -0,0 +1,135 @@
+-- Search benchmark: ILIKE scan vs. full-text + trigram indexes
+-- Builds a 1M-row synthetic content table in a throwaway schema, runs the
+-- old /content/search query and then the search_content() and
+-- search_content_count() RPCs the API calls (their unqualified `content`
+-- resolves to the benchmark table through search_path), then drops the
+-- schema. Needs migrations 006 and 013 applied.
+--
+-- Usage: psql $DB_URL -f database/benchmarks/search_1m.sql
+
+\timing on
+\set ON_ERROR_STOP on
+
+DROP SCHEMA IF EXISTS search_bench CASCADE;
+CREATE SCHEMA search_bench;
+SET search_path = search_bench, public;
+
+CREATE TABLE content (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    creator_id UUID DEFAULT uuid_generate_v4(),
+    title TEXT NOT NULL,
+    description TEXT,
+    media_url TEXT,
+    stream_url TEXT,
+    thumbnail_url TEXT,
+    tags TEXT[] DEFAULT '{}',
+    visibility TEXT DEFAULT 'public',
+    duration INTEGER,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+);
+
+\echo 'Generating 1,000,000 rows...'
+INSERT INTO content (title, description, visibility, created_at)
+SELECT
+    initcap(
+        w[1 + floor(random() * array_length(w, 1))::int] || ' ' ||
+        w[1 + floor(random() * array_length(w, 1))::int] || ' ' ||
+        w[1 + floor(random() * array_length(w, 1))::int]
+    ),
+    (
+        SELECT string_agg(w[1 + floor(random() * array_length(w, 1))::int], ' ')
+        FROM generate_series(1, 12)
+        WHERE g > 0  -- correlate so random() runs per row
+    ),
+    CASE WHEN random() < 0.9 THEN 'public' ELSE 'private' END,
+    NOW() - random() * INTERVAL '365 days'
+FROM generate_series(1, 1000000) AS g,
+LATERAL (
+    SELECT ARRAY[
+        'acoustic', 'ambient', 'anthem', 'ballad', 'bass', 'beat', 'blues', 'bridge',
+        'chill', 'chorus', 'cover', 'dance', 'demo', 'drums', 'dream', 'echo',
+        'electric', 'epic', 'fever', 'fire', 'folk', 'funk', 'ghost', 'groove',
+        'guitar', 'harmony', 'heart', 'house', 'jam', 'jazz', 'live', 'lofi',
+        'love', 'melody', 'midnight', 'mix', 'moon', 'neon', 'night', 'ocean',
+        'piano', 'pulse', 'rain', 'remix', 'rhythm', 'river', 'rock', 'session',
+        'shadow', 'soul', 'static', 'storm', 'summer', 'synth', 'tape', 'techno',
+        'tour', 'track', 'vinyl', 'vocal', 'wave', 'wild', 'winter', 'zen'
+    ] AS w
+) words;
+
+-- The pagination index from migration 005 is all the old query had to work with
+CREATE INDEX ON content(visibility, created_at DESC, id DESC);
+ANALYZE content;
+
+\echo ''
+\echo '=== Before: ILIKE scan (common term, page 1) ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM content
+WHERE (title ILIKE '%lofi%' OR description ILIKE '%lofi%') AND visibility = 'public'
+ORDER BY created_at DESC, id DESC
+LIMIT 21;
+
+\echo '=== Before: ILIKE scan (no match - reads the whole table) ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM content
+WHERE (title ILIKE '%lofy%' OR description ILIKE '%lofy%') AND visibility = 'public'
+ORDER BY created_at DESC, id DESC
+LIMIT 21;
+
+\echo 'Building search indexes...'
+CREATE INDEX ON content USING GIN(search_vector);
+CREATE INDEX ON content USING GIN(title gin_trgm_ops);
+ANALYZE content;
+
+\echo ''
+\echo '=== After: search_content() page 1 (two terms) ==='
+SELECT count(*) AS rows FROM public.search_content('lofi midnight', 21);
+
+\echo '=== After: search_content() page 2 by keyset cursor ==='
+SELECT rank AS after_rank, id AS after_id
+FROM public.search_content('lofi midnight', 20)
+OFFSET 19 LIMIT 1 \gset
+SELECT count(*) AS rows FROM public.search_content('lofi midnight', 21, 0, :after_rank::REAL, :'after_id'::UUID);
+
+\echo '=== After: search_content() typo via trigram (lofy) ==='
+SELECT count(*) AS rows FROM public.search_content('lofy', 21);
+
+\echo '=== After: plan of the ranked query search_content() runs ==='
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, title, (ts_rank_cd(search_vector, public.content_search_query('lofi midnight'))
+                   + similarity(title, 'lofi midnight'))::REAL AS rank
+FROM content
+WHERE visibility = 'public'
+  AND (search_vector @@ public.content_search_query('lofi midnight') OR title % 'lofi midnight')
+ORDER BY rank DESC, id DESC
+LIMIT 21;
+
+\echo '=== Count: search_content_count() vs. count(*) ==='
+\echo 'Rare term - counted exactly'
+SELECT * FROM public.search_content_count('zzzz');
+
+\echo 'Common term (> 1000 matches) - capped count + planner estimate'
+SELECT * FROM public.search_content_count('lofi midnight');
+
+SELECT count(*) AS exact_total
+FROM content
+WHERE visibility = 'public'
+  AND (search_vector @@ public.content_search_query('lofi midnight') OR title % 'lofi midnight');
+
+-- Fails the run (ON_ERROR_STOP) if the estimate path breaks again
+DO $$
+DECLARE
+    counted RECORD;
+BEGIN
+    SELECT * INTO counted FROM public.search_content_count('lofi midnight');
+    IF counted.exact OR counted.total <= 1000 THEN
+        RAISE EXCEPTION 'expected an estimated total above 1000, got % (exact %)', counted.total, counted.exact;
+    END IF;
+END $$;
+
+RESET search_path;
+DROP SCHEMA search_bench CASCADE;
@@ -0,0 +1,6 @@
+-- Migration 004: Add content checksum
+-- SHA-256 of the uploaded media, computed while streaming it to R2
+
+ALTER TABLE content ADD COLUMN IF NOT EXISTS checksum TEXT;
+
+SELECT 'Migration 004 completed successfully' AS status;
@@ -0,0 +1,15 @@
+-- Migration 005: Composite indexes for keyset pagination
+-- Feed, creator content, search and payment history page on (created_at, id)
+-- newest first; these let each page start with an index seek instead of an offset scan.
+-- CONCURRENTLY avoids locking writes; migrate_db.sh runs each file outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_visibility_created_id
+    ON content(visibility, created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_creator_created_id
+    ON content(creator_id, created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tips_from_user_created_id
+    ON tips(from_user, created_at DESC, id DESC);
+
+SELECT 'Migration 005 completed successfully' AS status;
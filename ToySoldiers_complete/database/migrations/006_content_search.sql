@@ -0,0 +1,115 @@
+-- Migration 006: Full-text search for content
+-- Replaces the ILIKE scans behind /content/search with a weighted tsvector
+-- (title A, description B) on a GIN index, plus a trigram index on title for
+-- typo-tolerant matches. CONCURRENTLY needs to run outside a transaction,
+-- which is how migrate_db.sh applies each file.
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+ALTER TABLE content ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_search_vector
+    ON content USING GIN(search_vector);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_title_trgm
+    ON content USING GIN(title gin_trgm_ops);
+
+-- Free text to a prefix tsquery: 'Lo-fi beats' -> 'lo':* & 'fi':* & 'beat':*
+-- NULL when nothing searchable is left, so only the trigram match applies
+CREATE OR REPLACE FUNCTION content_search_query(q TEXT)
+RETURNS TSQUERY AS $$
+    SELECT to_tsquery('english', string_agg(word || ':*', ' & '))
+    FROM regexp_split_to_table(
+        lower(regexp_replace(coalesce(q, ''), '[^[:alnum:]]+', ' ', 'g')), ' '
+    ) AS word
+    WHERE word <> '';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Ranked public search. Page with after_rank/after_id (the last row's rank
+-- and id) or, for older clients, result_offset.
+CREATE OR REPLACE FUNCTION search_content(
+    q TEXT,
+    result_limit INTEGER DEFAULT 20,
+    result_offset INTEGER DEFAULT 0,
+    after_rank REAL DEFAULT NULL,
+    after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    creator_id UUID,
+    title TEXT,
+    description TEXT,
+    media_url TEXT,
+    stream_url TEXT,
+    thumbnail_url TEXT,
+    tags TEXT[],
+    visibility TEXT,
+    duration INTEGER,
+    created_at TIMESTAMPTZ,
+    rank REAL
+) AS $$
+    SELECT *
+    FROM (
+        SELECT
+            c.id,
+            c.creator_id,
+            c.title,
+            c.description,
+            c.media_url,
+            c.stream_url,
+            c.thumbnail_url,
+            c.tags,
+            c.visibility,
+            c.duration,
+            c.created_at,
+            (ts_rank_cd(c.search_vector, content_search_query(q)) + similarity(c.title, q))::REAL AS rank
+        FROM content c
+        WHERE c.visibility = 'public'
+          AND (c.search_vector @@ content_search_query(q) OR c.title % q)
+    ) ranked
+    WHERE after_rank IS NULL
+       OR ranked.rank < after_rank
+       OR (ranked.rank = after_rank AND ranked.id < after_id)
+    ORDER BY ranked.rank DESC, ranked.id DESC
+    LIMIT result_limit
+    OFFSET result_offset;
+$$ LANGUAGE sql STABLE;
+
+-- Number of public matches: exact up to exact_limit, beyond that the
+-- planner's estimate from the same indexes rather than counting every row.
+-- VOLATILE because Postgres refuses EXPLAIN inside STABLE/IMMUTABLE functions.
+CREATE OR REPLACE FUNCTION search_content_count(q TEXT, exact_limit INTEGER DEFAULT 1000)
+RETURNS TABLE (total BIGINT, exact BOOLEAN) AS $$
+DECLARE
+    matched BIGINT;
+    plan JSON;
+BEGIN
+    SELECT count(*) INTO matched
+    FROM (
+        SELECT 1
+        FROM content c
+        WHERE c.visibility = 'public'
+          AND (c.search_vector @@ content_search_query(q) OR c.title % q)
+        LIMIT exact_limit + 1
+    ) capped;
+
+    IF matched <= exact_limit THEN
+        RETURN QUERY SELECT matched, TRUE;
+        RETURN;
+    END IF;
+
+    EXECUTE format(
+        'EXPLAIN (FORMAT JSON) SELECT 1 FROM content c WHERE c.visibility = %L '
+        'AND (c.search_vector @@ content_search_query(%L) OR c.title %% %L)',
+        'public', q, q
+    ) INTO plan;
+
+    RETURN QUERY SELECT GREATEST((plan->0->'Plan'->>'Plan Rows')::BIGINT, matched), FALSE;
+END;
+$$ LANGUAGE plpgsql VOLATILE;
+
+SELECT 'Migration 006 completed successfully' AS status;
@@ -0,0 +1,95 @@
+-- Migration 007: Daily analytics rollups
+-- Keeps per-content, per-day, per-device view counts and watch time up to date
+-- as analytics_views rows are inserted, so /content/analytics reads a few
+-- aggregate rows instead of every raw view.
+
+CREATE TABLE IF NOT EXISTS analytics_daily_rollups (
+    content_id UUID NOT NULL REFERENCES content(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    device_type TEXT NOT NULL DEFAULT '',
+    views BIGINT NOT NULL DEFAULT 0,
+    watch_time NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_id, date, device_type)
+);
+
+-- One upsert per inserted batch (statement trigger over the transition table)
+CREATE OR REPLACE FUNCTION rollup_analytics_views()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO analytics_daily_rollups (content_id, date, device_type, views, watch_time)
+    SELECT
+        content_id,
+        date,
+        coalesce(device_type, ''),
+        sum(coalesce(view_count, 1)),
+        coalesce(sum(duration), 0)
+    FROM new_views
+    WHERE content_id IS NOT NULL AND date IS NOT NULL
+    GROUP BY content_id, date, coalesce(device_type, '')
+    ON CONFLICT (content_id, date, device_type) DO UPDATE
+    SET views = analytics_daily_rollups.views + EXCLUDED.views,
+        watch_time = analytics_daily_rollups.watch_time + EXCLUDED.watch_time;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute rollups for a date range from the raw rows still present,
+-- e.g. after a manual backfill or correction of analytics_views
+CREATE OR REPLACE FUNCTION rebuild_analytics_rollups(p_start DATE, p_end DATE)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM analytics_daily_rollups WHERE date BETWEEN p_start AND p_end;
+
+    INSERT INTO analytics_daily_rollups (content_id, date, device_type, views, watch_time)
+    SELECT
+        av.content_id,
+        av.date,
+        coalesce(av.device_type, ''),
+        sum(coalesce(av.view_count, 1)),
+        coalesce(sum(av.duration), 0)
+    FROM analytics_views av
+    JOIN content c ON c.id = av.content_id
+    WHERE av.date BETWEEN p_start AND p_end
+    GROUP BY av.content_id, av.date, coalesce(av.device_type, '');
+END;
+$$ LANGUAGE plpgsql;
+
+-- Totals for one content item over a date range, one row per device type
+CREATE OR REPLACE FUNCTION content_analytics(
+    p_content_id UUID,
+    p_start DATE DEFAULT NULL,
+    p_end DATE DEFAULT NULL
+)
+RETURNS TABLE (device_type TEXT, views BIGINT, watch_time NUMERIC) AS $$
+    SELECT r.device_type, sum(r.views)::BIGINT, sum(r.watch_time)
+    FROM analytics_daily_rollups r
+    WHERE r.content_id = p_content_id
+      AND (p_start IS NULL OR r.date >= p_start)
+      AND (p_end IS NULL OR r.date <= p_end)
+    GROUP BY r.device_type;
+$$ LANGUAGE sql STABLE;
+
+-- Backfill and attach the trigger atomically so no insert is counted twice or
+-- missed. migrate_db.sh re-applies every file, so only do this the first time.
+BEGIN;
+LOCK TABLE analytics_views IN SHARE MODE;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'analytics_views_rollup' AND tgrelid = 'analytics_views'::regclass
+    ) THEN
+        PERFORM rebuild_analytics_rollups('-infinity'::DATE, 'infinity'::DATE);
+
+        CREATE TRIGGER analytics_views_rollup
+        AFTER INSERT ON analytics_views
+        REFERENCING NEW TABLE AS new_views
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION rollup_analytics_views();
+    END IF;
+END;
+$$;
+COMMIT;
+
+SELECT 'Migration 007 completed successfully' AS status;
@@ -0,0 +1,319 @@
+-- Migration 008: Monthly partitions for analytics_views
+-- Converts analytics_views to range partitioning on date (one partition per
+-- month, plus a default partition for anything outside them) and adds the
+-- functions behind partition maintenance and retention:
+--   ensure_analytics_partitions()       create this month and the next few
+--   detach_analytics_partitions(months) move old months to analytics_archive
+--   archived_analytics_rows(...)        page through an archived month
+--   drop_archived_analytics_partition() drop a month once it is exported
+-- backend/core/content_api/analytics_archive.py runs these daily and writes
+-- each archived month to R2 as Parquet. Daily rollups (migration 007) are a
+-- separate table, so totals for archived months keep working.
+
+CREATE SCHEMA IF NOT EXISTS analytics_archive;
+
+-- One row per month exported to object storage and dropped
+CREATE TABLE IF NOT EXISTS analytics_archive_exports (
+    partition_name TEXT PRIMARY KEY,
+    object_key TEXT NOT NULL,
+    row_count BIGINT NOT NULL,
+    exported_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION analytics_partition_name(p_month DATE)
+RETURNS TEXT AS $$
+    SELECT 'analytics_views_' || to_char(p_month, 'YYYY_MM');
+$$ LANGUAGE sql STABLE;
+
+-- Create the partition for the month containing p_month. Rows that already
+-- landed in the default partition for that month are moved into it first,
+-- since a range cannot be attached while the default partition holds it.
+CREATE OR REPLACE FUNCTION create_analytics_partition(p_month DATE)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    v_name TEXT := analytics_partition_name(v_start);
+BEGIN
+    IF to_regclass(format('public.%I', v_name)) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE public.%I (LIKE analytics_views INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        v_name
+    );
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM analytics_views_default WHERE date >= $1 AND date < $2 RETURNING *
+        )
+        INSERT INTO public.%I SELECT * FROM moved',
+        v_name
+    ) USING v_start, v_end;
+    EXECUTE format(
+        'ALTER TABLE analytics_views ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Run daily (pg_cron below, and at the start of every archive run) so the
+-- default partition stays empty
+CREATE OR REPLACE FUNCTION ensure_analytics_partitions(p_months_ahead INT DEFAULT 3)
+RETURNS INT AS $$
+DECLARE
+    v_created INT := 0;
+    v_month DATE;
+BEGIN
+    FOR v_month IN
+        SELECT generate_series(
+            date_trunc('month', CURRENT_DATE),
+            date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead),
+            INTERVAL '1 month'
+        )::DATE
+    LOOP
+        IF create_analytics_partition(v_month) THEN
+            v_created := v_created + 1;
+        END IF;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detach every monthly partition that ended more than p_keep_months ago and
+-- park it in the analytics_archive schema until it has been exported
+CREATE OR REPLACE FUNCTION detach_analytics_partitions(p_keep_months INT)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    v_cutoff DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_keep_months))::DATE;
+    v_name TEXT;
+BEGIN
+    IF p_keep_months < 1 THEN
+        RAISE EXCEPTION 'p_keep_months must be at least 1';
+    END IF;
+
+    FOR v_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public.analytics_views'::regclass
+          AND c.relname ~ '^analytics_views_\d{4}_\d{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY_MM') < v_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE analytics_views DETACH PARTITION public.%I', v_name);
+        EXECUTE format('ALTER TABLE public.%I SET SCHEMA analytics_archive', v_name);
+        RETURN NEXT v_name;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Months detached but not yet exported, oldest first
+CREATE OR REPLACE FUNCTION archived_analytics_partitions()
+RETURNS SETOF TEXT AS $$
+    SELECT tablename::TEXT
+    FROM pg_tables
+    WHERE schemaname = 'analytics_archive'
+      AND tablename ~ '^analytics_views_\d{4}_\d{2}$'
+    ORDER BY tablename;
+$$ LANGUAGE sql STABLE;
+
+-- Keyset page over an archived month, in id order
+CREATE OR REPLACE FUNCTION archived_analytics_rows(
+    p_partition TEXT,
+    p_after_id BIGINT DEFAULT 0,
+    p_limit INT DEFAULT 1000
+)
+RETURNS SETOF analytics_views AS $$
+BEGIN
+    IF p_partition !~ '^analytics_views_\d{4}_\d{2}$' THEN
+        RAISE EXCEPTION 'not an analytics partition: %', p_partition;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT * FROM analytics_archive.%I WHERE id > $1 ORDER BY id LIMIT $2',
+        p_partition
+    ) USING p_after_id, p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Record the export of an archived month and drop it
+CREATE OR REPLACE FUNCTION drop_archived_analytics_partition(
+    p_partition TEXT,
+    p_object_key TEXT,
+    p_row_count BIGINT
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_partition !~ '^analytics_views_\d{4}_\d{2}$' THEN
+        RAISE EXCEPTION 'not an analytics partition: %', p_partition;
+    END IF;
+
+    INSERT INTO analytics_archive_exports (partition_name, object_key, row_count)
+    VALUES (p_partition, p_object_key, p_row_count)
+    ON CONFLICT (partition_name) DO UPDATE
+    SET object_key = EXCLUDED.object_key,
+        row_count = EXCLUDED.row_count,
+        exported_at = NOW();
+
+    EXECUTE format('DROP TABLE IF EXISTS analytics_archive.%I', p_partition);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Raw rows for archived months are gone, so their rollups can no longer be
+-- recomputed; refuse instead of replacing them with partial sums
+CREATE OR REPLACE FUNCTION rebuild_analytics_rollups(p_start DATE, p_end DATE)
+RETURNS VOID AS $$
+DECLARE
+    v_archived_until DATE;
+BEGIN
+    SELECT max(to_date(right(name, 7), 'YYYY_MM') + INTERVAL '1 month')::DATE
+    INTO v_archived_until
+    FROM (
+        SELECT partition_name AS name FROM analytics_archive_exports
+        UNION ALL
+        SELECT archived_analytics_partitions()
+    ) archived;
+
+    IF p_start < v_archived_until THEN
+        RAISE EXCEPTION 'raw views before % have been archived; rollups cannot be rebuilt from them', v_archived_until;
+    END IF;
+
+    DELETE FROM analytics_daily_rollups WHERE date BETWEEN p_start AND p_end;
+
+    INSERT INTO analytics_daily_rollups (content_id, date, device_type, views, watch_time)
+    SELECT
+        av.content_id,
+        av.date,
+        coalesce(av.device_type, ''),
+        sum(coalesce(av.view_count, 1)),
+        coalesce(sum(av.duration), 0)
+    FROM analytics_views av
+    JOIN content c ON c.id = av.content_id
+    WHERE av.date BETWEEN p_start AND p_end
+    GROUP BY av.content_id, av.date, coalesce(av.device_type, '');
+END;
+$$ LANGUAGE plpgsql;
+
+-- Convert an existing unpartitioned table. Fresh databases already get the
+-- partitioned table from schema.sql and skip this. Rows are copied under an
+-- exclusive lock; view ingestion retries and buffers while it is held.
+DO $$
+DECLARE
+    v_month DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'public.analytics_views'::regclass) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE analytics_views IN ACCESS EXCLUSIVE MODE;
+    DROP VIEW IF EXISTS dashboard_creator;
+
+    ALTER TABLE analytics_views RENAME TO analytics_views_unpartitioned;
+    ALTER TABLE analytics_views_unpartitioned RENAME CONSTRAINT analytics_views_pkey TO analytics_views_unpartitioned_pkey;
+    DROP INDEX IF EXISTS idx_analytics_views_date;
+    DROP INDEX IF EXISTS idx_analytics_views_user_id;
+    DROP INDEX IF EXISTS idx_analytics_views_content_id;
+
+    -- Keep the existing id sequence, widened to BIGINT
+    CREATE TABLE analytics_views (
+        id BIGINT NOT NULL DEFAULT nextval('analytics_views_id_seq'),
+        date DATE NOT NULL DEFAULT CURRENT_DATE,
+        user_id UUID REFERENCES users(id),
+        content_id UUID REFERENCES content(id),
+        view_count INTEGER DEFAULT 1,
+        duration NUMERIC(8, 2),
+        device_type TEXT,
+        referrer TEXT,
+        PRIMARY KEY (id, date)
+    ) PARTITION BY RANGE (date);
+    ALTER SEQUENCE analytics_views_id_seq AS BIGINT OWNED BY analytics_views.id;
+
+    CREATE TABLE analytics_views_default PARTITION OF analytics_views DEFAULT;
+    CREATE INDEX idx_analytics_views_date ON analytics_views(date);
+    CREATE INDEX idx_analytics_views_user_id ON analytics_views(user_id);
+    CREATE INDEX idx_analytics_views_content_id ON analytics_views(content_id);
+
+    FOR v_month IN
+        SELECT generate_series(
+            date_trunc('month', min(date)),
+            date_trunc('month', CURRENT_DATE),
+            INTERVAL '1 month'
+        )::DATE
+        FROM analytics_views_unpartitioned
+    LOOP
+        PERFORM create_analytics_partition(v_month);
+    END LOOP;
+
+    -- Rows without a date were never counted in the rollups and cannot be
+    -- routed to a partition
+    INSERT INTO analytics_views (id, date, user_id, content_id, view_count, duration, device_type, referrer)
+    SELECT id, date, user_id, content_id, view_count, duration, device_type, referrer
+    FROM analytics_views_unpartitioned
+    WHERE date IS NOT NULL;
+
+    -- Rollups already include these rows; only new inserts go through the trigger
+    DROP TABLE analytics_views_unpartitioned;
+    CREATE TRIGGER analytics_views_rollup
+    AFTER INSERT ON analytics_views
+    REFERENCING NEW TABLE AS new_views
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION rollup_analytics_views();
+
+    CREATE VIEW dashboard_creator AS
+    SELECT
+        c.id AS creator_id,
+        c.user_id,
+        COUNT(DISTINCT ct.id) AS total_content,
+        COUNT(DISTINCT av.id) AS total_views,
+        COALESCE(SUM(av.duration), 0) AS total_watch_time,
+        COALESCE(SUM(t.amount), 0) AS total_tips,
+        COUNT(DISTINCT co.id) AS total_comments
+    FROM creators c
+    LEFT JOIN content ct ON ct.creator_id = c.id
+    LEFT JOIN analytics_views av ON av.content_id = ct.id
+    LEFT JOIN tips t ON t.to_creator = c.id AND t.status = 'completed'
+    LEFT JOIN comments co ON co.content_id = ct.id
+    GROUP BY c.id, c.user_id;
+END;
+$$;
+
+SELECT ensure_analytics_partitions();
+
+-- Create upcoming partitions nightly where pg_cron is available (Supabase);
+-- elsewhere the archive job's daily run does it
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('ensure-analytics-partitions', '0 3 * * *', 'SELECT ensure_analytics_partitions()');
+    END IF;
+END;
+$$;
+
+-- Maintenance functions are for the service role only, not the public API
+REVOKE EXECUTE ON FUNCTION
+    create_analytics_partition(DATE),
+    ensure_analytics_partitions(INT),
+    detach_analytics_partitions(INT),
+    archived_analytics_rows(TEXT, BIGINT, INT),
+    drop_archived_analytics_partition(TEXT, TEXT, BIGINT),
+    rebuild_analytics_rollups(DATE, DATE)
+FROM PUBLIC;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        REVOKE EXECUTE ON FUNCTION
+            create_analytics_partition(DATE),
+            ensure_analytics_partitions(INT),
+            detach_analytics_partitions(INT),
+            archived_analytics_rows(TEXT, BIGINT, INT),
+            drop_archived_analytics_partition(TEXT, TEXT, BIGINT),
+            rebuild_analytics_rollups(DATE, DATE)
+        FROM anon, authenticated;
+    END IF;
+END;
+$$;
+
+SELECT 'Migration 008 completed successfully' AS status;
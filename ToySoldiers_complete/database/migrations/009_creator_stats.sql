@@ -0,0 +1,261 @@
+-- Migration 009: Incrementally maintained creator stats
+-- dashboard_creator joined content x analytics_views x tips x comments per
+-- query, so SUM(duration) and SUM(amount) were multiplied by the other
+-- joins' row counts. creator_stats keeps one row per creator, updated by
+-- triggers on the source tables, and dashboard_creator now reads it.
+-- View totals come from the same inserted batches as the daily rollups
+-- (migration 007), so they cover archived months (migration 008) too.
+
+CREATE TABLE IF NOT EXISTS creator_stats (
+    creator_id UUID PRIMARY KEY REFERENCES creators(id) ON DELETE CASCADE,
+    total_content BIGINT NOT NULL DEFAULT 0,
+    total_views BIGINT NOT NULL DEFAULT 0,
+    total_watch_time NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    total_tips NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    tip_count BIGINT NOT NULL DEFAULT 0,
+    total_comments BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Recompute from the source tables: the backfill, and the way to repair
+-- drift. Views are summed from analytics_daily_rollups, not raw rows.
+CREATE OR REPLACE FUNCTION refresh_creator_stats(p_creator_id UUID DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO creator_stats (
+        creator_id, total_content, total_views, total_watch_time,
+        total_tips, tip_count, total_comments, updated_at
+    )
+    SELECT
+        c.id,
+        coalesce(ct.total_content, 0),
+        coalesce(r.total_views, 0),
+        coalesce(r.total_watch_time, 0),
+        coalesce(t.total_tips, 0),
+        coalesce(t.tip_count, 0),
+        coalesce(co.total_comments, 0),
+        NOW()
+    FROM creators c
+    LEFT JOIN (
+        SELECT creator_id, count(*) AS total_content
+        FROM content GROUP BY creator_id
+    ) ct ON ct.creator_id = c.id
+    LEFT JOIN (
+        SELECT ct.creator_id, sum(r.views) AS total_views, sum(r.watch_time) AS total_watch_time
+        FROM analytics_daily_rollups r
+        JOIN content ct ON ct.id = r.content_id
+        GROUP BY ct.creator_id
+    ) r ON r.creator_id = c.id
+    LEFT JOIN (
+        SELECT to_creator, sum(amount) AS total_tips, count(*) AS tip_count
+        FROM tips WHERE status = 'completed' GROUP BY to_creator
+    ) t ON t.to_creator = c.id
+    LEFT JOIN (
+        SELECT ct.creator_id, count(*) AS total_comments
+        FROM comments co
+        JOIN content ct ON ct.id = co.content_id
+        GROUP BY ct.creator_id
+    ) co ON co.creator_id = c.id
+    WHERE p_creator_id IS NULL OR c.id = p_creator_id
+    ON CONFLICT (creator_id) DO UPDATE
+    SET total_content = EXCLUDED.total_content,
+        total_views = EXCLUDED.total_views,
+        total_watch_time = EXCLUDED.total_watch_time,
+        total_tips = EXCLUDED.total_tips,
+        tip_count = EXCLUDED.tip_count,
+        total_comments = EXCLUDED.total_comments,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION create_creator_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO creator_stats (creator_id) VALUES (NEW.id)
+    ON CONFLICT (creator_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One update per creator per inserted batch of views
+CREATE OR REPLACE FUNCTION count_creator_views()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE creator_stats cs
+    SET total_views = cs.total_views + v.views,
+        total_watch_time = cs.total_watch_time + v.watch_time,
+        updated_at = NOW()
+    FROM (
+        SELECT ct.creator_id, sum(coalesce(nv.view_count, 1)) AS views, coalesce(sum(nv.duration), 0) AS watch_time
+        FROM new_views nv
+        JOIN content ct ON ct.id = nv.content_id
+        WHERE nv.date IS NOT NULL
+        GROUP BY ct.creator_id
+    ) v
+    WHERE cs.creator_id = v.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_creator_tips()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'completed' THEN
+        UPDATE creator_stats
+        SET total_tips = total_tips - OLD.amount, tip_count = tip_count - 1, updated_at = NOW()
+        WHERE creator_id = OLD.to_creator;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'completed' THEN
+        UPDATE creator_stats
+        SET total_tips = total_tips + NEW.amount, tip_count = tip_count + 1, updated_at = NOW()
+        WHERE creator_id = NEW.to_creator;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Comments removed along with their content are already subtracted by
+-- count_creator_content; by then the content row is gone and this matches nothing
+CREATE OR REPLACE FUNCTION count_creator_comments()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_content_id UUID := CASE WHEN TG_OP = 'INSERT' THEN NEW.content_id ELSE OLD.content_id END;
+BEGIN
+    UPDATE creator_stats cs
+    SET total_comments = cs.total_comments + CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END,
+        updated_at = NOW()
+    FROM content ct
+    WHERE ct.id = v_content_id AND cs.creator_id = ct.creator_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- BEFORE DELETE so the content's views and comments can still be read
+-- before ON DELETE CASCADE removes them
+CREATE OR REPLACE FUNCTION count_creator_content()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE creator_stats
+        SET total_content = total_content + 1, updated_at = NOW()
+        WHERE creator_id = NEW.creator_id;
+        RETURN NULL;
+    END IF;
+
+    UPDATE creator_stats cs
+    SET total_content = cs.total_content - 1,
+        total_views = cs.total_views - coalesce(r.views, 0),
+        total_watch_time = cs.total_watch_time - coalesce(r.watch_time, 0),
+        total_comments = cs.total_comments - (SELECT count(*) FROM comments WHERE content_id = OLD.id),
+        updated_at = NOW()
+    FROM (
+        SELECT sum(views) AS views, sum(watch_time) AS watch_time
+        FROM analytics_daily_rollups WHERE content_id = OLD.id
+    ) r
+    WHERE cs.creator_id = OLD.creator_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rollups rebuilt from raw rows can differ from what was counted on insert
+CREATE OR REPLACE FUNCTION rebuild_analytics_rollups(p_start DATE, p_end DATE)
+RETURNS VOID AS $$
+DECLARE
+    v_archived_until DATE;
+BEGIN
+    SELECT max(to_date(right(name, 7), 'YYYY_MM') + INTERVAL '1 month')::DATE
+    INTO v_archived_until
+    FROM (
+        SELECT partition_name AS name FROM analytics_archive_exports
+        UNION ALL
+        SELECT archived_analytics_partitions()
+    ) archived;
+
+    IF p_start < v_archived_until THEN
+        RAISE EXCEPTION 'raw views before % have been archived; rollups cannot be rebuilt from them', v_archived_until;
+    END IF;
+
+    DELETE FROM analytics_daily_rollups WHERE date BETWEEN p_start AND p_end;
+
+    INSERT INTO analytics_daily_rollups (content_id, date, device_type, views, watch_time)
+    SELECT
+        av.content_id,
+        av.date,
+        coalesce(av.device_type, ''),
+        sum(coalesce(av.view_count, 1)),
+        coalesce(sum(av.duration), 0)
+    FROM analytics_views av
+    JOIN content c ON c.id = av.content_id
+    WHERE av.date BETWEEN p_start AND p_end
+    GROUP BY av.content_id, av.date, coalesce(av.device_type, '');
+
+    PERFORM refresh_creator_stats();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill and attach the triggers under one lock so nothing is counted
+-- twice or missed; only the first time migrate_db.sh applies this file
+BEGIN;
+LOCK TABLE creators, content, comments, tips, analytics_views IN SHARE MODE;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'content_creator_stats' AND tgrelid = 'content'::regclass
+    ) THEN
+        PERFORM refresh_creator_stats();
+
+        CREATE TRIGGER creators_creator_stats
+        AFTER INSERT ON creators
+        FOR EACH ROW EXECUTE FUNCTION create_creator_stats();
+
+        CREATE TRIGGER content_creator_stats
+        AFTER INSERT ON content
+        FOR EACH ROW EXECUTE FUNCTION count_creator_content();
+
+        CREATE TRIGGER content_delete_creator_stats
+        BEFORE DELETE ON content
+        FOR EACH ROW EXECUTE FUNCTION count_creator_content();
+
+        CREATE TRIGGER comments_creator_stats
+        AFTER INSERT OR DELETE ON comments
+        FOR EACH ROW EXECUTE FUNCTION count_creator_comments();
+
+        CREATE TRIGGER tips_creator_stats
+        AFTER INSERT OR DELETE OR UPDATE OF status, amount, to_creator ON tips
+        FOR EACH ROW EXECUTE FUNCTION count_creator_tips();
+
+        CREATE TRIGGER analytics_views_creator_stats
+        AFTER INSERT ON analytics_views
+        REFERENCING NEW TABLE AS new_views
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION count_creator_views();
+    END IF;
+END;
+$$;
+COMMIT;
+
+CREATE OR REPLACE VIEW dashboard_creator AS
+SELECT
+    c.id AS creator_id,
+    c.user_id,
+    cs.total_content,
+    cs.total_views,
+    cs.total_watch_time::NUMERIC AS total_watch_time,
+    cs.total_tips::NUMERIC AS total_tips,
+    cs.total_comments
+FROM creators c
+JOIN creator_stats cs ON cs.creator_id = c.id;
+
+REVOKE EXECUTE ON FUNCTION refresh_creator_stats(UUID) FROM PUBLIC;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        REVOKE EXECUTE ON FUNCTION refresh_creator_stats(UUID) FROM anon, authenticated;
+    END IF;
+END;
+$$;
+
+SELECT 'Migration 009 completed successfully' AS status;
@@ -0,0 +1,94 @@
+-- Migration 010: Durable queue for Stripe webhook events
+-- /payments/webhook now only verifies the signature and records the event
+-- here; the unique event_id makes Stripe's retries no-ops. Workers in the
+-- payments service claim events with claim_stripe_events() and apply them
+-- to tips. Events that keep failing end up with status 'dead' and can be
+-- replayed with `python webhook_queue.py replay` from the payments image.
+
+CREATE TABLE IF NOT EXISTS stripe_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_id TEXT UNIQUE NOT NULL,
+    type TEXT NOT NULL,
+    stripe_txn TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'done', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMPTZ,
+    received_at TIMESTAMPTZ DEFAULT NOW(),
+    processed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_stripe_events_queue
+    ON stripe_events(id) WHERE status IN ('pending', 'processing');
+CREATE INDEX IF NOT EXISTS idx_stripe_events_txn
+    ON stripe_events(stripe_txn, id) WHERE status IN ('pending', 'processing');
+CREATE INDEX IF NOT EXISTS idx_stripe_events_dead
+    ON stripe_events(id) WHERE status = 'dead';
+
+-- Claim up to p_limit due events. An event is only handed out once every
+-- earlier unfinished event for the same stripe_txn is done (or dead), so a
+-- transaction's events are applied in the order they were received no
+-- matter how many workers or processes are claiming. Claims older than
+-- p_lease are treated as abandoned by a crashed worker and handed out again.
+CREATE OR REPLACE FUNCTION claim_stripe_events(
+    p_limit INT DEFAULT 50,
+    p_lease INTERVAL DEFAULT INTERVAL '5 minutes'
+)
+RETURNS SETOF stripe_events AS $$
+    WITH claimable AS (
+        SELECT e.id
+        FROM stripe_events e
+        WHERE (
+                (e.status = 'pending' AND e.available_at <= NOW())
+                OR (e.status = 'processing' AND e.locked_at < NOW() - p_lease)
+              )
+          AND NOT EXISTS (
+                SELECT 1 FROM stripe_events earlier
+                WHERE earlier.stripe_txn = e.stripe_txn
+                  AND earlier.id < e.id
+                  AND earlier.status IN ('pending', 'processing')
+              )
+        ORDER BY e.id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE stripe_events e
+    SET status = 'processing',
+        locked_at = NOW(),
+        attempts = e.attempts + 1
+    FROM claimable
+    WHERE e.id = claimable.id
+    RETURNING e.*;
+$$ LANGUAGE sql;
+
+-- Put dead events back on the queue (all of them when p_event_ids is NULL)
+CREATE OR REPLACE FUNCTION replay_stripe_events(p_event_ids TEXT[] DEFAULT NULL)
+RETURNS SETOF TEXT AS $$
+    UPDATE stripe_events
+    SET status = 'pending',
+        attempts = 0,
+        last_error = NULL,
+        available_at = NOW(),
+        locked_at = NULL
+    WHERE status = 'dead'
+      AND (p_event_ids IS NULL OR event_id = ANY(p_event_ids))
+    RETURNING event_id;
+$$ LANGUAGE sql;
+
+REVOKE EXECUTE ON FUNCTION claim_stripe_events(INT, INTERVAL), replay_stripe_events(TEXT[]) FROM PUBLIC;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        REVOKE EXECUTE ON FUNCTION claim_stripe_events(INT, INTERVAL), replay_stripe_events(TEXT[])
+        FROM anon, authenticated;
+    END IF;
+END;
+$$;
+
+-- Webhook payloads are internal; keep the table out of the public API
+ALTER TABLE stripe_events ENABLE ROW LEVEL SECURITY;
+
+SELECT 'Migration 010 completed successfully' AS status;
@@ -0,0 +1,9 @@
+-- Migration 011: Keyset index for a creator's completed tips
+-- /payments/payouts/tips pages a creator's completed tips newest first on
+-- (created_at, id); earnings totals come from creator_stats (migration 009).
+-- CONCURRENTLY avoids locking writes; migrate_db.sh runs each file outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tips_to_creator_completed_created_id
+    ON tips(to_creator, created_at DESC, id DESC) WHERE status = 'completed';
+
+SELECT 'Migration 011 completed successfully' AS status;
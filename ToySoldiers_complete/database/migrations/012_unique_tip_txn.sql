@@ -0,0 +1,33 @@
+-- Migration 012: One tip per Stripe transaction
+-- Checkout and the payment_intent.succeeded webhook both record tips with
+-- upsert(on_conflict="stripe_txn"), so concurrent retries of the same
+-- request cannot insert a tip twice. Duplicates left by the old
+-- check-then-insert are removed first, keeping the completed (or else the
+-- earliest) row; creator_stats follows through its delete trigger.
+-- CONCURRENTLY avoids locking writes; migrate_db.sh runs each file outside a transaction.
+
+DELETE FROM tips t
+USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY stripe_txn
+        ORDER BY (status = 'completed') DESC, created_at, id
+    ) AS n
+    FROM tips
+    WHERE stripe_txn IS NOT NULL
+) ranked
+WHERE t.id = ranked.id AND ranked.n > 1;
+
+-- A failed earlier run can leave an invalid index behind
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = 'idx_tips_stripe_txn' AND NOT i.indisvalid
+    ) THEN
+        DROP INDEX idx_tips_stripe_txn;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_tips_stripe_txn ON tips(stripe_txn);
+
+SELECT 'Migration 012 completed successfully' AS status;
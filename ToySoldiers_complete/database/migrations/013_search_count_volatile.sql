@@ -0,0 +1,9 @@
+-- Migration 013: search_content_count() must be VOLATILE
+-- Migration 006 declared it STABLE, but it EXPLAINs the search to estimate
+-- large totals and Postgres rejects EXPLAIN in a non-volatile function, so
+-- every search with more than exact_limit matches failed. 006 now creates it
+-- VOLATILE; this fixes databases that already applied the old version.
+
+ALTER FUNCTION search_content_count(TEXT, INTEGER) VOLATILE;
+
+SELECT 'Migration 013 completed successfully' AS status;
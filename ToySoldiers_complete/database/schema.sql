@@ -3,6 +3,7 @@
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- Users table
 CREATE TABLE IF NOT EXISTS users (
@@ -43,14 +44,25 @@ CREATE TABLE IF NOT EXISTS content (
     visibility TEXT DEFAULT 'public' CHECK (visibility IN ('public', 'unlisted', 'private')),
     duration INTEGER,
     file_size BIGINT,
+    checksum TEXT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
 );
 
 CREATE INDEX idx_content_creator_id ON content(creator_id);
 CREATE INDEX idx_content_visibility ON content(visibility);
 CREATE INDEX idx_content_created_at ON content(created_at DESC);
 CREATE INDEX idx_content_tags ON content USING GIN(tags);
+-- Keyset pagination on (created_at, id), newest first
+CREATE INDEX idx_content_visibility_created_id ON content(visibility, created_at DESC, id DESC);
+CREATE INDEX idx_content_creator_created_id ON content(creator_id, created_at DESC, id DESC);
+-- Full-text and trigram search (ranking functions live in migration 006)
+CREATE INDEX idx_content_search_vector ON content USING GIN(search_vector);
+CREATE INDEX idx_content_title_trgm ON content USING GIN(title gin_trgm_ops);
 
 -- Comments table
 CREATE TABLE IF NOT EXISTS comments (
@@ -80,39 +92,99 @@ CREATE TABLE IF NOT EXISTS tips (
 CREATE INDEX idx_tips_from_user ON tips(from_user);
 CREATE INDEX idx_tips_to_creator ON tips(to_creator);
 CREATE INDEX idx_tips_created_at ON tips(created_at DESC);
+CREATE INDEX idx_tips_from_user_created_id ON tips(from_user, created_at DESC, id DESC);
+CREATE INDEX idx_tips_to_creator_completed_created_id ON tips(to_creator, created_at DESC, id DESC) WHERE status = 'completed';
+CREATE UNIQUE INDEX idx_tips_stripe_txn ON tips(stripe_txn);
+
+-- Stripe webhook events: idempotency store and work queue for the payments
+-- service's webhook workers (claim/replay functions in migration 010)
+CREATE TABLE IF NOT EXISTS stripe_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_id TEXT UNIQUE NOT NULL,
+    type TEXT NOT NULL,
+    stripe_txn TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'done', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMPTZ,
+    received_at TIMESTAMPTZ DEFAULT NOW(),
+    processed_at TIMESTAMPTZ
+);
+
+CREATE INDEX idx_stripe_events_queue ON stripe_events(id) WHERE status IN ('pending', 'processing');
+CREATE INDEX idx_stripe_events_txn ON stripe_events(stripe_txn, id) WHERE status IN ('pending', 'processing');
+CREATE INDEX idx_stripe_events_dead ON stripe_events(id) WHERE status = 'dead';
 
--- Analytics views table
+-- Analytics views table, range-partitioned by month on date. Monthly
+-- partitions are created and retired by the functions in migration 008;
+-- the default partition only catches dates no monthly partition covers.
 CREATE TABLE IF NOT EXISTS analytics_views (
-    id SERIAL PRIMARY KEY,
-    date DATE DEFAULT CURRENT_DATE,
+    id BIGSERIAL,
+    date DATE NOT NULL DEFAULT CURRENT_DATE,
     user_id UUID REFERENCES users(id),
     content_id UUID REFERENCES content(id),
     view_count INTEGER DEFAULT 1,
     duration NUMERIC(8, 2),
     device_type TEXT,
-    referrer TEXT
-);
+    referrer TEXT,
+    PRIMARY KEY (id, date)
+) PARTITION BY RANGE (date);
+
+CREATE TABLE IF NOT EXISTS analytics_views_default PARTITION OF analytics_views DEFAULT;
 
 CREATE INDEX idx_analytics_views_date ON analytics_views(date);
 CREATE INDEX idx_analytics_views_user_id ON analytics_views(user_id);
 CREATE INDEX idx_analytics_views_content_id ON analytics_views(content_id);
 
+-- Daily per-content view rollups, maintained from analytics_views inserts
+-- (trigger in migration 007). device_type '' means unknown.
+CREATE TABLE IF NOT EXISTS analytics_daily_rollups (
+    content_id UUID NOT NULL REFERENCES content(id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    device_type TEXT NOT NULL DEFAULT '',
+    views BIGINT NOT NULL DEFAULT 0,
+    watch_time NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_id, date, device_type)
+);
+
+-- Months of analytics_views detached into the analytics_archive schema and
+-- exported to object storage (functions in migration 008)
+CREATE SCHEMA IF NOT EXISTS analytics_archive;
+
+CREATE TABLE IF NOT EXISTS analytics_archive_exports (
+    partition_name TEXT PRIMARY KEY,
+    object_key TEXT NOT NULL,
+    row_count BIGINT NOT NULL,
+    exported_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Per-creator totals kept current by triggers on creators, content,
+-- comments, tips and analytics_views (migration 009)
+CREATE TABLE IF NOT EXISTS creator_stats (
+    creator_id UUID PRIMARY KEY REFERENCES creators(id) ON DELETE CASCADE,
+    total_content BIGINT NOT NULL DEFAULT 0,
+    total_views BIGINT NOT NULL DEFAULT 0,
+    total_watch_time NUMERIC(16, 2) NOT NULL DEFAULT 0,
+    total_tips NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    tip_count BIGINT NOT NULL DEFAULT 0,
+    total_comments BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- Dashboard view for creators
 CREATE OR REPLACE VIEW dashboard_creator AS
-SELECT 
+SELECT
     c.id AS creator_id,
     c.user_id,
-    COUNT(DISTINCT ct.id) AS total_content,
-    COUNT(DISTINCT av.id) AS total_views,
-    COALESCE(SUM(av.duration), 0) AS total_watch_time,
-    COALESCE(SUM(t.amount), 0) AS total_tips,
-    COUNT(DISTINCT co.id) AS total_comments
+    cs.total_content,
+    cs.total_views,
+    cs.total_watch_time::NUMERIC AS total_watch_time,
+    cs.total_tips::NUMERIC AS total_tips,
+    cs.total_comments
 FROM creators c
-LEFT JOIN content ct ON ct.creator_id = c.id
-LEFT JOIN analytics_views av ON av.content_id = ct.id
-LEFT JOIN tips t ON t.to_creator = c.id AND t.status = 'completed'
-LEFT JOIN comments co ON co.content_id = ct.id
-GROUP BY c.id, c.user_id;
+JOIN creator_stats cs ON cs.creator_id = c.id;
 
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -139,6 +211,7 @@ EXECUTE FUNCTION update_updated_at_column();
 ALTER TABLE content ENABLE ROW LEVEL SECURITY;
 ALTER TABLE comments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE tips ENABLE ROW LEVEL SECURITY;
+ALTER TABLE stripe_events ENABLE ROW LEVEL SECURITY;
 
 -- Public content is viewable by everyone
 CREATE POLICY "Public content is viewable by everyone" ON content
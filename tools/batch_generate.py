@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Batch Brief Generator - parallel multi-brief pipeline
+Parses, validates and generates every briefs/*_Stack.yaml on a process pool
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pathlib
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+import build_docs  # noqa: E402
+
+ROOT = build_docs.ROOT
+BRIEFS = build_docs.BRIEFS
+STAGES = ("validate", "docs", "code")
+
+
+def brief_name(path):
+    """Project name derived from a brief filename."""
+    return path.stem.replace("_Stack", "")
+
+
+def process_brief(path, stages, output_root, incremental):
+    """Run the requested stages for one brief. Never raises - failures are reported."""
+    path = pathlib.Path(path)
+    name = brief_name(path)
+    result = {"brief": str(path), "name": name, "ok": True, "timings": {}, "error": None}
+    log = io.StringIO()
+    started = time.perf_counter()
+
+    with contextlib.redirect_stdout(log):
+        try:
+            stage_start = time.perf_counter()
+            spec = build_docs.validate_manifest(path)
+            result["timings"]["validate"] = time.perf_counter() - stage_start
+
+            if "docs" in stages:
+                stage_start = time.perf_counter()
+                build_docs.generate_docs(spec, name)
+                result["timings"]["docs"] = time.perf_counter() - stage_start
+
+            if "code" in stages:
+                import yaml_to_code  # needs jinja2; docs-only runs don't
+
+                stage_start = time.perf_counter()
+                spec.pop("_normalized_project", None)
+                output_dir = os.path.join(output_root, f"{name}_complete")
+                yaml_to_code.generate_project_structure(spec, name, output_dir, incremental=incremental)
+                result["timings"]["code"] = time.perf_counter() - stage_start
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=log)
+
+    result["timings"]["total"] = time.perf_counter() - started
+    result["log"] = log.getvalue()
+    return result
+
+
+def run_batch(briefs, stages=STAGES, output_root=ROOT, incremental=False, workers=None):
+    """Process briefs concurrently, one worker per core by default."""
+    briefs = sorted(pathlib.Path(b) for b in briefs)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(briefs) or 1))
+    results = []
+
+    print(f"🏭 Processing {len(briefs)} briefs on {workers} workers ({', '.join(stages)})")
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_brief, str(brief), tuple(stages), str(output_root), incremental): brief
+            for brief in briefs
+        }
+        for future in as_completed(futures):
+            brief = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker process died (e.g. OOM) - isolate the failure to this brief
+                result = {
+                    "brief": str(brief), "name": brief_name(brief), "ok": False,
+                    "timings": {}, "error": f"worker crashed: {e}", "log": "",
+                }
+            status = "✅" if result["ok"] else "❌"
+            total = result["timings"].get("total", 0.0)
+            print(f"{status} {result['name']} ({total:.2f}s)")
+            if not result["ok"]:
+                print(f"   {result['error']}")
+            results.append(result)
+
+    results.sort(key=lambda r: r["brief"])
+    report = {
+        "stages": list(stages),
+        "workers": workers,
+        "wall_time": time.perf_counter() - started,
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "briefs": results,
+    }
+    print_summary(report)
+    return report
+
+
+def print_summary(report):
+    """Print a per-brief timing table and totals."""
+    print("")
+    print("📊 Batch summary")
+    print(f"   {'brief':<32} {'status':<8} " + " ".join(f"{s:>9}" for s in STAGES + ("total",)))
+    for result in report["briefs"]:
+        timings = result["timings"]
+        cells = " ".join(
+            f"{timings[s]:>8.2f}s" if s in timings else f"{'-':>9}" for s in STAGES + ("total",)
+        )
+        status = "ok" if result["ok"] else "FAILED"
+        print(f"   {result['name']:<32} {status:<8} {cells}")
+
+    cpu_time = sum(r["timings"].get("total", 0.0) for r in report["briefs"])
+    print(f"   {report['succeeded']} succeeded, {report['failed']} failed")
+    print(f"   wall time {report['wall_time']:.2f}s, brief time {cpu_time:.2f}s on {report['workers']} workers")
+
+
+def main():
+    """Generate all briefs (or the given ones) concurrently."""
+    parser = argparse.ArgumentParser(description="Parallel multi-brief generation")
+    parser.add_argument("briefs", nargs="*", help="brief files (default: briefs/*_Stack.yaml)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma separated stages: validate,docs,code")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: cores)")
+    parser.add_argument("--output-root", default=str(ROOT), help="where <name>_complete dirs are written")
+    parser.add_argument("--incremental", action="store_true", help="incremental code generation")
+    parser.add_argument("--report", help="write a JSON summary report to this path")
+    parser.add_argument("--verbose", action="store_true", help="print each brief's generator output")
+    args = parser.parse_args()
+
+    stages = tuple(s.strip() for s in args.stages.split(",") if s.strip())
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"❌ Unknown stages: {', '.join(unknown)}")
+        sys.exit(1)
+
+    briefs = [pathlib.Path(b) for b in args.briefs] or list(BRIEFS.glob("*_Stack.yaml"))
+    missing = [b for b in briefs if not b.exists()]
+    if missing:
+        print(f"❌ File not found: {', '.join(str(b) for b in missing)}")
+        sys.exit(1)
+    if not briefs:
+        print(f"⚠️  No briefs found in {BRIEFS}")
+        return
+
+    report = run_batch(briefs, stages, args.output_root, args.incremental, args.workers)
+
+    for result in report["briefs"]:
+        if args.verbose or not result["ok"]:
+            print(f"\n--- {result['name']} ---")
+            print(result["log"].rstrip())
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report → {args.report}")
+
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
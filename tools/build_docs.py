@@ -3,22 +3,75 @@
 Pure Copilot CLI System - Document Generator
 Processes YAML manifests from briefs/ for Copilot CLI generation
 """
+import hashlib
+import itertools
 import json
+import os
 import pathlib
+import subprocess
 import sys
 
 import jsonschema
 import yaml
 
+from manifest_loader import cache_root, load_manifest
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 BRIEFS = ROOT / "briefs"
+SCHEMAS = pathlib.Path(__file__).resolve().parent / "schemas"
+INTROSPECTOR = pathlib.Path(__file__).resolve().parent / "openapi_introspect.py"
+CURRENT_SCHEMA_VERSION = "2"
+
+# Compiled validators per schema version - built once per process
+_validators = {}
+
+
+def load_brief_schema(version):
+    """Brief JSON Schema for a version, from tools/schemas/brief_v<version>.json."""
+    schema_path = SCHEMAS / f"brief_v{version}.json"
+    if not schema_path.exists():
+        raise ValueError(f"Unknown brief schema version: {version}")
+    with open(schema_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_validator(version=CURRENT_SCHEMA_VERSION):
+    """Compiled validator (format checks included) for a schema version."""
+    version = str(version)
+    validator = _validators.get(version)
+    if validator is None:
+        schema = load_brief_schema(version)
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = validator_class(schema, format_checker=validator_class.FORMAT_CHECKER)
+        _validators[version] = validator
+    return validator
+
+
+def schema_version_for(spec):
+    """Schema version a brief declares, defaulting to the current one."""
+    if isinstance(spec, dict):
+        if "schema_version" in spec:
+            return str(spec["schema_version"])
+        if isinstance(spec.get("project_meta"), dict) and "schema_version" in spec["project_meta"]:
+            return str(spec["project_meta"]["schema_version"])
+    return CURRENT_SCHEMA_VERSION
+
+
+def iter_manifest_errors(spec, version=None):
+    """Lazily yield validation errors; callers stop pulling when they have enough."""
+    return get_validator(version or schema_version_for(spec)).iter_errors(spec)
 
 
 def validate_manifest(path):
     """Validate YAML manifest for Copilot CLI processing."""
     print(f"🧩 Validating {path.name}")
-    with open(path, encoding="utf-8") as f:
-        spec = yaml.safe_load(f)
+    spec = load_manifest(path)
+    
+    # Fail fast on the first error - the iterator is never drained
+    error = next(iter_manifest_errors(spec), None)
+    if error is not None:
+        raise error
     
     # Handle both project_meta structure and simple project structure
     project_name = None
@@ -30,15 +83,136 @@ def validate_manifest(path):
         # Default to filename if neither structure exists
         project_name = path.stem.replace("_Stack", "")
     
-    # Basic validation - Copilot CLI can handle any valid YAML structure
-    schema = {"type": "object"}  # Minimal validation for flexibility
-    jsonschema.validate(spec, schema)
-    
     # Add normalized project field for consistency
     spec["_normalized_project"] = project_name
     return spec
 
 
+def check_manifests(paths, max_errors=10):
+    """Validate many briefs in one process, reusing compiled validators.
+
+    Returns the number of briefs that failed.
+    """
+    failed = 0
+    for path in paths:
+        path = pathlib.Path(path)
+        try:
+            spec = load_manifest(path)
+            version = schema_version_for(spec)
+            errors = list(itertools.islice(iter_manifest_errors(spec, version), max_errors))
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        if not errors:
+            print(f"✅ {path} valid (schema v{version})")
+            continue
+        failed += 1
+        print(f"❌ {path} (schema v{version})")
+        for error in errors:
+            location = "/".join(str(p) for p in error.absolute_path) or "<root>"
+            print(f"   {location}: {error.message}")
+        if len(errors) == max_errors:
+            print(f"   ... stopped after {max_errors} errors")
+    return failed
+
+
+def discover_services(name):
+    """FastAPI service directories in a generated project (dirs with main.py creating app)."""
+    backend = ROOT / f"{name}_complete" / "backend"
+    services = []
+    for main_py in sorted(backend.glob("**/main.py")):
+        if "node_modules" in main_py.parts:
+            continue
+        if "FastAPI(" in main_py.read_text(encoding="utf-8", errors="ignore"):
+            services.append(main_py.parent)
+    return services
+
+
+def service_source_hash(service_dir):
+    """Hash of a service's sources, shared sibling packages, and the introspector."""
+    digest = hashlib.sha256(INTROSPECTOR.read_bytes())
+    # Sibling dirs without a main.py are shared packages the service may import
+    shared = [d for d in sorted(service_dir.parent.iterdir()) if d.is_dir() and not (d / "main.py").exists()]
+    for root in [service_dir] + shared:
+        for source in sorted(root.rglob("*")):
+            if source.is_file() and "__pycache__" not in source.parts:
+                digest.update(str(source.relative_to(service_dir.parent)).encode("utf-8"))
+                digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def introspect_service(service_dir):
+    """Service OpenAPI document, re-introspected only when its sources change."""
+    cache_file = cache_root() / "openapi" / f"{service_source_hash(service_dir)}.json"
+    if cache_file.exists():
+        with open(cache_file, encoding="utf-8") as f:
+            return json.load(f), True
+
+    result = subprocess.run(
+        [sys.executable, str(INTROSPECTOR), str(service_dir)],
+        capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"introspection of {service_dir.name} failed: {result.stderr.strip()}")
+    document = json.loads(result.stdout)
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(document), encoding="utf-8")
+    os.replace(tmp_file, cache_file)
+    return document, False
+
+
+def _rewrite_refs(node, renames):
+    """Point $refs at renamed component schemas."""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/components/schemas/"):
+            target = ref.rsplit("/", 1)[-1]
+            if target in renames:
+                node["$ref"] = f"#/components/schemas/{renames[target]}"
+        for value in node.values():
+            _rewrite_refs(value, renames)
+    elif isinstance(node, list):
+        for value in node:
+            _rewrite_refs(value, renames)
+
+
+def merge_openapi(documents, schemas):
+    """Merge per-service OpenAPI documents into one paths/schemas pair.
+
+    Schemas that clash with a different definition are renamed with the
+    service prefix; clashing paths (e.g. each service's /health) are
+    namespaced as /<service><path> and keep x-original-path.
+    """
+    paths = {}
+    schemas = dict(schemas)
+    for service, document in documents:
+        prefix = "".join(part.title() for part in service.split("_"))
+        service_schemas = document.get("components", {}).get("schemas", {})
+        renames = {
+            schema_name: f"{prefix}{schema_name}"
+            for schema_name, schema in service_schemas.items()
+            if schema_name in schemas and schemas[schema_name] != schema
+        }
+        _rewrite_refs(document, renames)
+        for schema_name, schema in service_schemas.items():
+            schemas[renames.get(schema_name, schema_name)] = schema
+
+        for path, item in document.get("paths", {}).items():
+            for operation in item.values():
+                if isinstance(operation, dict):
+                    operation["x-service"] = service
+                    if "operationId" in operation:
+                        operation["operationId"] = f"{service}_{operation['operationId']}"
+            if path in paths:
+                item["x-original-path"] = path
+                path = f"/{service}{path}"
+            paths[path] = item
+    return paths, schemas
+
+
 def generate_docs(spec, name):
     """Generate OpenAPI and Schema docs for Copilot CLI system."""
     out_api = ROOT / f"{name}_API_OpenAPI.yaml"
@@ -65,15 +239,22 @@ def generate_docs(spec, name):
             }
         }
     
-    # Generate OpenAPI spec optimized for Copilot CLI understanding
-    openapi = {
-        "openapi": "3.1.0",
-        "info": {
-            "title": f"{project_name} API",
-            "version": "1.0.0",
-            "description": "Generated by Copilot CLI Factory"
-        },
-        "paths": {
+    # Introspect the real routes of every generated FastAPI service
+    documents = []
+    for service_dir in discover_services(name):
+        try:
+            document, cached = introspect_service(service_dir)
+        except (RuntimeError, subprocess.TimeoutExpired, ValueError) as e:
+            print(f"⚠️  Skipping {service_dir.name}: {e}")
+            continue
+        documents.append((service_dir.name, document))
+        print(f"🔎 {service_dir.name}: {len(document.get('paths', {}))} paths{' (cached)' if cached else ''}")
+    
+    if documents:
+        paths, schemas = merge_openapi(documents, schemas)
+    else:
+        # No generated services yet - publish the health contract only
+        paths = {
             "/health": {
                 "get": {
                     "summary": "Health check endpoint",
@@ -91,7 +272,17 @@ def generate_docs(spec, name):
                     }
                 }
             }
+        }
+    
+    # Generate OpenAPI spec optimized for Copilot CLI understanding
+    openapi = {
+        "openapi": "3.1.0",
+        "info": {
+            "title": f"{project_name} API",
+            "version": "1.0.0",
+            "description": "Generated by Copilot CLI Factory"
         },
+        "paths": paths,
         "components": {"schemas": schemas},
     }
     
@@ -106,7 +297,12 @@ def generate_docs(spec, name):
 
 def main():
     """Process YAML manifests for Copilot CLI system."""
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == "--check":
+        # Validate only - many briefs in one process
+        paths = sys.argv[2:] or sorted(BRIEFS.glob("*_Stack.yaml"))
+        if check_manifests(paths):
+            sys.exit(1)
+    elif len(sys.argv) > 1:
         # Process specific file from command line
         brief_path = pathlib.Path(sys.argv[1])
         if brief_path.exists():
@@ -118,12 +314,15 @@ def main():
             print(f"❌ File not found: {brief_path}")
             sys.exit(1)
     else:
-        # Process all files in briefs directory
-        for brief in BRIEFS.glob("*_Stack.yaml"):
-            name = brief.stem.replace("_Stack", "")
-            spec = validate_manifest(brief)
-            generate_docs(spec, name)
-            print(f"� Ready for Copilot CLI: {name}")
+        # Process all files in briefs directory concurrently, one worker per core
+        from batch_generate import run_batch
+
+        report = run_batch(BRIEFS.glob("*_Stack.yaml"), stages=("validate", "docs"))
+        for result in report["briefs"]:
+            if result["ok"]:
+                print(f"🚀 Ready for Copilot CLI: {result['name']}")
+        if report["failed"]:
+            sys.exit(1)
 
 
 if __name__ == "__main__":
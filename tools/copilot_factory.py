@@ -7,7 +7,7 @@ import subprocess
 import sys
 from pathlib import Path
 
-import yaml
+from manifest_loader import load_manifest
 
 
 def trigger_copilot_generation(brief_path: str) -> None:
@@ -20,8 +20,7 @@ def trigger_copilot_generation(brief_path: str) -> None:
             sys.exit(1)
         
         # Load brief to get project name
-        with open(brief, encoding="utf-8") as f:
-            spec = yaml.safe_load(f)
+        spec = load_manifest(brief)
         
         project_name = spec.get("project", brief.stem.replace("_Stack", ""))
         print(f"🚀 Triggering Copilot CLI generation for: {project_name}")
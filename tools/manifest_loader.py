@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Manifest Loader - shared fast path for reading YAML briefs
+Uses the libyaml C loader when available and keeps an on-disk cache of parsed
+manifests keyed by file content hash, so unchanged briefs skip YAML parsing.
+"""
+import hashlib
+import os
+import pathlib
+import pickle
+import sys
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Bump when the cached representation changes
+CACHE_VERSION = 1
+
+_memory_cache = {}
+
+
+def cache_root():
+    """Root directory for on-disk generator caches."""
+    override = os.getenv("BUILDER_CACHE_DIR")
+    if override:
+        return pathlib.Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "builder"
+
+
+def parse_yaml(text):
+    """Parse YAML text with the fastest available safe loader."""
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def _cache_path(digest):
+    return cache_root() / "manifests" / f"{digest}.pickle"
+
+
+def load_manifest(path, use_cache=True):
+    """Load a YAML manifest, reusing the parsed result while the file is unchanged.
+
+    Every call returns a fresh object, so callers may mutate the result freely.
+    """
+    raw = pathlib.Path(path).read_bytes()
+    if not use_cache or os.getenv("BUILDER_NO_CACHE"):
+        return parse_yaml(raw)
+
+    digest = hashlib.sha256(f"v{CACHE_VERSION}:{SafeLoader.__name__}:".encode("utf-8") + raw).hexdigest()
+
+    blob = _memory_cache.get(digest)
+    if blob is None:
+        cache_file = _cache_path(digest)
+        try:
+            blob = cache_file.read_bytes()
+        except OSError:
+            blob = None
+
+    if blob is not None:
+        try:
+            spec = pickle.loads(blob)
+            _memory_cache[digest] = blob
+            return spec
+        except Exception:
+            # Corrupt or incompatible entry - fall through and reparse
+            blob = None
+
+    spec = parse_yaml(raw)
+    blob = pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL)
+    _memory_cache[digest] = blob
+    try:
+        cache_file = _cache_path(digest)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_bytes(blob)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # cache is best-effort; read-only checkouts still work
+    return spec
+
+
+def project_name(spec, default):
+    """Project name from project_meta.name, project, or the given default."""
+    if isinstance(spec.get("project_meta"), dict):
+        return spec["project_meta"].get("name", default)
+    return spec.get("project", default)
+
+
+def main():
+    """Load briefs through the cache; exits non-zero if any is not a YAML mapping.
+
+    Usage: manifest_loader.py <brief.yaml>...
+           manifest_loader.py --project-name <brief.yaml>
+    """
+    args = sys.argv[1:]
+    if args[:1] == ["--project-name"] and len(args) == 2:
+        path = pathlib.Path(args[1])
+        print(project_name(load_manifest(path), path.stem.replace("_Stack", "")))
+        return
+
+    if not args:
+        print("Usage: python manifest_loader.py [--project-name] <brief.yaml>...")
+        sys.exit(1)
+
+    failed = False
+    for path in args:
+        try:
+            spec = load_manifest(path)
+        except (OSError, yaml.YAMLError) as e:
+            print(f"❌ {path}: {e}")
+            failed = True
+            continue
+        if not isinstance(spec, dict):
+            print(f"❌ {path}: top level must be a mapping")
+            failed = True
+            continue
+        print(f"✅ {path} valid")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Manifest Walker - lazy, bounded-memory traversal of parsed YAML briefs
+Generators over components -> apis -> endpoints and data -> tables -> columns,
+plus manifest statistics gathered without stringifying the whole tree.
+"""
+from typing import Any, Dict, Iterator, Tuple
+
+
+def _mapping(value: Any) -> Dict[str, Any]:
+    """Treat missing or null YAML sections as empty mappings."""
+    return value if isinstance(value, dict) else {}
+
+
+def walk_components(manifest: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (component_name, component) for every component."""
+    for component_name, component in _mapping(manifest.get('components')).items():
+        yield component_name, _mapping(component)
+
+
+def walk_apis(manifest: Dict[str, Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Yield (component_name, api_name, api_spec) for every API."""
+    for component_name, component in walk_components(manifest):
+        for api_name, api_spec in _mapping(component.get('apis')).items():
+            yield component_name, api_name, _mapping(api_spec)
+
+
+def walk_endpoints(manifest: Dict[str, Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Yield (component_name, api_name, endpoint) for every endpoint."""
+    for component_name, api_name, api_spec in walk_apis(manifest):
+        for endpoint in api_spec.get('endpoints') or []:
+            yield component_name, api_name, endpoint
+
+
+def walk_tables(manifest: Dict[str, Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Yield (schema_name, table_name, table_spec) for every table."""
+    for schema_name, schema in _mapping(manifest.get('data')).items():
+        for table_name, table_spec in _mapping(_mapping(schema).get('tables')).items():
+            yield schema_name, table_name, _mapping(table_spec)
+
+
+def walk_columns(table_spec: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (column_name, column_spec) for one table."""
+    for column_name, column_spec in _mapping(table_spec.get('columns')).items():
+        yield column_name, _mapping(column_spec)
+
+
+def repr_length(value: Any) -> int:
+    """len(str(value)) for YAML data, computed without building the string."""
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            # '{' + "k: v" joined by ', ' + '}'
+            total += 2 + max(len(item) - 1, 0) * 2
+            for key, child in item.items():
+                total += len(repr(key)) + 2
+                stack.append(child)
+        elif isinstance(item, list):
+            total += 2 + max(len(item) - 1, 0) * 2
+            stack.extend(item)
+        else:
+            total += len(repr(item))
+    return total
+
+
+def manifest_stats(manifest: Dict[str, Any]) -> Dict[str, int]:
+    """Counts and size of a manifest; components and data are each walked once."""
+    stats = {'characters': repr_length(manifest), 'components': 0, 'apis': 0,
+             'endpoints': 0, 'tables': 0, 'columns': 0}
+    for _, component in walk_components(manifest):
+        stats['components'] += 1
+        for api_spec in _mapping(component.get('apis')).values():
+            stats['apis'] += 1
+            stats['endpoints'] += len(_mapping(api_spec).get('endpoints') or [])
+    for _, _, table_spec in walk_tables(manifest):
+        stats['tables'] += 1
+        stats['columns'] += len(_mapping(table_spec.get('columns')))
+    return stats
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+OpenAPI Introspector - dump a FastAPI service's real route table
+Imports <service_dir>/main.py with network clients (Supabase, Stripe, R2,
+PostHog) replaced by inert stand-ins, then prints app.openapi() as JSON.
+Run one service per process: services share module names (main, routes).
+"""
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+from unittest import mock
+
+# Settings classes read these at import time; real secrets are never needed
+PLACEHOLDER_ENV = {
+    "SUPABASE_URL": "http://introspection.invalid",
+    "SUPABASE_SERVICE_ROLE_KEY": "introspection.placeholder.key",
+    "JWT_SECRET_KEY": "introspection-placeholder",
+    "STRIPE_SECRET_KEY": "sk_test_introspection",
+    "STRIPE_WEBHOOK_SECRET": "whsec_introspection",
+    "CLOUDFLARE_ACCOUNT_ID": "introspection",
+    "REDIS_URL": "redis://introspection.invalid:6379/0",
+}
+
+# Client factories that would open connections or validate credentials
+OFFLINE_FACTORIES = {
+    "supabase": ("create_client",),
+    "boto3": ("client",),
+    "posthog": ("Posthog",),
+    "stripe": (),
+    "redis": (),
+}
+
+
+@contextlib.contextmanager
+def offline_clients():
+    """Swap network client factories for MagicMocks while the app is imported."""
+    with contextlib.ExitStack() as stack:
+        for module_name, factories in OFFLINE_FACTORIES.items():
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                # Not installed here - routes only need the names to resolve
+                stack.enter_context(mock.patch.dict(sys.modules, {module_name: mock.MagicMock(name=module_name)}))
+                continue
+            for factory in factories:
+                stack.enter_context(mock.patch.object(module, factory, mock.MagicMock(name=f"{module_name}.{factory}")))
+        yield
+
+
+def introspect(service_dir):
+    """Import a service's FastAPI app and return its OpenAPI document."""
+    service_dir = os.path.abspath(service_dir)
+    # Service dir first, then its parent for shared sibling packages
+    sys.path[:0] = [service_dir, os.path.dirname(service_dir)]
+    os.chdir(service_dir)
+    for key, value in PLACEHOLDER_ENV.items():
+        os.environ.setdefault(key, value)
+
+    with offline_clients(), contextlib.redirect_stdout(io.StringIO()):
+        main = importlib.import_module("main")
+        return main.app.openapi()
+
+
+def main():
+    """Print one service's OpenAPI JSON to stdout."""
+    if len(sys.argv) != 2:
+        print("Usage: python openapi_introspect.py <service_dir>", file=sys.stderr)
+        sys.exit(1)
+    json.dump(introspect(sys.argv[1]), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
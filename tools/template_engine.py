@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Template Engine - precompiled, cached Jinja2 templates for code generation
+Templates are compiled once per process, their bytecode is cached on disk
+across runs, and output is streamed straight into the target file handle.
+"""
+import pathlib
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+
+from manifest_loader import cache_root
+
+TEMPLATES_DIR = pathlib.Path(__file__).resolve().parent / "templates"
+
+
+_environment = None
+_registry = {}
+
+
+def get_environment():
+    """Shared Jinja2 environment with a filesystem bytecode cache."""
+    global _environment
+    if _environment is None:
+        bytecode_dir = cache_root() / "jinja"
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
+        _environment = Environment(
+            loader=FileSystemLoader(str(TEMPLATES_DIR)),
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir)),
+            undefined=StrictUndefined,
+            autoescape=False,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            # Templates ship with the tool; skip per-render mtime checks
+            auto_reload=False,
+        )
+    return _environment
+
+
+def get_template(name):
+    """Compiled template from the registry, compiling it on first use."""
+    template = _registry.get(name)
+    if template is None:
+        template = _registry[name] = get_environment().get_template(name)
+    return template
+
+
+def render(name, **context):
+    """Render a template to a string."""
+    return get_template(name).render(**context)
+
+
+def render_to(fh, name, **context):
+    """Stream a rendered template into an open text file handle."""
+    get_template(name).stream(**context).dump(fh)
+
+
+def templates_fingerprint_sources():
+    """Template files in a stable order, for generator fingerprinting."""
+    return sorted(TEMPLATES_DIR.glob("*.j2"))
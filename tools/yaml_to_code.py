@@ -1,200 +1,86 @@
 #!/usr/bin/env python3
 """
 YAML-to-Code Generator - READS YAML AND GENERATES REAL CODE
-No templates, no bullshit - just parse the YAML and create the implementation.
+Parse the YAML and render the implementation through precompiled templates.
 """
 
 import os
 import sys
-import yaml
 import json
+import hashlib
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Callable, Iterator, TextIO, Optional
 
-def read_yaml_manifest(yaml_path: str) -> Dict[str, Any]:
-    """Read and parse the YAML manifest"""
-    with open(yaml_path, 'r') as f:
-        return yaml.safe_load(f)
+import template_engine
+from manifest_loader import load_manifest
+from manifest_walker import walk_endpoints, walk_tables, walk_columns, manifest_stats
 
-def generate_fastapi_main(manifest: Dict[str, Any], project_name: str) -> str:
-    """Generate FastAPI main.py from YAML specifications"""
-    
-    # Extract API endpoints from manifest
-    api_endpoints = []
-    if 'components' in manifest:
-        for component_name, component in manifest['components'].items():
-            if 'apis' in component:
-                for api_name, api_spec in component['apis'].items():
-                    if 'endpoints' in api_spec:
-                        for endpoint in api_spec['endpoints']:
-                            api_endpoints.append({
-                                'path': endpoint.get('path', f'/{api_name}'),
-                                'method': endpoint.get('method', 'GET'),
-                                'name': endpoint.get('name', api_name),
-                                'description': endpoint.get('description', f'{api_name} endpoint')
-                            })
-    
-    # Generate FastAPI code
-    code = f'''"""
-{project_name} - FastAPI Application
-Generated from YAML manifest specifications
-"""
+def read_yaml_manifest(yaml_path: str) -> Dict[str, Any]:
+    """Read and parse the YAML manifest (cached by content hash)"""
+    return load_manifest(yaml_path)
+
+def collect_api_endpoints(manifest: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+    """Template context for every API endpoint declared under components"""
+    for component_name, api_name, endpoint in walk_endpoints(manifest):
+        yield {
+            'path': endpoint.get('path', f'/{api_name}'),
+            'method': endpoint.get('method', 'GET').lower(),
+            'name': endpoint.get('name', api_name).replace(' ', '_').lower(),
+            'description': endpoint.get('description', f'{api_name} endpoint')
+        }
 
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-import uvicorn
-import os
-from datetime import datetime
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="{project_name}",
-    description="Generated from YAML manifest",
-    version="1.0.0"
-)
-
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {{
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "service": "{project_name}"
-    }}
-
-# Root endpoint
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {{
-        "message": "Welcome to {project_name}",
-        "docs": "/docs",
-        "health": "/health"
-    }}
+SQL_COLUMN_TYPES = {
+    'string': 'String',
+    'varchar': 'String',
+    'text': 'String',
+    'int': 'Integer',
+    'integer': 'Integer',
+    'boolean': 'Boolean',
+    'datetime': 'DateTime',
+}
+
+def collect_table_columns(table_spec: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Template context for the columns of one table"""
+    for col_name, col_spec in walk_columns(table_spec):
+        col_type = col_spec.get('type', 'String')
+        yield {
+            'name': col_name,
+            'sql_type': SQL_COLUMN_TYPES.get(col_type.lower(), 'Text'),
+            'nullable': col_spec.get('nullable', True)
+        }
 
-'''
+def collect_database_tables(manifest: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Template context for every table declared under data"""
+    for schema_name, table_name, table_spec in walk_tables(manifest):
+        yield {
+            'name': table_name,
+            'class_name': table_name.title().replace('_', ''),
+            'columns': collect_table_columns(table_spec)
+        }
 
-    # Generate API endpoints from YAML
-    for endpoint in api_endpoints:
-        method = endpoint['method'].lower()
-        path = endpoint['path']
-        name = endpoint['name'].replace(' ', '_').lower()
-        description = endpoint['description']
-        
-        code += f'''
-@app.{method}("{path}")
-async def {name}():
-    """{description}"""
-    return {{
-        "endpoint": "{name}",
-        "method": "{method.upper()}",
-        "path": "{path}",
-        "status": "success",
-        "data": "Implementation from YAML spec"
-    }}
-'''
+def stream_fastapi_main(manifest: Dict[str, Any], project_name: str, fh: TextIO):
+    """Stream FastAPI main.py from YAML specifications into fh"""
+    template_engine.render_to(
+        fh, 'fastapi_main.py.j2',
+        project_name=project_name,
+        endpoints=collect_api_endpoints(manifest)
+    )
 
-    # Add main execution
-    code += '''
-if __name__ == "__main__":
-    port = int(os.getenv("PORT", 8000))
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=True
+def generate_fastapi_main(manifest: Dict[str, Any], project_name: str) -> str:
+    """Generate FastAPI main.py from YAML specifications"""
+    return template_engine.render(
+        'fastapi_main.py.j2',
+        project_name=project_name,
+        endpoints=collect_api_endpoints(manifest)
     )
-'''
-    
-    return code
+
+def stream_database_models(manifest: Dict[str, Any], fh: TextIO):
+    """Stream SQLAlchemy models from YAML database schemas into fh"""
+    template_engine.render_to(fh, 'models.py.j2', tables=collect_database_tables(manifest))
 
 def generate_database_models(manifest: Dict[str, Any]) -> str:
     """Generate SQLAlchemy models from YAML database schemas"""
-    
-    models_code = '''"""
-Database Models - Generated from YAML manifest
-"""
-
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from sqlalchemy import create_engine
-from datetime import datetime
-import os
-
-Base = declarative_base()
-
-'''
-
-    # Extract database schemas from manifest
-    if 'data' in manifest:
-        for schema_name, schema in manifest['data'].items():
-            if 'tables' in schema:
-                for table_name, table_spec in schema['tables'].items():
-                    class_name = table_name.title().replace('_', '')
-                    
-                    models_code += f'''
-class {class_name}(Base):
-    """Generated model for {table_name}"""
-    __tablename__ = "{table_name}"
-    
-    id = Column(Integer, primary_key=True, index=True)
-'''
-                    
-                    # Add columns from YAML spec
-                    if 'columns' in table_spec:
-                        for col_name, col_spec in table_spec['columns'].items():
-                            col_type = col_spec.get('type', 'String')
-                            nullable = col_spec.get('nullable', True)
-                            
-                            if col_type.lower() in ['string', 'varchar', 'text']:
-                                models_code += f'    {col_name} = Column(String, nullable={nullable})\n'
-                            elif col_type.lower() in ['int', 'integer']:
-                                models_code += f'    {col_name} = Column(Integer, nullable={nullable})\n'
-                            elif col_type.lower() == 'boolean':
-                                models_code += f'    {col_name} = Column(Boolean, nullable={nullable})\n'
-                            elif col_type.lower() == 'datetime':
-                                models_code += f'    {col_name} = Column(DateTime, nullable={nullable})\n'
-                            else:
-                                models_code += f'    {col_name} = Column(Text, nullable={nullable})\n'
-                    
-                    models_code += f'    created_at = Column(DateTime, default=datetime.utcnow)\n'
-                    models_code += f'    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)\n'
-
-    # Add database configuration
-    models_code += '''
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def create_tables():
-    """Create all tables"""
-    Base.metadata.create_all(bind=engine)
-
-def get_db():
-    """Get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-'''
-    
-    return models_code
+    return template_engine.render('models.py.j2', tables=collect_database_tables(manifest))
 
 def generate_react_components(manifest: Dict[str, Any], project_name: str) -> List[Dict[str, str]]:
     """Generate React components from YAML frontend specifications"""
@@ -330,54 +216,18 @@ export default Dashboard;
     
     return components
 
-def generate_project_structure(manifest: Dict[str, Any], project_name: str, output_dir: str):
-    """Generate complete project structure from YAML manifest"""
-    
-    print(f"🚀 Generating {project_name} from YAML manifest specifications...")
-    
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Backend structure
-    backend_dir = os.path.join(output_dir, 'backend')
-    os.makedirs(backend_dir, exist_ok=True)
-    
-    # Generate FastAPI main.py
-    main_code = generate_fastapi_main(manifest, project_name)
-    with open(os.path.join(backend_dir, 'main.py'), 'w') as f:
-        f.write(main_code)
-    
-    # Generate database models
-    models_code = generate_database_models(manifest)
-    with open(os.path.join(backend_dir, 'models.py'), 'w') as f:
-        f.write(models_code)
-    
-    # Generate requirements.txt
-    requirements = '''fastapi==0.104.1
+def generate_backend_requirements() -> str:
+    """Generate backend requirements.txt"""
+    return '''fastapi==0.104.1
 uvicorn==0.24.0
 sqlalchemy==2.0.23
 psycopg2-binary==2.9.9
 python-dotenv==1.0.0
 pydantic==2.5.0
 '''
-    with open(os.path.join(backend_dir, 'requirements.txt'), 'w') as f:
-        f.write(requirements)
-    
-    # Frontend structure
-    frontend_dir = os.path.join(output_dir, 'frontend')
-    os.makedirs(frontend_dir, exist_ok=True)
-    os.makedirs(os.path.join(frontend_dir, 'src'), exist_ok=True)
-    os.makedirs(os.path.join(frontend_dir, 'src', 'components'), exist_ok=True)
-    
-    # Generate React components
-    components = generate_react_components(manifest, project_name)
-    for component in components:
-        comp_path = os.path.join(output_dir, component['path'])
-        os.makedirs(os.path.dirname(comp_path), exist_ok=True)
-        with open(comp_path, 'w') as f:
-            f.write(component['content'])
-    
-    # Generate package.json
+
+def generate_package_json(project_name: str) -> str:
+    """Generate frontend package.json"""
     package_json = {
         "name": project_name.lower(),
         "version": "1.0.0",
@@ -394,19 +244,19 @@ pydantic==2.5.0
             "react-scripts": "5.0.1"
         }
     }
-    
-    with open(os.path.join(frontend_dir, 'package.json'), 'w') as f:
-        json.dump(package_json, f, indent=2)
-    
-    # Generate README with actual specifications
-    readme_content = f"""# {project_name}
+    return json.dumps(package_json, indent=2)
+
+def generate_readme(manifest: Dict[str, Any], project_name: str, stats: Optional[Dict[str, int]] = None) -> str:
+    """Generate README with actual specifications"""
+    stats = stats or manifest_stats(manifest)
+    return f"""# {project_name}
 
-Generated from YAML manifest with {len(str(manifest))} characters of specifications.
+Generated from YAML manifest with {stats['characters']} characters of specifications.
 
 ## Architecture Generated
 
 ### Backend (FastAPI)
-- **API Endpoints**: {len([e for c in manifest.get('components', {}).values() for a in c.get('apis', {}).values() for e in a.get('endpoints', [])])} endpoints generated
+- **API Endpoints**: {stats['endpoints']} endpoints generated
 - **Database Models**: Generated from YAML schema specifications
 - **Authentication**: Configured based on manifest security requirements
 
@@ -443,12 +293,10 @@ This project was generated by parsing the complete YAML manifest and creating:
 
 Visit `/docs` when running the backend to see all generated API endpoints.
 """
-    
-    with open(os.path.join(output_dir, 'README.md'), 'w') as f:
-        f.write(readme_content)
-    
-    # Generate docker-compose.yml
-    docker_compose = f'''version: '3.8'
+
+def generate_docker_compose(project_name: str) -> str:
+    """Generate docker-compose.yml"""
+    return f'''version: '3.8'
 
 services:
   backend:
@@ -481,9 +329,231 @@ services:
 volumes:
   postgres_data:
 '''
+
+# Incremental generation
+# ----------------------
+# Each artifact declares which manifest sections it is rendered from. The
+# ledger remembers the input fingerprint and the content hash of every file
+# written, so an incremental run only re-renders artifacts whose inputs moved
+# and never touches files whose bytes are already on disk. Files the previous
+# run wrote that no artifact produces any more are removed.
+
+LEDGER_VERSION = 2
+MANIFEST_SECTIONS = ('components', 'data', 'frontend')
+
+_fingerprint_encoder = json.JSONEncoder(sort_keys=True, default=str, separators=(',', ':'))
+
+def fingerprint(value: Any) -> str:
+    """Stable SHA-256 of any YAML-derived value, hashed chunk by chunk"""
+    digest = hashlib.sha256()
+    for chunk in _fingerprint_encoder.iterencode(value):
+        digest.update(chunk.encode('utf-8'))
+    return digest.hexdigest()
+
+def content_hash(content: str) -> str:
+    """SHA-256 of rendered file content"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def generator_fingerprint() -> str:
+    """Fingerprint of the generator and its templates - a change invalidates every artifact"""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    for template_path in template_engine.templates_fingerprint_sources():
+        digest.update(template_path.name.encode('utf-8'))
+        digest.update(template_path.read_bytes())
+    return digest.hexdigest()
+
+def fingerprint_manifest(manifest: Dict[str, Any], project_name: str, stats: Dict[str, int]) -> Dict[str, str]:
+    """Fingerprint each manifest section the generators read from"""
+    prints = {section: fingerprint(manifest.get(section)) for section in MANIFEST_SECTIONS}
+    prints['project'] = fingerprint(project_name)
+    prints['stats'] = fingerprint(stats)
+    return prints
+
+def ledger_path(output_dir: str) -> str:
+    """Ledger lives next to the output directory, not inside it"""
+    output_dir = os.path.abspath(output_dir)
+    return os.path.join(os.path.dirname(output_dir), f".{os.path.basename(output_dir)}.ledger.json")
+
+def load_ledger(output_dir: str) -> Dict[str, Any]:
+    """Load the generation ledger, or an empty one if missing/stale"""
+    try:
+        with open(ledger_path(output_dir), 'r') as f:
+            ledger = json.load(f)
+    except (OSError, ValueError):
+        return {'version': LEDGER_VERSION, 'artifacts': {}}
+    if ledger.get('version') != LEDGER_VERSION:
+        return {'version': LEDGER_VERSION, 'artifacts': {}}
+    return ledger
+
+def save_ledger(output_dir: str, ledger: Dict[str, Any]):
+    """Atomically persist the generation ledger"""
+    path = ledger_path(output_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(ledger, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def file_matches(path: str, expected_hash: str) -> bool:
+    """True if the file on disk already has the expected content hash"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() == expected_hash
+    except OSError:
+        return False
+
+def write_if_changed(path: str, content: str) -> bool:
+    """Write content unless the file already holds identical bytes; returns True if written"""
+    if file_matches(path, content_hash(content)):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return True
+
+class HashingWriter:
+    """Text file wrapper that hashes everything streamed through it"""
+    
+    def __init__(self, fh: TextIO):
+        self.fh = fh
+        self.digest = hashlib.sha256()
+    
+    def write(self, chunk: str) -> int:
+        self.digest.update(chunk.encode('utf-8'))
+        return self.fh.write(chunk)
+    
+    def writelines(self, chunks):
+        for chunk in chunks:
+            self.write(chunk)
+    
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+def emit_file(path: str, generated: Dict[str, Any], incremental: bool) -> Tuple[bool, str]:
+    """Write one generated file; returns (written, content hash)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    if 'stream' not in generated:
+        if incremental:
+            return write_if_changed(path, generated['content']), content_hash(generated['content'])
+        with open(path, 'w') as f:
+            f.write(generated['content'])
+        return True, content_hash(generated['content'])
+    
+    # Streamed templates render straight to disk; in incremental mode they go
+    # to a sibling temp file that only replaces the target if the bytes differ
+    target = f"{path}.tmp" if incremental else path
+    with open(target, 'w') as f:
+        writer = HashingWriter(f)
+        generated['stream'](writer)
+    digest = writer.hexdigest()
+    if not incremental:
+        return True, digest
+    if file_matches(path, digest):
+        os.remove(target)
+        return False, digest
+    os.replace(target, path)
+    return True, digest
+
+def remove_stale_files(output_dir: str, previous: Dict[str, Any], artifacts: Dict[str, Any]) -> Tuple[int, List[str]]:
+    """Delete files recorded by the previous run that no artifact produced this time.
+
+    Returns (removed count, paths kept because they were edited since they
+    were generated); edited files are never deleted.
+    """
+    current = {rel_path for entry in artifacts.values() for rel_path in entry['files']}
+    removed = 0
+    kept = []
+    for entry in previous.values():
+        for rel_path, digest in entry['files'].items():
+            if rel_path in current:
+                continue
+            path = os.path.join(output_dir, rel_path)
+            if not os.path.exists(path):
+                continue
+            if not file_matches(path, digest):
+                kept.append(rel_path)
+                continue
+            os.remove(path)
+            removed += 1
+            # Prune directories the removal left empty, up to output_dir
+            parent = os.path.dirname(path)
+            while os.path.abspath(parent) != os.path.abspath(output_dir) and not os.listdir(parent):
+                os.rmdir(parent)
+                parent = os.path.dirname(parent)
+    return removed, kept
+
+def project_artifacts(manifest: Dict[str, Any], project_name: str, stats: Dict[str, int]) -> List[Tuple[str, Tuple[str, ...], Callable[[], List[Dict[str, Any]]]]]:
+    """Every generated artifact with the manifest sections it depends on"""
+    return [
+        ('backend_main', ('components', 'project'), lambda: [
+            {'path': 'backend/main.py', 'stream': lambda fh: stream_fastapi_main(manifest, project_name, fh)}
+        ]),
+        ('backend_models', ('data',), lambda: [
+            {'path': 'backend/models.py', 'stream': lambda fh: stream_database_models(manifest, fh)}
+        ]),
+        ('backend_requirements', (), lambda: [
+            {'path': 'backend/requirements.txt', 'content': generate_backend_requirements()}
+        ]),
+        ('frontend_components', ('frontend', 'project'), lambda: generate_react_components(manifest, project_name)),
+        ('frontend_package', ('project',), lambda: [
+            {'path': 'frontend/package.json', 'content': generate_package_json(project_name)}
+        ]),
+        ('readme', ('stats', 'project'), lambda: [
+            {'path': 'README.md', 'content': generate_readme(manifest, project_name, stats)}
+        ]),
+        ('docker_compose', ('project',), lambda: [
+            {'path': 'docker-compose.yml', 'content': generate_docker_compose(project_name)}
+        ]),
+    ]
+
+def generate_project_structure(manifest: Dict[str, Any], project_name: str, output_dir: str,
+                               incremental: bool = False, stats: Optional[Dict[str, int]] = None):
+    """Generate complete project structure from YAML manifest"""
+    
+    mode = "incremental" if incremental else "full"
+    print(f"🚀 Generating {project_name} from YAML manifest specifications ({mode})...")
     
-    with open(os.path.join(output_dir, 'docker-compose.yml'), 'w') as f:
-        f.write(docker_compose)
+    # Create output directory
+    os.makedirs(output_dir, exist_ok=True)
+    for subdir in ('backend', 'frontend/src/components'):
+        os.makedirs(os.path.join(output_dir, subdir), exist_ok=True)
+    
+    generator = generator_fingerprint()
+    stats = stats or manifest_stats(manifest)
+    prints = fingerprint_manifest(manifest, project_name, stats)
+    previous = load_ledger(output_dir)['artifacts'] if incremental else {}
+    artifacts = {}
+    counts = {'rendered': 0, 'skipped': 0, 'written': 0, 'unchanged': 0}
+    
+    for name, depends_on, render in project_artifacts(manifest, project_name, stats):
+        inputs = fingerprint([generator] + [prints[section] for section in depends_on])
+        entry = previous.get(name)
+        
+        # Inputs unchanged and every file still intact on disk: nothing to render
+        if entry and entry['inputs'] == inputs and all(
+            file_matches(os.path.join(output_dir, rel_path), digest)
+            for rel_path, digest in entry['files'].items()
+        ):
+            artifacts[name] = entry
+            counts['skipped'] += 1
+            continue
+        
+        counts['rendered'] += 1
+        files = {}
+        for generated in render():
+            written, digest = emit_file(os.path.join(output_dir, generated['path']), generated, incremental)
+            counts['written' if written else 'unchanged'] += 1
+            files[generated['path']] = digest
+        artifacts[name] = {'inputs': inputs, 'depends_on': list(depends_on), 'files': files}
+    
+    removed, kept = remove_stale_files(output_dir, previous, artifacts) if incremental else (0, [])
+    
+    save_ledger(output_dir, {
+        'version': LEDGER_VERSION,
+        'project': project_name,
+        'sections': prints,
+        'artifacts': artifacts,
+    })
     
     print(f"✅ Generated complete {project_name} codebase in {output_dir}")
     print(f"📊 Created:")
@@ -491,13 +561,23 @@ volumes:
     print(f"   - Frontend with React components")
     print(f"   - Docker configuration")
     print(f"   - Complete project structure")
+    if incremental:
+        print(f"♻️  Incremental: {counts['rendered']} artifacts re-rendered, {counts['skipped']} up to date")
+        print(f"   - {counts['written']} files written, {counts['unchanged']} identical files left untouched")
+        print(f"   - {removed} files no longer generated removed")
+        for rel_path in kept:
+            print(f"   ⚠️  {rel_path} is no longer generated but was edited; left in place")
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python yaml_to_code.py <yaml_manifest_path>")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    
+    if len(args) != 1 or any(flag != '--incremental' for flag in flags):
+        print("Usage: python yaml_to_code.py [--incremental] <yaml_manifest_path>")
         sys.exit(1)
     
-    yaml_path = sys.argv[1]
+    yaml_path = args[0]
+    incremental = '--incremental' in flags
     
     if not os.path.exists(yaml_path):
         print(f"Error: YAML file {yaml_path} not found")
@@ -512,13 +592,14 @@ def main():
     output_dir = f"{project_name}_complete"
     
     print(f"🎯 Project: {project_name}")
-    print(f"📝 Manifest size: {len(str(manifest))} characters")
+    stats = manifest_stats(manifest)
+    print(f"📝 Manifest size: {stats['characters']} characters")
     print(f"📂 Output directory: {output_dir}")
     
     # Generate project
-    generate_project_structure(manifest, project_name, output_dir)
+    generate_project_structure(manifest, project_name, output_dir, incremental=incremental, stats=stats)
     
     print(f"🎉 SUCCESS: {project_name} generated from YAML specifications!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()